@@ -0,0 +1,74 @@
+"""
+Бенчмарки горячих путей контроллера и вспомогательного кода (pytest-benchmark).
+Запускаются против локальной замены сервиса в том же процессе:
+pytest benchmarks --benchmark-compare
+
+Результаты сравниваются с последним сохраненным запуском
+в benchmarks/baselines для текущей платформы. Если медиана времени
+какого-либо бенчмарка выросла больше чем на REGRESSION_THRESHOLD,
+запуск завершается ошибкой. Медиана меньше среднего зависит от
+отдельных медленных раундов, а порог учитывает разброс между
+запусками на одной машине (до 40% в обе стороны). Сохранить новый
+базовый запуск (из чистого дерева, без незакоммиченных изменений):
+pytest benchmarks --benchmark-save=baseline
+"""
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+from characters_controller.characters import CharactersController
+from characters_controller.fake_service import (
+    FAKE_BASE_URL,
+    FAKE_LOGIN,
+    FAKE_PASSWORD,
+    FakeCharactersService,
+    FakeServiceAdapter,
+)
+from utilities.payload_pool import PayloadPool
+
+BASELINE_STORAGE = f'file://{Path(__file__).parent / "baselines"}'
+DEFAULT_STORAGE = 'file://./.benchmarks'
+REGRESSION_THRESHOLD = 'median:50%'
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    """Хранилище базовых запусков и порог регрессии по умолчанию."""
+    if config.getoption('benchmark_storage') == DEFAULT_STORAGE:
+        config.option.benchmark_storage = BASELINE_STORAGE
+    if (config.getoption('benchmark_compare')
+            and not config.getoption('benchmark_compare_fail')):
+        config.option.benchmark_compare_fail = [
+            parse_compare_fail(REGRESSION_THRESHOLD),
+        ]
+
+
+@pytest.fixture(scope='session')
+def fake_service() -> FakeCharactersService:
+    return FakeCharactersService()
+
+
+@pytest.fixture(scope='session')
+def characters(fake_service: FakeCharactersService) -> CharactersController:
+    """Контроллер, подключенный к локальной замене сервиса."""
+    with CharactersController(
+        base_url=FAKE_BASE_URL,
+        user_login=FAKE_LOGIN,
+        user_password=FAKE_PASSWORD,
+    ) as controller:
+        controller.mount(FAKE_BASE_URL, FakeServiceAdapter(fake_service))
+        yield controller
+
+
+@pytest.fixture()
+def fresh_service(fake_service: FakeCharactersService) -> None:
+    """Фикстура, сбрасывающая коллекцию до и после бенчмарка."""
+    fake_service.reset()
+    yield
+    fake_service.reset()
+
+
+@pytest.fixture(scope='session')
+def payload_pool() -> PayloadPool:
+    return PayloadPool()
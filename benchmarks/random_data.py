@@ -0,0 +1,82 @@
+"""
+Сравнение стоимости генерации случайных данных персонажа:
+поштучные генераторы в прежнем виде и пакетная генерация.
+python -m benchmarks.random_data [--count 500] [--repeat 5]
+"""
+import argparse
+import decimal
+import random
+import string
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from characters_controller.dataclass import Character
+from utilities.utils import create_new_characters_payloads
+
+
+def _legacy_string(length: int) -> str:
+    result = random.choices(
+        string.ascii_lowercase + string.ascii_uppercase + string.digits,
+        k=length,
+    )
+    return ''.join(result)
+
+
+def _legacy_float(before_dot: int = 1, after_dot: int = 2) -> float:
+    left_part = ''.join(random.choices(string.digits, k=before_dot))
+    if left_part.startswith('0'):
+        left_part = str(random.randint(1, 9)) + left_part[1:]
+    right_part = ''.join(random.choices(string.digits, k=after_dot))
+    if right_part.endswith('0'):
+        right_part = right_part[:-1] + str(random.randint(1, 9))
+    return float(decimal.Decimal(left_part + '.' + right_part))
+
+
+def legacy_payloads(count: int, length: int = 10) -> List[Dict]:
+    """Генерация пакета так, как её выполнял CharactersSeeder раньше."""
+    return [
+        dict(Character(
+            education=_legacy_string(length),
+            height=_legacy_float(),
+            identity=_legacy_string(length),
+            name=_legacy_string(length),
+            other_aliases=_legacy_string(length),
+            universe=_legacy_string(length),
+            weight=_legacy_float(before_dot=2, after_dot=1),
+        ))
+        for _ in range(count)
+    ]
+
+
+def batched_payloads(count: int, length: int = 10) -> List[Dict]:
+    """Пакетная генерация, которую использует CharactersSeeder."""
+    return create_new_characters_payloads(count, length)
+
+
+def measure(
+        generate: Callable[[int], List[Dict]],
+        count: int,
+        repeat: int,
+) -> float:
+    """
+    Метод, возвращающий лучшее из repeat измерений времени генерации
+    одной записи в микросекундах.
+    """
+    timings = timeit.repeat(lambda: generate(count), number=1, repeat=repeat)
+    return min(timings) / count * 1e6
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args(args)
+    before = measure(legacy_payloads, options.count, options.repeat)
+    after = measure(batched_payloads, options.count, options.repeat)
+    print(f'records per batch: {options.count}')
+    print(f'before: {before:8.2f} us/record')
+    print(f'after:  {after:8.2f} us/record ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
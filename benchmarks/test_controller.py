@@ -0,0 +1,100 @@
+"""Накладные расходы одного вызова каждого метода контроллера."""
+import pytest
+
+from characters_controller.characters import CharactersController
+from characters_controller.fake_service import FakeCharactersService
+from utilities.payload_pool import PayloadPool
+from utilities.seeding import CharactersSeeder
+
+ROUNDS = 100
+
+pytestmark = pytest.mark.usefixtures('fresh_service')
+
+
+def test_characters_get(
+        benchmark,
+        characters: CharactersController,
+) -> None:
+    response = benchmark(characters.characters_get)
+    assert response.status_code == 200
+
+
+def test_characters_stream(
+        benchmark,
+        characters: CharactersController,
+) -> None:
+    count = benchmark(lambda: sum(1 for _ in characters.characters_stream()))
+    assert count > 0
+
+
+def test_character_get(
+        benchmark,
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
+    payload = payload_pool.take()
+    characters.character_post(payload)
+    response = benchmark(characters.character_get, name=payload.name)
+    assert response.status_code == 200
+
+
+def test_character_post(
+        benchmark,
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
+    response = benchmark.pedantic(
+        characters.character_post,
+        setup=lambda: ((), {'character': payload_pool.take()}),
+        rounds=ROUNDS,
+    )
+    assert response.status_code == 200
+
+
+def test_character_put(
+        benchmark,
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
+    payload = payload_pool.take()
+    characters.character_post(payload)
+    response = benchmark(characters.character_put, character=payload)
+    assert response.status_code == 200
+
+
+def test_character_delete(
+        benchmark,
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
+    def setup():
+        payload = payload_pool.take()
+        characters.character_post(payload)
+        return (), {'name': payload.name}
+
+    response = benchmark.pedantic(
+        characters.character_delete, setup=setup, rounds=ROUNDS,
+    )
+    assert response.status_code == 200
+
+
+def test_reset_post(
+        benchmark,
+        characters: CharactersController,
+) -> None:
+    response = benchmark(characters.reset_post)
+    assert response.status_code == 200
+
+
+def test_fill_db_to_max_recs(
+        benchmark,
+        characters: CharactersController,
+        fake_service: FakeCharactersService,
+) -> None:
+    """Заполнение БД до максимума, как в фикстуре fill_db_to_max_recs."""
+    report = benchmark.pedantic(
+        lambda: CharactersSeeder(characters).fill_to(),
+        setup=fake_service.reset,
+        rounds=5,
+    )
+    assert not report.failures
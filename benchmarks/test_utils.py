@@ -0,0 +1,124 @@
+"""Валидация списков персонажей, генераторы случайных данных и фабрики."""
+import pytest
+
+from characters_controller.dataclass import Character, CharacterRecord
+from characters_controller.enums import ServiceDBLimits
+from characters_controller.fake_service import default_records
+from utilities.diff import diff_collections
+from utilities.utils import (
+    create_new_character_data_with_required_field,
+    create_new_character_data_with_wrong_data_type,
+    create_new_character_data_without_required_field,
+    create_new_characters_payloads,
+    get_random_float,
+    get_random_floats,
+    get_random_int,
+    get_random_string_with_letters_digits,
+    get_random_strings,
+    validate_characters_list_data,
+)
+
+BATCH = 500
+
+
+@pytest.mark.parametrize(
+    'records',
+    (ServiceDBLimits.DEFAULT_DB_RECORD.value,
+     ServiceDBLimits.MAX_DB_RECORDS.value),
+)
+def test_validate_characters_list_data(benchmark, records: int) -> None:
+    data = default_records()
+    data += create_new_characters_payloads(records - len(data))
+    assert benchmark(validate_characters_list_data, data) == 'Success'
+
+
+@pytest.mark.parametrize(
+    'convert',
+    (Character.model_validate, CharacterRecord.from_dict),
+    ids=('model', 'record'),
+)
+def test_characters_from_dicts(benchmark, convert) -> None:
+    data = default_records()
+    data += create_new_characters_payloads(
+        ServiceDBLimits.MAX_DB_RECORDS.value - len(data),
+    )
+    benchmark(lambda: [convert(record) for record in data])
+
+
+@pytest.mark.parametrize(
+    'convert',
+    (dict, CharacterRecord.from_dict),
+    ids=('dicts', 'records'),
+)
+def test_diff_collections(benchmark, convert) -> None:
+    """Сравнение двух снимков по MAX_DB_RECORDS записей, 10% отличий."""
+    data = default_records()
+    data += create_new_characters_payloads(
+        ServiceDBLimits.MAX_DB_RECORDS.value - len(data),
+    )
+    before = [convert(record) for record in data]
+    after = [convert(record) for record in data[10:]]
+    after += [
+        convert({**record, 'universe': 'changed'}) for record in data[:20]
+    ]
+    after += [convert(record) for record in create_new_characters_payloads(20)]
+    diff = benchmark(diff_collections, before, after)
+    assert (len(diff.added), len(diff.removed), len(diff.modified)) \
+        == (20, 0, 20)
+
+
+@pytest.mark.parametrize(
+    'generate',
+    (
+        lambda: get_random_string_with_letters_digits(10),
+        lambda: get_random_int(10),
+        lambda: get_random_float(),
+        lambda: get_random_strings(BATCH, 10),
+        lambda: get_random_floats(BATCH),
+        lambda: create_new_characters_payloads(BATCH),
+    ),
+    ids=(
+        'string', 'int', 'float',
+        f'strings_x{BATCH}', f'floats_x{BATCH}', f'payloads_x{BATCH}',
+    ),
+)
+def test_random_data(benchmark, generate) -> None:
+    benchmark(generate)
+
+
+def test_create_new_character_data_with_required_field(benchmark) -> None:
+    benchmark(
+        create_new_character_data_with_required_field,
+        education='education',
+        height=1.23,
+        identity='identity',
+        name='name',
+        other_aliases='other_aliases',
+        universe='universe',
+        weight=45.6,
+    )
+
+
+def test_create_new_character_data_without_required_field(benchmark) -> None:
+    benchmark(
+        create_new_character_data_without_required_field,
+        education='education',
+        height=1.23,
+        identity='identity',
+        other_aliases='other_aliases',
+        universe='universe',
+        weight=45.6,
+    )
+
+
+def test_create_new_character_data_with_wrong_data_type(benchmark) -> None:
+    benchmark(
+        create_new_character_data_with_wrong_data_type,
+        education=1234567890,
+        height=1.23,
+        identity=1234567890,
+        name='name',
+        other_aliases=1234567890,
+        universe=1234567890,
+        weight=4.56,
+    )
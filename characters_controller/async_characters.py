@@ -0,0 +1,176 @@
+import asyncio
+from typing import Any, Optional
+
+import httpx
+
+from characters_controller.dataclass import (
+    JSON_HEADERS,
+    CharacterBody,
+    encode_character,
+)
+from characters_controller.response import CharactersResponse
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_CONCURRENCY = 20
+
+
+class AsyncCharactersController:
+    def __init__(
+            self,
+            *,
+            base_url: str,
+            user_login: str,
+            user_password: str,
+            max_connections: int = DEFAULT_MAX_CONNECTIONS,
+            max_keepalive_connections: Optional[int] = None,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Асинхронный вариант модели сервиса Characters.
+        Все запросы идут через один http-клиент с общим пулом соединений,
+        количество одновременно выполняемых запросов ограничено семафором.
+        :param max_connections - максимальный размер пула соединений.
+        :param max_keepalive_connections - количество keep-alive соединений,
+        которые остаются открытыми между запросами
+        (по умолчанию равно max_connections).
+        :param concurrency - максимальное количество одновременных запросов.
+        :param transport - транспорт httpx вместо сетевого
+        (например, локальная замена сервиса).
+        """
+        self.url = base_url
+        self.password = user_password
+        self.login = user_login
+        self.concurrency = concurrency
+        self._auth = httpx.BasicAuth(self.login, self.password)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=(
+                    max_connections if max_keepalive_connections is None
+                    else max_keepalive_connections
+                ),
+            ),
+            transport=transport,
+        )
+        # Семафор создается в работающем event loop при первом запросе
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'AsyncCharactersController':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            auth: bool = True,
+            **kwargs: Any,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий запрос с авторизацией или без неё.
+        Ожидает свободного места в семафоре перед отправкой запроса.
+        Тело ответа разбирается лениво.
+        :param method - http-метод запроса.
+        :param path - путь эндпоинта относительно базового url.
+        :param auth - выполнять ли запрос авторизованным пользователем.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            return CharactersResponse(await self._client.request(
+                method,
+                f'{self.url}{path}',
+                auth=self._auth if auth else None,
+                **kwargs,
+            ))
+
+    async def aclose(self) -> None:
+        """Метод, закрывающий http-клиент и его пул соединений."""
+        await self._client.aclose()
+
+    async def characters_get(self, auth: bool = True) -> CharactersResponse:
+        """
+        Метод, выполняющий get запрос для получения данных о персонажах.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        """
+        return await self._request('GET', '/characters', auth=auth)
+
+    async def character_get(
+            self,
+            name: str,
+            auth: bool = True,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий get запрос для получения данных о персонаже по его
+        имени.
+        :param name - имя персонажа в формате str.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        """
+        return await self._request('GET', f'/character?name={name}', auth=auth)
+
+    async def character_post(
+            self,
+            character: CharacterBody,
+            auth: bool = True,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий post запрос для создания нового персонажа.
+        :param character - тело запроса с информацией о персонаже
+        в формате dict, модели Character (CharacterWithoutName,
+        CharacterWrongTypeModel), EncodedCharacter или json в bytes.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        """
+        if not auth:
+            return await self._request('POST', '/character', auth=False)
+        _, body = encode_character(character, with_name=False)
+        return await self._request(
+            'POST', '/character', content=body, headers=JSON_HEADERS,
+        )
+
+    async def character_put(
+            self,
+            character: CharacterBody,
+            auth: bool = True,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий put запрос для обновления записи о персонаже.
+        :param character - тело запроса с информацией о персонаже
+        в формате dict, модели Character (CharacterWithoutName,
+        CharacterWrongTypeModel), EncodedCharacter или json в bytes.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        """
+        if not auth:
+            return await self._request('PUT', '/character', auth=False)
+        _, body = encode_character(character, with_name=False)
+        return await self._request(
+            'PUT', '/character', content=body, headers=JSON_HEADERS,
+        )
+
+    async def character_delete(
+            self,
+            name: str,
+            auth: bool = True,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий delete запрос для удаления записи о персонаже.
+        :param name - имя персонажа в формате str.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        """
+        return await self._request(
+            'DELETE', f'/character?name={name}', auth=auth,
+        )
+
+    async def reset_post(self, auth: bool = True) -> CharactersResponse:
+        """
+        Метод, выполняющий post запрос для системы в дефолтное состояние
+        (все добавленные данные удаляются).
+        """
+        return await self._request('POST', '/reset/', auth=auth)
@@ -0,0 +1,278 @@
+"""
+Запись и воспроизведение http-обменов контроллеров (кассеты).
+
+В режиме записи каждый ответ сервиса сохраняется в файл данных,
+рядом (<путь>.idx) сохраняется индекс: ключ запроса -> смещения записей.
+В режиме воспроизведения файл данных отображается в память, ответы
+отдаются по индексу без сети. Ключ запроса - метод, url, наличие
+авторизации и нормализованное тело (json с сортированными ключами).
+Одинаковые запросы воспроизводятся в порядке записи.
+"""
+import hashlib
+import json
+import mmap
+import struct
+import threading
+from collections import defaultdict
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import httpx
+import requests as r
+from requests.adapters import BaseAdapter
+
+from characters_controller.instrumentation import TimedHTTPAdapter
+from characters_controller.transport import build_response
+
+CASSETTE_VERSION = 1
+INDEX_SUFFIX = '.idx'
+# Код ответа, длина заголовков, длина тела
+_RECORD_HEADER = struct.Struct('<HII')
+# Заголовки, которые не имеют смысла без исходного соединения
+_SKIPPED_HEADERS = frozenset((
+    'connection', 'content-encoding', 'content-length', 'date',
+    'keep-alive', 'set-cookie', 'transfer-encoding',
+))
+
+Exchange = Tuple[int, Dict[str, str], bytes]
+
+
+class CassetteMissError(r.RequestException):
+    """В кассете нет (или больше нет) ответа на запрос."""
+
+
+def request_key(
+        method: str,
+        url: str,
+        authorized: bool,
+        body: Union[str, bytes, None],
+) -> str:
+    """
+    Метод, возвращающий ключ запроса в кассете.
+    Данные авторизации в ключ не попадают, только факт её наличия.
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    body = body or b''
+    try:
+        body = json.dumps(
+            json.loads(body), sort_keys=True, separators=(',', ':'),
+        ).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha1(body).hexdigest()
+    return f'{method} {url} {"auth" if authorized else "anon"} {digest}'
+
+
+def _filter_headers(headers: Mapping[str, str], body: bytes) -> Dict:
+    result = {
+        header: value for header, value in headers.items()
+        if header.lower() not in _SKIPPED_HEADERS
+    }
+    result['Content-Length'] = str(len(body))
+    return result
+
+
+class CassetteWriter:
+    def __init__(self, path: str, base_url: str) -> None:
+        """
+        Запись кассеты. Безопасна для вызова из нескольких потоков.
+        :param path - путь к файлу данных кассеты (перезаписывается).
+        :param base_url - базовый url сервиса, при воспроизведении
+        контроллер подключается к нему же.
+        """
+        self.path = path
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        self._offset = 0
+        self._index: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+    def add(
+            self,
+            key: str,
+            status_code: int,
+            headers: Mapping[str, str],
+            body: bytes,
+    ) -> None:
+        headers_data = json.dumps(dict(headers)).encode()
+        record = b''.join((
+            _RECORD_HEADER.pack(status_code, len(headers_data), len(body)),
+            headers_data,
+            body,
+        ))
+        with self._lock:
+            self._file.write(record)
+            self._index[key].append((self._offset, len(record)))
+            self._offset += len(record)
+
+    def close(self) -> None:
+        """Метод, дописывающий данные и сохраняющий индекс кассеты."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            with open(self.path + INDEX_SUFFIX, 'w') as file:
+                json.dump({
+                    'version': CASSETTE_VERSION,
+                    'base_url': self.base_url,
+                    'entries': self._index,
+                }, file)
+
+
+class CassetteReader:
+    def __init__(self, path: str) -> None:
+        """
+        Воспроизведение кассеты из файла, отображенного в память.
+        :param path - путь к файлу данных кассеты.
+        """
+        with open(path + INDEX_SUFFIX) as file:
+            index = json.load(file)
+        if index.get('version') != CASSETTE_VERSION:
+            raise ValueError(f'Unsupported cassette version in {path}')
+        self.path = path
+        self.base_url: str = index['base_url']
+        self._entries: Dict[str, List[List[int]]] = index['entries']
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+        self._data: Union[mmap.mmap, bytes] = b''
+        if self._entries:
+            self._data = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ,
+            )
+
+    def get(self, key: str) -> Exchange:
+        """
+        Метод, возвращающий следующий записанный ответ на запрос.
+        :return: код ответа, заголовки и тело ответа.
+        """
+        with self._lock:
+            records = self._entries.get(key, ())
+            position = self._cursors[key]
+            if position >= len(records):
+                raise CassetteMissError(f'No recorded response for {key}')
+            self._cursors[key] = position + 1
+        offset, _ = records[position]
+        status_code, headers_length, body_length = \
+            _RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + _RECORD_HEADER.size
+        headers = json.loads(self._data[start:start + headers_length])
+        start += headers_length
+        return status_code, headers, self._data[start:start + body_length]
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(
+            self,
+            writer: CassetteWriter,
+            inner: Optional[BaseAdapter] = None,
+    ) -> None:
+        """
+        Адаптер requests, записывающий в кассету ответы адаптера inner
+        (по умолчанию - сетевого).
+        """
+        super().__init__()
+        self.writer = writer
+        self.inner = inner or TimedHTTPAdapter()
+
+    def send(self, request: r.PreparedRequest, **kwargs) -> r.Response:
+        response = self.inner.send(request, **kwargs)
+        body = response.content
+        headers = _filter_headers(response.headers, body)
+        self.writer.add(
+            request_key(
+                request.method,
+                request.url,
+                'Authorization' in request.headers,
+                request.body,
+            ),
+            response.status_code,
+            headers,
+            body,
+        )
+        return build_response(request, response.status_code, headers, body)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, reader: CassetteReader) -> None:
+        """Адаптер requests, отвечающий на запросы из кассеты."""
+        super().__init__()
+        self.reader = reader
+
+    def send(self, request: r.PreparedRequest, **kwargs) -> r.Response:
+        status_code, headers, body = self.reader.get(request_key(
+            request.method,
+            request.url,
+            'Authorization' in request.headers,
+            request.body,
+        ))
+        return build_response(request, status_code, headers, body)
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(
+            self,
+            writer: CassetteWriter,
+            inner: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Транспорт httpx, записывающий в кассету ответы транспорта inner
+        (по умолчанию - сетевого).
+        """
+        self.writer = writer
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(
+            self,
+            request: httpx.Request,
+    ) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        headers = _filter_headers(response.headers, body)
+        self.writer.add(
+            request_key(
+                request.method,
+                str(request.url),
+                'Authorization' in request.headers,
+                await request.aread(),
+            ),
+            response.status_code,
+            headers,
+            body,
+        )
+        return httpx.Response(
+            response.status_code, headers=headers, content=body,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, reader: CassetteReader) -> None:
+        """Транспорт httpx, отвечающий на запросы из кассеты."""
+        self.reader = reader
+
+    async def handle_async_request(
+            self,
+            request: httpx.Request,
+    ) -> httpx.Response:
+        status_code, headers, body = self.reader.get(request_key(
+            request.method,
+            str(request.url),
+            'Authorization' in request.headers,
+            await request.aread(),
+        ))
+        return httpx.Response(status_code, headers=headers, content=body)
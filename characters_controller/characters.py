@@ -1,8 +1,43 @@
-from typing import Dict
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote_plus
 
 import requests as r
+from requests.adapters import BaseAdapter, DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
 from requests.auth import HTTPBasicAuth
 
+from characters_controller.dataclass import (
+    JSON_HEADERS,
+    Character,
+    CharacterBody,
+    encode_character,
+)
+from characters_controller.enums import CharacterMutation
+from characters_controller.instrumentation import (
+    CallRecord,
+    CallRecorder,
+    TimedHTTPAdapter,
+    default_recorder,
+    pop_connect_timing,
+    reset_connect_timing,
+)
+from characters_controller.response import CharactersResponse
+from characters_controller.streaming import DEFAULT_CHUNK_SIZE, iter_characters
+from characters_controller.transport import (
+    DEFAULT_TIMEOUT,
+    SAFE_METHODS,
+    RetryPolicy,
+    SingleFlight,
+    Timeout,
+    TokenBucket,
+)
+
+# Подписчик на изменения коллекции: получает операцию, имя персонажа
+# и ответ сервиса (None, если запрос завершился сетевой ошибкой)
+MutationListener = Callable[
+    [CharacterMutation, Optional[str], Optional[CharactersResponse]], None,
+]
+
 
 class CharactersController:
     def __init__(
@@ -11,28 +46,312 @@ class CharactersController:
             base_url: str,
             user_login: str,
             user_password: str,
+            pool_connections: int = DEFAULT_POOLSIZE,
+            pool_maxsize: int = DEFAULT_POOLSIZE,
+            pool_block: bool = DEFAULT_POOLBLOCK,
+            keep_alive: bool = True,
+            recorder: CallRecorder = default_recorder,
+            timeout: Timeout = DEFAULT_TIMEOUT,
+            retry: Optional[RetryPolicy] = None,
+            rate_limiter: Optional[TokenBucket] = None,
+            single_flight: Optional[SingleFlight] = None,
     ) -> None:
         """
-        Конструктор модели сервиса Characters
+        Конструктор модели сервиса Characters.
+        Контроллер владеет двумя http-сессиями (с авторизацией и без),
+        каждая со своим пулом keep-alive соединений.
+        :param pool_connections - количество хостов, для которых
+        кэшируются пулы соединений.
+        :param pool_maxsize - максимальное количество соединений
+        с одним хостом.
+        :param pool_block - ждать ли освобождения соединения, если пул
+        исчерпан (иначе открывается дополнительное соединение).
+        :param keep_alive - переиспользовать ли соединения между запросами.
+        :param recorder - точка сбора информации о времени запросов.
+        :param timeout - таймаут запроса в секундах, число или пара
+        (установка соединения, чтение ответа); None - без таймаута.
+        :param retry - правила повтора неудачных запросов
+        (по умолчанию RetryPolicy()).
+        :param rate_limiter - ограничитель частоты запросов, может быть
+        общим для нескольких контроллеров.
+        :param single_flight - объединитель одновременных одинаковых
+        GET запросов (по умолчанию запросы не объединяются). Запросы,
+        меняющие коллекцию, не объединяются и отменяют объединение
+        с запросами, отправленными до них.
         """
         self.url = base_url
         self.password = user_password
         self.login = user_login
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.recorder = recorder
+        self.timeout = timeout
+        self.retry = RetryPolicy() if retry is None else retry
+        self.rate_limiter = rate_limiter
+        self.single_flight = single_flight
+        self._auth_session = self._create_session(
+            auth=HTTPBasicAuth(self.login, self.password),
+        )
+        self._session = self._create_session()
+        self._mutation_listeners: List[MutationListener] = []
+
+    def __enter__(self) -> 'CharactersController':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _create_session(
+            self,
+            auth: Optional[HTTPBasicAuth] = None,
+    ) -> r.Session:
+        """
+        Метод, создающий http-сессию с собственным пулом соединений.
+        :param auth - данные авторизации, которые будут отправляться
+        с каждым запросом сессии.
+        """
+        session = r.Session()
+        session.auth = auth
+        adapter = TimedHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _request(
+            self,
+            method: str,
+            path: str,
+            auth: bool = True,
+            **kwargs: Any,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий запрос через сессию с авторизацией
+        или без неё. Тело ответа разбирается лениво.
+        :param method - http-метод запроса.
+        :param path - путь эндпоинта относительно базового url.
+        :param auth - выполнять ли запрос авторизованным пользователем.
+        """
+        if self.single_flight is None or kwargs \
+                or method not in SAFE_METHODS:
+            return CharactersResponse(self._send(method, path, auth, **kwargs))
+        # Ответ requests общий для объединенных запросов, а разобранное
+        # тело у каждого свое, чтобы изменения result не влияли на других
+        return CharactersResponse(self.single_flight.do(
+            (method, self.url, path, self.login if auth else None),
+            lambda: self._send(method, path, auth),
+        ))
+
+    def _send(
+            self,
+            method: str,
+            path: str,
+            auth: bool = True,
+            **kwargs: Any,
+    ) -> r.Response:
+        """
+        Метод, выполняющий запрос через сессию с авторизацией
+        или без неё и возвращающий ответ requests.
+        Перед каждой попыткой ожидает ограничитель частоты запросов,
+        неудачные попытки повторяются по правилам retry.
+        :param method - http-метод запроса.
+        :param path - путь эндпоинта относительно базового url.
+        :param auth - выполнять ли запрос авторизованным пользователем.
+        """
+        session = self._auth_session if auth else self._session
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 1
+        while True:
+            throttled = (
+                self.rate_limiter.acquire() if self.rate_limiter else 0.0
+            )
+            try:
+                response = self._attempt(
+                    session, method, path, attempt, throttled, **kwargs,
+                )
+            except r.RequestException as exc:
+                if not self.retry.should_retry(method, attempt, error=exc):
+                    raise
+                delay = self.retry.delay(attempt)
+            else:
+                if not self.retry.should_retry(
+                        method, attempt, status_code=response.status_code,
+                ):
+                    return response
+                delay = self.retry.delay(
+                    attempt, response.headers.get('Retry-After'),
+                )
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _attempt(
+            self,
+            session: r.Session,
+            method: str,
+            path: str,
+            attempt: int,
+            throttled: float,
+            **kwargs: Any,
+    ) -> r.Response:
+        """
+        Метод, выполняющий одну попытку запроса и передающий информацию
+        о ней в recorder.
+        :param attempt - номер попытки.
+        :param throttled - время ожидания ограничителя частоты.
+        """
+        if not self.recorder.active:
+            return session.request(method, f'{self.url}{path}', **kwargs)
+        reset_connect_timing()
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f'{self.url}{path}', **kwargs)
+        except r.RequestException as exc:
+            dns, connect = pop_connect_timing()
+            self.recorder.record(CallRecord(
+                method=method,
+                endpoint=path.split('?')[0],
+                status_code=None,
+                dns=dns,
+                connect=connect,
+                ttfb=0.0,
+                total=time.perf_counter() - started,
+                request_bytes=0,
+                response_bytes=0,
+                started_at=started_at,
+                error=type(exc).__name__,
+                attempt=attempt,
+                throttled=throttled,
+            ))
+            raise
+        total = time.perf_counter() - started
+        dns, connect = pop_connect_timing()
+        body = response.request.body or b''
+        self.recorder.record(CallRecord(
+            method=method,
+            endpoint=path.split('?')[0],
+            status_code=response.status_code,
+            dns=dns,
+            connect=connect,
+            # elapsed в requests - время до получения заголовков ответа,
+            # включая установку соединения
+            ttfb=max(response.elapsed.total_seconds() - dns - connect, 0.0),
+            total=total,
+            request_bytes=len(
+                body.encode() if isinstance(body, str) else body,
+            ),
+            # При потоковом чтении тело еще не получено
+            response_bytes=int(response.headers.get('Content-Length', 0))
+            if kwargs.get('stream') else len(response.content),
+            started_at=started_at,
+            attempt=attempt,
+            throttled=throttled,
+        ))
+        return response
+
+    def _mutate(
+            self,
+            mutation: CharacterMutation,
+            name: Optional[str],
+            method: str,
+            path: str,
+            **kwargs: Any,
+    ) -> CharactersResponse:
+        """
+        Метод, выполняющий авторизованный запрос, который меняет коллекцию,
+        и оповещающий об этом подписчиков.
+        :param mutation - тип изменения коллекции.
+        :param name - имя персонажа, которого касается изменение.
+        """
+        if self.single_flight is not None:
+            self.single_flight.forget()
+        try:
+            response = self._request(method, path, **kwargs)
+        except r.RequestException:
+            self._notify_mutation(mutation, name, None)
+            raise
+        finally:
+            # Запросы, начатые во время изменения, могли получить данные
+            # до него
+            if self.single_flight is not None:
+                self.single_flight.forget()
+        self._notify_mutation(mutation, name, response)
+        return response
+
+    def _notify_mutation(
+            self,
+            mutation: CharacterMutation,
+            name: Optional[str],
+            response: Optional[CharactersResponse],
+    ) -> None:
+        for listener in tuple(self._mutation_listeners):
+            listener(mutation, name, response)
 
-    def characters_get(self, auth: bool = True) -> r.Response:
+    def add_mutation_listener(self, listener: MutationListener) -> None:
+        """
+        Метод, подписывающий listener на авторизованные запросы,
+        которые меняют коллекцию (post, put, delete, reset).
+        """
+        self._mutation_listeners.append(listener)
+
+    def remove_mutation_listener(self, listener: MutationListener) -> None:
+        """Метод, отменяющий подписку listener на изменения коллекции."""
+        self._mutation_listeners.remove(listener)
+
+    def mount(self, prefix: str, adapter: BaseAdapter) -> None:
+        """
+        Метод, подключающий к обеим сессиям адаптер для url с префиксом
+        prefix (например, локальную замену сервиса вместо сети).
+        """
+        self._auth_session.mount(prefix, adapter)
+        self._session.mount(prefix, adapter)
+
+    def close(self) -> None:
+        """Метод, закрывающий http-сессии и их пулы соединений."""
+        self._auth_session.close()
+        self._session.close()
+
+    def characters_get(self, auth: bool = True) -> CharactersResponse:
         """
         Метод, выполняющий get запрос для получения данных о персонажах.
         :param auth - параметр в булевым типом данных, по умолчанию - True,
         т.e.выполняется запрос с авторизованным пользователем.
         """
-        url = f'{self.url}/characters'
-        res = r.get(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-        ) if auth else r.get(url=url)
-        return res
+        return self._request('GET', '/characters', auth=auth)
+
+    def characters_stream(
+            self,
+            auth: bool = True,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Character]:
+        """
+        Метод, выполняющий get запрос для получения данных о персонажах
+        и возвращающий персонажей по мере получения тела ответа.
+        Весь список персонажей в памяти не хранится.
+        При коде ответа, отличном от 2xx, выбрасывается requests.HTTPError.
+        :param auth - параметр в булевым типом данных, по умолчанию - True,
+        т.e.выполняется запрос с авторизованным пользователем.
+        :param chunk_size - размер куска тела ответа в байтах.
+        """
+        with self._send(
+                'GET', '/characters', auth=auth, stream=True,
+        ) as response:
+            response.raise_for_status()
+            yield from iter_characters(response.iter_content(chunk_size))
 
-    def character_get(self, name: str, auth: bool = True) -> r.Response:
+    def character_get(
+            self,
+            name: str,
+            auth: bool = True,
+    ) -> CharactersResponse:
         """
         Метод, выполняющий get запрос для получения данных о персонаже по его
         имени.
@@ -40,67 +359,87 @@ class CharactersController:
         :param auth - параметр в булевым типом данных, по умолчанию - True,
         т.e.выполняется запрос с авторизованным пользователем.
         """
-        url = f'{self.url}/character?name={name}'
-        res = r.get(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-        ) if auth else r.get(url=url)
-        return res
+        return self._request('GET', f'/character?name={name}', auth=auth)
+
+    def _character_body(
+            self,
+            character: CharacterBody,
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Метод, возвращающий имя персонажа и параметры запроса с телом.
+        Имя нужно только подписчикам на изменения коллекции.
+        """
+        name, body = encode_character(
+            character, with_name=bool(self._mutation_listeners),
+        )
+        return name, {'data': body, 'headers': JSON_HEADERS}
 
-    def character_post(self, character: Dict, auth: bool = True) -> r.Response:
+    def character_post(
+            self,
+            character: CharacterBody,
+            auth: bool = True,
+    ) -> CharactersResponse:
         """
         Метод, выполняющий post запрос для создания нового персонажа.
         :param character - тело запроса с информацией о персонаже
-        в формате dict.
+        в формате dict, модели Character (CharacterWithoutName,
+        CharacterWrongTypeModel), EncodedCharacter или json в bytes.
         :param auth - параметр в булевым типом данных, по умолчанию - True,
         т.e.выполняется запрос с авторизованным пользователем.
         """
-        url = f'{self.url}/character'
-        res = r.post(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-            json=character,
-        ) if auth else r.post(url=url)
-        return res
+        if not auth:
+            return self._request('POST', '/character', auth=False)
+        name, body = self._character_body(character)
+        return self._mutate(
+            CharacterMutation.CREATE, name, 'POST', '/character', **body,
+        )
 
-    def character_put(self, character: Dict, auth: bool = True) -> r.Response:
+    def character_put(
+            self,
+            character: CharacterBody,
+            auth: bool = True,
+    ) -> CharactersResponse:
         """
         Метод, выполняющий put запрос для обновления записи о персонаже.
         :param character - тело запроса с информацией о персонаже
-        в формате dict.
+        в формате dict, модели Character (CharacterWithoutName,
+        CharacterWrongTypeModel), EncodedCharacter или json в bytes.
         :param auth - параметр в булевым типом данных, по умолчанию - True,
         т.e.выполняется запрос с авторизованным пользователем.
         """
-        url = f'{self.url}/character'
-        res = r.put(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-            json=character,
-        ) if auth else r.put(url=url)
-        return res
+        if not auth:
+            return self._request('PUT', '/character', auth=False)
+        name, body = self._character_body(character)
+        return self._mutate(
+            CharacterMutation.UPDATE, name, 'PUT', '/character', **body,
+        )
 
-    def character_delete(self, name: str, auth: bool = True) -> r.Response:
+    def character_delete(
+            self,
+            name: str,
+            auth: bool = True,
+    ) -> CharactersResponse:
         """
         Метод, выполняющий delete запрос для удаления записи о персонаже.
         :param name - имя персонажа в формате str.
         :param auth - параметр в булевым типом данных, по умолчанию - True,
         т.e.выполняется запрос с авторизованным пользователем.
         """
-        url = f'{self.url}/character?name={name}'
-        res = r.delete(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-        ) if auth else r.delete(url=url)
-        return res
+        if not auth:
+            return self._request(
+                'DELETE', f'/character?name={name}', auth=False,
+            )
+        # Пробелы в имени могут быть переданы в url как "+"
+        return self._mutate(
+            CharacterMutation.DELETE, unquote_plus(name),
+            'DELETE', f'/character?name={name}',
+        )
 
-    def reset_post(self, auth: bool = True) -> r.Response:
+    def reset_post(self, auth: bool = True) -> CharactersResponse:
         """
         Метод, выполняющий post запрос для системы в дефолтное состояние
         (все добавленные данные удаляются).
         """
-        url = f'{self.url}/reset/'
-        res = r.post(
-            url=url,
-            auth=HTTPBasicAuth(self.login, self.password),
-        ) if auth else r.post(url=url)
-        return res
+        if not auth:
+            return self._request('POST', '/reset/', auth=False)
+        return self._mutate(CharacterMutation.RESET, None, 'POST', '/reset/')
@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+import requests as r
+
+from characters_controller.characters import CharactersController
+from characters_controller.enums import CharacterMutation, ErrorMessages
+from characters_controller.response import CharactersResponse
+
+DEFAULT_WORKERS = 10
+
+
+@dataclass
+class CleanupResult:
+    """Итоги очистки коллекции после теста."""
+    deleted: int = 0
+    # Персонажи, которых не удалось удалить
+    leftovers: List[str] = field(default_factory=list)
+    # Изменены записи, которые нельзя восстановить удалением
+    unknown_changes: bool = False
+    # Коллекция сброшена в дефолтное состояние
+    reset: bool = False
+
+    @property
+    def clean(self) -> bool:
+        """Восстановлено ли состояние коллекции."""
+        return self.reset or not (self.leftovers or self.unknown_changes)
+
+    def __str__(self) -> str:
+        parts = [f'deleted: {self.deleted}']
+        if self.leftovers:
+            parts.append(f'not deleted: {sorted(self.leftovers)}')
+        if self.unknown_changes:
+            parts.append('records changed that cannot be restored by deletion')
+        if self.reset:
+            parts.append('collection reset')
+        return ', '.join(parts)
+
+
+class CleanupRegistry:
+    def __init__(self, *, workers: int = DEFAULT_WORKERS) -> None:
+        """
+        Реестр персонажей, созданных во время теста.
+        Подписывается на изменения коллекции контроллера и после теста
+        удаляет только созданных персонажей вместо полного сброса БД.
+        Сброс выполняется, только если тест изменил записи, которые
+        нельзя восстановить удалением (изменил или удалил чужую запись,
+        результат запроса неизвестен), либо если удаление не удалось.
+        :param workers - количество потоков, параллельно удаляющих записи.
+        """
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._created: Set[str] = set()
+        self._dirty = False
+
+    def __call__(
+            self,
+            mutation: CharacterMutation,
+            name: Optional[str],
+            response: Optional[CharactersResponse],
+    ) -> None:
+        """Обработчик изменений коллекции контроллера."""
+        with self._lock:
+            if mutation is CharacterMutation.RESET:
+                if response is not None and response.status_code == 200:
+                    self._created.clear()
+                    self._dirty = False
+                elif response is None:
+                    self._dirty = True
+                return
+            if response is not None and 400 <= response.status_code < 500:
+                # Сервис отклонил запрос, коллекция не изменилась
+                return
+            if name is None:
+                self._dirty = True
+                return
+            if mutation is CharacterMutation.CREATE:
+                # При сетевой ошибке или ошибке сервера персонаж мог быть
+                # создан, удаление несуществующего безопасно
+                if response is None or response.status_code == 200 \
+                        or response.status_code >= 500:
+                    self._created.add(name)
+                return
+            if name not in self._created:
+                # Чужая запись изменена или могла быть изменена
+                if response is None or response.status_code == 200 \
+                        or response.status_code >= 500:
+                    self._dirty = True
+                return
+            # Свой персонаж остается в реестре, если неизвестно,
+            # удален ли он: удаление несуществующего безопасно
+            if mutation is CharacterMutation.DELETE \
+                    and response is not None and response.status_code == 200:
+                self._created.discard(name)
+
+    def keep(self) -> None:
+        """
+        Метод, оставляющий в коллекции персонажей, созданных к этому
+        моменту: при очистке они не удаляются.
+        """
+        with self._lock:
+            self._created.clear()
+
+    @property
+    def names(self) -> Set[str]:
+        """Имена персонажей, созданных с момента последней очистки."""
+        with self._lock:
+            return set(self._created)
+
+    @property
+    def dirty(self) -> bool:
+        """Требуется ли полный сброс коллекции для очистки."""
+        with self._lock:
+            return self._dirty
+
+    @staticmethod
+    def _delete(controller: CharactersController, name: str) -> bool:
+        """
+        Метод, удаляющий одного персонажа.
+        :return: True, если персонажа больше нет в коллекции.
+        """
+        try:
+            response = controller.character_delete(name=name)
+        except r.RequestException:
+            return False
+        return response.status_code == 200 or (
+            response.status_code == 400
+            and ErrorMessages.NO_SUCH_NAME.value in response.text
+        )
+
+    def cleanup(
+            self,
+            controller: CharactersController,
+            *,
+            reset: bool = True,
+    ) -> CleanupResult:
+        """
+        Метод, удаляющий созданных персонажей параллельными запросами.
+        Если набор изменений неизвестен или удаление не удалось,
+        коллекция сбрасывается в дефолтное состояние.
+        :param reset - можно ли сбрасывать коллекцию. Без сброса
+        оставшиеся записи только перечисляются в результате: сброс
+        нельзя выполнять, пока коллекцией пользуются другие (тесты других
+        воркеров, общий стенд).
+        """
+        with self._lock:
+            names = list(self._created)
+            result = CleanupResult(unknown_changes=self._dirty)
+        if not result.unknown_changes and names:
+            with ThreadPoolExecutor(
+                    max_workers=min(self.workers, len(names)),
+            ) as executor:
+                deleted = list(executor.map(
+                    lambda name: self._delete(controller, name), names,
+                ))
+            result.deleted = sum(deleted)
+            result.leftovers = [
+                name for name, ok in zip(names, deleted) if not ok
+            ]
+        elif result.unknown_changes:
+            result.leftovers = names
+        if reset and not result.clean:
+            result.reset = controller.reset_post().status_code == 200
+        with self._lock:
+            self._created.clear()
+            self._dirty = False
+        return result
@@ -1,6 +1,8 @@
-from typing import Any, Optional
+import json
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class Character(BaseModel):
@@ -44,3 +46,174 @@ class CharacterWrongTypeModel(BaseModel):
     other_aliases: Optional[int] = None
     universe: Optional[int] = None
     weight: Optional[float] = None
+
+
+class CharacterResponse(BaseModel):
+    """
+    Модель описывающая тело ответа с одним персонажем.
+    В ответе на PUT сервис возвращает персонажа списком из одной записи.
+    """
+    result: Character
+
+    @field_validator('result', mode='before')
+    @classmethod
+    def _unwrap_single(cls, value: Any) -> Any:
+        if isinstance(value, list) and len(value) == 1:
+            return value[0]
+        return value
+
+
+class CharactersListResponse(BaseModel):
+    """
+    Модель описывающая тело ответа со списком персонажей.
+    """
+    result: List[Character]
+
+
+class CharacterRecord:
+    """
+    Компактная запись о персонаже только для чтения.
+    Хранит те же поля, что и Character, но без валидации и без
+    накладных расходов модели pydantic: подходит для массового
+    чтения коллекции и сравнения записей.
+    """
+    __slots__ = tuple(Character.model_fields)
+
+    def __init__(
+            self,
+            *,
+            name: str,
+            education: Optional[str] = None,
+            height: Any = None,
+            identity: Optional[str] = None,
+            other_aliases: Optional[str] = None,
+            universe: Optional[str] = None,
+            weight: Any = None,
+    ) -> None:
+        _fill_record(self, {
+            'education': education,
+            'height': height,
+            'identity': identity,
+            'name': name,
+            'other_aliases': other_aliases,
+            'universe': universe,
+            'weight': weight,
+        }.get)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def _values(self) -> Tuple:
+        return _record_values(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CharacterRecord):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{field}={getattr(self, field)!r}' for field in self.__slots__
+        )
+        return f'{type(self).__name__}({fields})'
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.as_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        _fill_record(self, state.get)
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> 'CharacterRecord':
+        """
+        Метод, создающий запись из персонажа в том виде, в котором его
+        возвращает сервис. Поля, которых нет в модели, отбрасываются.
+        """
+        return _fill_record(object.__new__(cls), record.get)
+
+    @classmethod
+    def from_character(cls, character: Character) -> 'CharacterRecord':
+        """Метод, создающий запись из модели Character."""
+        return _fill_record(object.__new__(cls), character.__dict__.get)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Метод, возвращающий поля записи в виде dict."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def to_character(self) -> Character:
+        """Метод, возвращающий модель Character с теми же полями."""
+        return Character.model_validate(self.as_dict())
+
+
+_record_values = attrgetter(*CharacterRecord.__slots__)
+# Запись полей напрямую через дескрипторы слотов, в обход запрета
+# на изменение записи
+_RECORD_SETTERS = tuple(
+    (field, getattr(CharacterRecord, field).__set__)
+    for field in CharacterRecord.__slots__
+)
+
+
+def _fill_record(
+        record: CharacterRecord,
+        get: Callable[[str], Any],
+) -> CharacterRecord:
+    for field, set_field in _RECORD_SETTERS:
+        set_field(record, get(field))
+    return record
+
+
+class EncodedCharacter:
+    """
+    Тело запроса персонажа, заранее сериализованное в json.
+    Имя хранится отдельно, чтобы не разбирать тело запроса повторно.
+    """
+    __slots__ = ('name', 'body')
+
+    def __init__(self, name: Optional[str], body: bytes) -> None:
+        self.name = name
+        self.body = body
+
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Тело запроса персонажа: dict, модель pydantic, заранее
+# сериализованное тело с именем или json в байтах
+CharacterBody = Union[Dict, BaseModel, EncodedCharacter, bytes]
+
+
+def encode_character(
+        character: CharacterBody,
+        with_name: bool = True,
+) -> Tuple[Optional[str], bytes]:
+    """
+    Метод, возвращающий имя персонажа и тело запроса в json.
+    Модели сериализуются model_dump_json (pydantic-core) без
+    промежуточного dict, EncodedCharacter и bytes отправляются как есть.
+    :param with_name - нужно ли имя персонажа. Для bytes имя
+    получается разбором тела, поэтому без необходимости не ищется.
+    """
+    if isinstance(character, EncodedCharacter):
+        return character.name, character.body
+    if isinstance(character, BaseModel):
+        return (
+            getattr(character, 'name', None),
+            character.model_dump_json().encode(),
+        )
+    if isinstance(character, bytes):
+        name = None
+        if with_name:
+            try:
+                data = json.loads(character)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                name = data.get('name')
+        return name, character
+    return character.get('name'), json.dumps(character).encode()
@@ -21,3 +21,11 @@ class ServiceDBLimits(Enum):
     STRING_FIELD_DATA_LIMIT = 350
     MAX_DB_RECORDS = 500
     DEFAULT_DB_RECORD = 302
+
+
+class CharacterMutation(Enum):
+    """Операции контроллера, меняющие состояние коллекции персонажей"""
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    RESET = 'reset'
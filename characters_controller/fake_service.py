@@ -0,0 +1,394 @@
+"""
+Локальная замена сервиса Characters (/v2/character, /v2/characters,
+/v2/reset) для быстрого запуска тестов без сети.
+Повторяет поведение сервиса, на которое опираются тесты: basic-авторизацию,
+ограничение длины строковых полей, ограничение размера коллекции,
+дефолтный набор записей, тексты ErrorMessages и вид ответов (ошибки -
+строкой, в том числе ошибки валидации полей, результат PUT - списком).
+
+Сервис можно подключить к контроллерам без сокетов (FakeServiceAdapter,
+FakeServiceAsyncTransport) или запустить http-сервером на localhost:
+python -m characters_controller.fake_service --port 8000
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import requests as r
+from requests.adapters import BaseAdapter
+
+from characters_controller.enums import ErrorMessages, ServiceDBLimits
+from characters_controller.transport import build_response
+
+FAKE_BASE_URL = 'http://fake-characters.local/v2'
+FAKE_LOGIN = 'fake@example.com'
+FAKE_PASSWORD = 'fake-password'
+
+API_PREFIX = '/v2'
+STRING_FIELDS = ('education', 'identity', 'name', 'other_aliases', 'universe')
+NUMBER_FIELDS = ('height', 'weight')
+FIELDS = tuple(sorted(STRING_FIELDS + NUMBER_FIELDS))
+
+_FIRST_NAMES = (
+    'Abe', 'Red', 'Black', 'Silver', 'Iron', 'Captain', 'Doctor', 'Night',
+    'Blue', 'Golden', 'Shadow', 'Storm', 'Crimson', 'White', 'Green',
+    'Dark', 'Steel', 'Scarlet', 'Thunder', 'Ghost',
+)
+_LAST_NAMES = (
+    'Brown', 'Ghost', 'Widow', 'Surfer', 'Fist', 'Marvel', 'Strange',
+    'Hawk', 'Falcon', 'Knight', 'Cat', 'Wolf', 'Panther', 'Raven', 'Arrow',
+    'Lantern', 'Witch', 'Hammer', 'Wasp', 'Spider',
+)
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def default_records() -> List[Dict[str, Any]]:
+    """
+    Метод, возвращающий дефолтный набор записей коллекции.
+    Набор детерминирован, имена содержат пробелы, как у реального сервиса.
+    """
+    rng = random.Random(ServiceDBLimits.DEFAULT_DB_RECORD.value)
+    names = [
+        f'{first} {last}' for first in _FIRST_NAMES for last in _LAST_NAMES
+    ]
+    rng.shuffle(names)
+    return [
+        {
+            'education': rng.choice(('Unrevealed', 'High school', 'PhD')),
+            'height': rng.choice((None, rng.randint(150, 220))),
+            'identity': rng.choice(('Secret', 'Publicly known')),
+            'name': name,
+            'other_aliases': 'None',
+            'universe': rng.choice(('Marvel Universe', 'Earth-616')),
+            'weight': rng.choice((None, round(rng.uniform(40, 150), 2))),
+        }
+        for name in names[:ServiceDBLimits.DEFAULT_DB_RECORD.value]
+    ]
+
+
+def _json(status_code: int, data: Any) -> Response:
+    return (
+        status_code,
+        {'Content-Type': 'application/json'},
+        json.dumps(data).encode(),
+    )
+
+
+def _error(status_code: int, error: str) -> Response:
+    return _json(status_code, {'error': error})
+
+
+def _format_errors(errors: Dict[str, List[str]]) -> str:
+    """
+    Метод, возвращающий ошибки валидации в виде, в котором их
+    возвращает сервис: "name: ['Missing data for required field.']".
+    """
+    return ', '.join(
+        f'{field}: {messages!r}' for field, messages in errors.items()
+    )
+
+
+class FakeCharactersService:
+    def __init__(
+            self,
+            *,
+            login: str = FAKE_LOGIN,
+            password: str = FAKE_PASSWORD,
+    ) -> None:
+        """
+        Состояние и логика локальной замены сервиса.
+        Не зависит от способа доставки запросов, безопасна для вызова
+        из нескольких потоков.
+        :param login - логин для basic-авторизации.
+        :param password - пароль для basic-авторизации.
+        """
+        self._credentials = 'Basic ' + base64.b64encode(
+            f'{login}:{password}'.encode(),
+        ).decode()
+        self._defaults = default_records()
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Метод, возвращающий коллекцию в дефолтное состояние."""
+        with self._lock:
+            self._records = {
+                record['name']: dict(record) for record in self._defaults
+            }
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def _validate(
+            body: bytes,
+    ) -> Tuple[Optional[Dict], Dict[str, List[str]]]:
+        """
+        Метод, проверяющий тело запроса персонажа.
+        :return: запись о персонаже и ошибки валидации по полям.
+        """
+        try:
+            data = json.loads(body or b'null')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return None, {'_schema': ['Invalid input type.']}
+        errors = {}
+        limit = ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value
+        for field in STRING_FIELDS:
+            value = data.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                errors[field] = [ErrorMessages.NOT_A_VALID_STRING.value]
+            elif not 1 <= len(value) <= limit:
+                errors[field] = [ErrorMessages.FIELD_MAX_LENGTH.value]
+        for field in NUMBER_FIELDS:
+            value = data.get(field)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                try:
+                    data[field] = float(value)
+                except (TypeError, ValueError):
+                    errors[field] = [ErrorMessages.NOT_A_VALID_NUMBER.value]
+        if data.get('name') is None:
+            errors['name'] = [ErrorMessages.MISSING_REQUIRED_FIELD.value]
+        return {field: data.get(field) for field in FIELDS}, errors
+
+    def handle(
+            self,
+            method: str,
+            path: str,
+            query: str,
+            headers: Mapping[str, str],
+            body: bytes,
+    ) -> Response:
+        """
+        Метод, обрабатывающий один http-запрос.
+        :return: код ответа, заголовки и тело ответа.
+        """
+        if not path.startswith(API_PREFIX):
+            return _error(404, 'Not found')
+        endpoint = path[len(API_PREFIX):].rstrip('/')
+        routes = {
+            '/characters': ('GET',),
+            '/character': ('GET', 'POST', 'PUT', 'DELETE'),
+            '/reset': ('POST',),
+        }
+        if endpoint not in routes:
+            return _error(404, 'Not found')
+        if method not in routes[endpoint]:
+            return _error(405, 'Method not allowed')
+        if headers.get('Authorization') != self._credentials:
+            return _error(401, ErrorMessages.UNAUTHORIZED.value)
+        with self._lock:
+            if endpoint == '/characters':
+                return _json(200, {'result': list(self._records.values())})
+            if endpoint == '/reset':
+                self._records = {
+                    record['name']: dict(record) for record in self._defaults
+                }
+                return _json(200, {'result': 'Collection was reset'})
+            if method in ('GET', 'DELETE'):
+                name = parse_qs(query).get('name', [''])[0]
+                if name not in self._records:
+                    return _error(400, ErrorMessages.NO_SUCH_NAME.value)
+                if method == 'GET':
+                    return _json(200, {'result': self._records[name]})
+                del self._records[name]
+                return _json(200, {'result': f'Hero {name} is deleted'})
+            record, errors = self._validate(body)
+            if errors:
+                return _error(400, _format_errors(errors))
+            name = record['name']
+            if method == 'PUT':
+                if name not in self._records:
+                    return _error(400, ErrorMessages.NO_SUCH_NAME.value)
+            elif name in self._records:
+                return _error(
+                    400, f'{name} {ErrorMessages.ALREADY_EXIST.value}',
+                )
+            elif len(self._records) >= ServiceDBLimits.MAX_DB_RECORDS.value:
+                return _error(400, ErrorMessages.MORE_THAN_500_ITEMS.value)
+            self._records[name] = record
+            if method == 'PUT':
+                # Сервис возвращает измененную запись списком
+                return _json(200, {'result': [record]})
+            return _json(200, {'result': record})
+
+
+class FakeServiceAdapter(BaseAdapter):
+    def __init__(self, service: FakeCharactersService) -> None:
+        """
+        Адаптер requests, передающий запросы в локальную замену сервиса
+        в том же процессе, без сокетов.
+        """
+        super().__init__()
+        self.service = service
+
+    def send(
+            self,
+            request: r.PreparedRequest,
+            stream: bool = False,
+            timeout: Any = None,
+            verify: Any = True,
+            cert: Any = None,
+            proxies: Any = None,
+    ) -> r.Response:
+        url = urlsplit(request.url)
+        body = request.body or b''
+        status_code, headers, content = self.service.handle(
+            request.method,
+            url.path,
+            url.query,
+            request.headers,
+            body.encode() if isinstance(body, str) else body,
+        )
+        return build_response(request, status_code, headers, content)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeServiceAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, service: FakeCharactersService) -> None:
+        """
+        Транспорт httpx, передающий запросы асинхронного контроллера
+        в локальную замену сервиса в том же процессе.
+        """
+        self.service = service
+
+    async def handle_async_request(
+            self,
+            request: httpx.Request,
+    ) -> httpx.Response:
+        status_code, headers, content = self.service.handle(
+            request.method,
+            request.url.path,
+            request.url.query.decode(),
+            request.headers,
+            await request.aread(),
+        )
+        return httpx.Response(status_code, headers=headers, content=content)
+
+
+class _FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело ответа отправляются одним пакетом после запроса,
+    # иначе на keep-alive соединении ответ задерживается алгоритмом
+    # Нейгла и отложенным ACK (~40 мс на запрос)
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    service: FakeCharactersService
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        status_code, headers, content = self.service.handle(
+            self.command,
+            url.path,
+            url.query,
+            self.headers,
+            self.rfile.read(length),
+        )
+        self.send_response(status_code)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class FakeServiceServer:
+    def __init__(
+            self,
+            service: Optional[FakeCharactersService] = None,
+            *,
+            host: str = '127.0.0.1',
+            port: int = 0,
+    ) -> None:
+        """
+        Http-сервер локальной замены сервиса, работающий в фоновом потоке.
+        :param port - порт сервера, 0 - любой свободный порт.
+        """
+        self.service = service or FakeCharactersService()
+        handler = type(
+            'FakeServiceHandler',
+            (_FakeServiceHandler,),
+            {'service': self.service},
+        )
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Базовый url сервиса для контроллеров."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{API_PREFIX}'
+
+    def serve_forever(self) -> None:
+        """
+        Метод, обслуживающий запросы в текущем потоке до прерывания
+        и закрывающий сервер после этого.
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> 'FakeServiceServer':
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeServiceServer':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--login', default=FAKE_LOGIN)
+    parser.add_argument('--password', default=FAKE_PASSWORD)
+    options = parser.parse_args(args)
+    server = FakeServiceServer(
+        FakeCharactersService(login=options.login, password=options.password),
+        host=options.host,
+        port=options.port,
+    )
+    print(f'Serving {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
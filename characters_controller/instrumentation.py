@@ -0,0 +1,167 @@
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+
+@dataclass
+class CallRecord:
+    """
+    Информация об одном запросе контроллера.
+    Время указано в секундах. dns и connect равны нулю, если запрос
+    ушел по уже открытому keep-alive соединению.
+    ttfb - время от отправки запроса до получения заголовков ответа.
+    total - полное время вызова, включая чтение тела ответа.
+    attempt - номер попытки (больше 1 у повторов запроса).
+    throttled - время ожидания ограничителя частоты перед попыткой.
+    """
+    method: str
+    endpoint: str
+    status_code: Optional[int]
+    dns: float
+    connect: float
+    ttfb: float
+    total: float
+    request_bytes: int
+    response_bytes: int
+    started_at: float
+    error: Optional[str] = None
+    attempt: int = 1
+    throttled: float = 0.0
+
+
+CallListener = Callable[[CallRecord], None]
+
+
+class CallRecorder:
+    def __init__(self) -> None:
+        """
+        Точка сбора информации о запросах.
+        Контроллеры передают сюда записи о каждом запросе, подписчики
+        (например, плагин отчета о времени тестов) их обрабатывают.
+        """
+        self._listeners: List[CallListener] = []
+
+    def subscribe(self, listener: CallListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: CallListener) -> None:
+        self._listeners.remove(listener)
+
+    @property
+    def active(self) -> bool:
+        """Есть ли подписчики, которым нужны записи."""
+        return bool(self._listeners)
+
+    def record(self, call: CallRecord) -> None:
+        for listener in tuple(self._listeners):
+            listener(call)
+
+
+# Общая точка сбора для всех контроллеров процесса
+default_recorder = CallRecorder()
+
+_connect_timing = threading.local()
+
+
+def reset_connect_timing() -> None:
+    """
+    Метод, обнуляющий время установки соединений текущего потока.
+    Вызывается перед запросом.
+    """
+    _connect_timing.dns = 0.0
+    _connect_timing.connect = 0.0
+
+
+def pop_connect_timing() -> Tuple[float, float]:
+    """
+    Метод, возвращающий время разрешения имени и установки соединения,
+    накопленное текущим потоком с последнего обнуления.
+    """
+    timing = (
+        getattr(_connect_timing, 'dns', 0.0),
+        getattr(_connect_timing, 'connect', 0.0),
+    )
+    reset_connect_timing()
+    return timing
+
+
+class _TimedConnectionMixin:
+    """
+    Соединение urllib3, замеряющее время разрешения имени хоста
+    и установки соединения (включая TLS).
+    Имя разрешается один раз, затем адреса перебираются по очереди,
+    как это делает urllib3.
+    """
+    _dns_time = 0.0
+
+    def _new_conn(self) -> socket.socket:
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(
+                self._dns_host, self.port, 0, socket.SOCK_STREAM,
+            )
+        except OSError:
+            # Ошибку разрешения имени сформирует urllib3
+            return super()._new_conn()
+        self._dns_time = time.perf_counter() - started
+        dns_host = self._dns_host
+        error: Optional[Exception] = None
+        for address in dict.fromkeys(info[4][0] for info in addresses):
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (ConnectTimeoutError, NewConnectionError) as exc:
+                error = exc
+            finally:
+                self._dns_host = dns_host
+        raise error
+
+    def connect(self) -> None:
+        started = time.perf_counter()
+        self._dns_time = 0.0
+        try:
+            super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            _connect_timing.dns = \
+                getattr(_connect_timing, 'dns', 0.0) + self._dns_time
+            _connect_timing.connect = \
+                getattr(_connect_timing, 'connect', 0.0) \
+                + elapsed - self._dns_time
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    Адаптер requests, пулы которого создают соединения с замером
+    времени разрешения имени и установки соединения.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,128 @@
+import json
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+import requests as r
+
+from characters_controller.dataclass import (
+    Character,
+    CharacterRecord,
+    CharacterResponse,
+    CharactersListResponse,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    # httpx нужен только асинхронному контроллеру
+    import httpx
+
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """
+    Метод, разбирающий json тела ответа.
+    Если установлен orjson, разбор выполняется им, иначе - модулем json.
+    Ошибки разбора в обоих случаях - наследники ValueError.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class CharactersResponse:
+    def __init__(
+            self,
+            response: Union[r.Response, 'httpx.Response'],
+    ) -> None:
+        """
+        Ответ сервиса Characters.
+        Тело ответа разбирается только при первом обращении к json(),
+        result, error_text или моделям, результат разбора кэшируется.
+        Остальные атрибуты (status_code, text, headers и т.д.) берутся
+        из исходного ответа requests или httpx.
+        """
+        self.response = response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    def __repr__(self) -> str:
+        return f'<CharactersResponse [{self.status}]>'
+
+    @property
+    def status(self) -> int:
+        """Код ответа."""
+        return self.response.status_code
+
+    @cached_property
+    def _json(self) -> Any:
+        return loads(self.response.content)
+
+    def json(self) -> Any:
+        """Тело ответа, разобранное из json."""
+        return self._json
+
+    @property
+    def result(self) -> Any:
+        """Значение поля result тела ответа (None, если его нет)."""
+        data = self._json
+        return data.get('result') if isinstance(data, dict) else None
+
+    @property
+    def record(self) -> Optional[Dict[str, Any]]:
+        """
+        Запись о персонаже из поля result. В ответе на PUT сервис
+        возвращает ее списком из одной записи, в остальных - словарем.
+        """
+        result = self.result
+        if isinstance(result, list) and len(result) == 1:
+            result = result[0]
+        return result if isinstance(result, dict) else None
+
+    @cached_property
+    def error_text(self) -> Optional[str]:
+        """
+        Текст ошибки из поля error тела ответа (сервис возвращает
+        строку, ошибки валидации - в виде "поле: ['сообщение']").
+        Ошибка другого вида возвращается в виде json. Если тело ответа
+        не json - текст ответа, если ошибки нет - None.
+        """
+        try:
+            data = self._json
+        except ValueError:
+            return self.response.text or None
+        if not isinstance(data, dict) or 'error' not in data:
+            return None
+        error = data['error']
+        if isinstance(error, str):
+            return error
+        return json.dumps(error, ensure_ascii=False)
+
+    def character(self) -> Character:
+        """
+        Метод, возвращающий персонажа из тела ответа.
+        Модель валидируется напрямую из байтов тела ответа,
+        без промежуточного разбора в dict.
+        """
+        return CharacterResponse.model_validate_json(
+            self.response.content,
+        ).result
+
+    def characters(self) -> List[Character]:
+        """
+        Метод, возвращающий список персонажей из тела ответа.
+        Модели валидируются напрямую из байтов тела ответа.
+        """
+        return CharactersListResponse.model_validate_json(
+            self.response.content,
+        ).result
+
+    def records(self) -> List[CharacterRecord]:
+        """
+        Метод, возвращающий список персонажей из тела ответа в виде
+        компактных записей без валидации (для массового чтения коллекции).
+        """
+        return [CharacterRecord.from_dict(record) for record in self.result]
@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+from weakref import WeakKeyDictionary, ref
+
+from characters_controller.characters import CharactersController
+from characters_controller.enums import CharacterMutation
+from characters_controller.response import CharactersResponse
+
+DEFAULT_TTL = 60.0
+
+
+class CharactersSnapshot:
+    def __init__(self, records: List[Dict]) -> None:
+        """
+        Снимок коллекции персонажей.
+        Хранит записи по имени и отдельный список имен с индексом позиций,
+        чтобы выбирать случайное имя, добавлять и удалять записи за O(1).
+        :param records - записи коллекции в том виде, в котором их
+        возвращает сервис.
+        """
+        self.fetched_at = time.monotonic()
+        self.records: Dict[str, Dict] = {}
+        self._names: List[str] = []
+        self._positions: Dict[str, int] = {}
+        for record in records:
+            self.put(record)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def put(self, record: Dict) -> None:
+        """Метод, добавляющий или заменяющий запись о персонаже."""
+        name = record['name']
+        if name not in self._positions:
+            self._positions[name] = len(self._names)
+            self._names.append(name)
+        self.records[name] = record
+
+    def remove(self, name: str) -> None:
+        """
+        Метод, удаляющий запись о персонаже.
+        Последнее имя списка переносится на место удаленного.
+        """
+        position = self._positions.pop(name, None)
+        if position is None:
+            return
+        last = self._names.pop()
+        if last != name:
+            self._names[position] = last
+            self._positions[last] = position
+        del self.records[name]
+
+    def random_name(self, rng: random.Random = random) -> str:
+        """Метод, возвращающий имя случайного персонажа из снимка."""
+        return rng.choice(self._names)
+
+
+class CharactersSnapshotCache:
+    def __init__(
+            self,
+            controller: CharactersController,
+            *,
+            ttl: float = DEFAULT_TTL,
+    ) -> None:
+        """
+        Кэш снимка коллекции персонажей.
+        Снимок запрашивается у сервиса не чаще, чем раз в ttl секунд.
+        Изменения, выполненные через контроллер, применяются к снимку
+        сразу, сброс коллекции или неизвестный результат запроса
+        делают снимок недействительным.
+        Изменения, сделанные в обход контроллера (другими процессами),
+        становятся видны после истечения ttl.
+        :param ttl - время жизни снимка в секундах.
+        """
+        # Кэш хранится в WeakKeyDictionary по контроллеру, поэтому
+        # не должен удерживать контроллер сильной ссылкой
+        self._controller = ref(controller)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CharactersSnapshot] = None
+        # Номер последнего изменения коллекции: снимок, запрошенный
+        # до изменения, которое пришло во время запроса, не сохраняется
+        self._generation = 0
+        controller.add_mutation_listener(self._on_mutation)
+
+    @property
+    def controller(self) -> CharactersController:
+        return self._controller()
+
+    @classmethod
+    def for_controller(
+            cls,
+            controller: CharactersController,
+    ) -> 'CharactersSnapshotCache':
+        """Метод, возвращающий общий кэш снимка для контроллера."""
+        with _caches_lock:
+            cache = _caches.get(controller)
+            if cache is None:
+                cache = _caches[controller] = cls(controller)
+            return cache
+
+    def get(self) -> CharactersSnapshot:
+        """
+        Метод, возвращающий актуальный снимок коллекции.
+        Запрашивает коллекцию у сервиса, если снимка нет или он устарел.
+        Если во время запроса коллекция изменилась через контроллер,
+        снимок возвращается, но не сохраняется: изменение могло в него
+        не попасть.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None \
+                    and time.monotonic() - snapshot.fetched_at < self.ttl:
+                return snapshot
+            generation = self._generation
+        snapshot = CharactersSnapshot(
+            self.controller.characters_get().result,
+        )
+        with self._lock:
+            if self._generation == generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def refresh(self) -> CharactersSnapshot:
+        """
+        Метод, запрашивающий коллекцию у сервиса независимо от возраста
+        снимка и сохраняющий ее как актуальный снимок.
+        """
+        with self._lock:
+            self._snapshot = None
+        return self.get()
+
+    def records(self, refresh: bool = False) -> Dict[str, Dict]:
+        """
+        Метод, возвращающий копию записей актуального снимка по имени.
+        Копия не меняется при последующих изменениях коллекции.
+        :param refresh - запросить ли коллекцию у сервиса, даже если
+        снимок еще не устарел.
+        """
+        snapshot = self.refresh() if refresh else self.get()
+        with self._lock:
+            return dict(snapshot.records)
+
+    def invalidate(self) -> None:
+        """Метод, сбрасывающий снимок коллекции."""
+        with self._lock:
+            self._snapshot = None
+
+    def random_name(self, rng: random.Random = random) -> str:
+        """Метод, возвращающий имя случайного существующего персонажа."""
+        snapshot = self.get()
+        with self._lock:
+            return snapshot.random_name(rng)
+
+    def _on_mutation(
+            self,
+            mutation: CharacterMutation,
+            name: Optional[str],
+            response: Optional[CharactersResponse],
+    ) -> None:
+        """Обработчик изменений коллекции контроллера."""
+        with self._lock:
+            self._generation += 1
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            if response is None or response.status_code >= 500 \
+                    or mutation is CharacterMutation.RESET:
+                self._snapshot = None
+                return
+            if response.status_code != 200:
+                return
+            if mutation is CharacterMutation.DELETE:
+                snapshot.remove(name)
+                return
+            try:
+                record = response.record
+            except ValueError:
+                record = None
+            if record is None or 'name' not in record:
+                self._snapshot = None
+                return
+            snapshot.put(record)
+
+
+_caches_lock = threading.Lock()
+_caches: 'WeakKeyDictionary[CharactersController, CharactersSnapshotCache]' \
+    = WeakKeyDictionary()
@@ -0,0 +1,84 @@
+import re
+from typing import Iterable, Iterator, List
+
+from characters_controller.dataclass import Character
+
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+# Символы, меняющие состояние разбора. Внутри строк значимы только
+# кавычка и обратный слеш, поэтому остальные байты пропускаются regex-ом
+_TOKENS = re.compile(rb'["\\{}\[\]]')
+_OPEN = frozenset(b'{[')
+
+
+class CharactersStreamParser:
+    def __init__(self) -> None:
+        """
+        Инкрементальный разборщик тела ответа вида
+        {"result": [{...}, {...}, ...]}.
+        Принимает тело ответа кусками произвольной длины и возвращает
+        байты каждой записи списка, как только запись получена целиком.
+        В памяти хранится только текущая незавершенная запись.
+        """
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._record = bytearray()
+        self._in_record = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Метод, принимающий очередной кусок тела ответа.
+        :return: байты записей, завершившихся в этом куске.
+        """
+        records = []
+        start = 0
+        position = 0
+        if self._escape and chunk:
+            # Экранированный символ пришел в начале нового куска
+            self._escape = False
+            position = 1
+        for match in _TOKENS.finditer(chunk, position):
+            index = match.start()
+            if index < position:
+                continue
+            token = chunk[index]
+            if self._in_string:
+                if token == 0x5C:  # \
+                    if index + 1 < len(chunk):
+                        position = index + 2
+                    else:
+                        self._escape = True
+                elif token == 0x22:  # "
+                    self._in_string = False
+                continue
+            if token == 0x22:
+                self._in_string = True
+            elif token in _OPEN:
+                # Записи - объекты внутри списка верхнего объекта
+                if self._depth == 2 and token == 0x7B:
+                    self._in_record = True
+                    start = index
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._in_record and self._depth == 2:
+                    self._record += chunk[start:index + 1]
+                    records.append(bytes(self._record))
+                    self._record.clear()
+                    self._in_record = False
+        if self._in_record:
+            self._record += chunk[start:]
+        return records
+
+
+def iter_characters(chunks: Iterable[bytes]) -> Iterator[Character]:
+    """
+    Метод, возвращающий персонажей из тела ответа по мере его получения.
+    Каждая запись валидируется напрямую из байтов.
+    :param chunks - куски тела ответа, например response.iter_content().
+    """
+    parser = CharactersStreamParser()
+    for chunk in chunks:
+        for record in parser.feed(chunk):
+            yield Character.model_validate_json(record)
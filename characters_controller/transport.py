@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import requests as r
+from requests.structures import CaseInsensitiveDict
+
+# Таймауты установки соединения и чтения ответа в секундах
+Timeout = Union[float, Tuple[float, float], None]
+
+DEFAULT_TIMEOUT = (5.0, 30.0)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.1
+DEFAULT_MAX_DELAY = 10.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Методы, запросы которых можно объединять: они не меняют данные
+SAFE_METHODS = frozenset({'GET', 'HEAD'})
+# Сетевые ошибки, после которых запрос можно повторить. Остальные
+# ошибки requests (например, промах кассеты) не повторяются
+RETRY_ERRORS = (r.ConnectionError, r.Timeout)
+
+T = TypeVar('T')
+
+
+def build_response(
+        request: r.PreparedRequest,
+        status_code: int,
+        headers: Mapping[str, str],
+        body: bytes,
+) -> r.Response:
+    """
+    Метод, собирающий ответ requests без сетевого соединения.
+    Используется адаптерами, которые отвечают на запросы сами
+    (локальная замена сервиса, воспроизведение записанных ответов).
+    Тело ответа можно читать как целиком, так и потоком.
+    """
+    response = r.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.raw = BytesIO(body)
+    response.url = request.url
+    response.request = request
+    response.encoding = r.utils.get_encoding_from_headers(response.headers)
+    response.reason = 'OK' if status_code < 400 else 'ERROR'
+    return response
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Метод, возвращающий паузу в секундах из заголовка Retry-After
+    (количество секунд или http-дата), None - если заголовка нет
+    или он некорректен.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Правила повтора запросов контроллера.
+    Идемпотентные методы повторяются после сетевой ошибки, таймаута
+    или ответа с кодом из statuses. Остальные (POST) - только если
+    сервис точно не выполнил запрос: соединение не установлено
+    или ответ 429.
+    Пауза перед повтором - экспоненциальная с полным джиттером
+    (от 0 до backoff * 2^(попытка - 1), не больше max_delay),
+    либо из заголовка Retry-After, если сервис его прислал.
+    """
+    retries: int = DEFAULT_RETRIES
+    backoff: float = DEFAULT_BACKOFF
+    max_delay: float = DEFAULT_MAX_DELAY
+    statuses: FrozenSet[int] = RETRY_STATUSES
+    methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def should_retry(
+            self,
+            method: str,
+            attempt: int,
+            *,
+            status_code: Optional[int] = None,
+            error: Optional[Exception] = None,
+    ) -> bool:
+        """
+        Метод, определяющий, нужно ли повторить запрос после попытки
+        attempt (нумерация с 1), закончившейся ответом с кодом
+        status_code или ошибкой error.
+        """
+        if attempt > self.retries:
+            return False
+        if error is not None:
+            return isinstance(error, RETRY_ERRORS) and (
+                method in self.methods or isinstance(error, r.ConnectTimeout)
+            )
+        return status_code in self.statuses and (
+            method in self.methods or status_code == 429
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Метод, возвращающий паузу в секундах перед повтором после
+        попытки attempt.
+        :param retry_after - значение заголовка Retry-After ответа.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.rng.uniform(0, self.backoff * 2 ** (attempt - 1))
+        return min(delay, self.max_delay)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        """
+        Ограничитель частоты запросов на стороне клиента.
+        Корзина пополняется rate токенами в секунду и вмещает не больше
+        burst токенов, каждый запрос забирает один токен.
+        Один ограничитель можно использовать в нескольких контроллерах
+        и потоках.
+        :param rate - допустимое количество запросов в секунду.
+        :param burst - количество запросов, которые можно выполнить
+        подряд без ожидания (по умолчанию - rate, но не меньше 1).
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+        self.rate = rate
+        self.capacity = float(burst or max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Метод, забирающий токен и при необходимости ожидающий его
+        появления.
+        :return: время ожидания в секундах.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            # Токен резервируется сразу, поэтому потоки ждут
+            # каждый своей очереди, не мешая друг другу
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class _Flight:
+    """Выполняющийся запрос и его результат для ожидающих потоков."""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Объединитель одинаковых одновременных запросов.
+        Пока запрос с ключом выполняется, потоки с тем же ключом
+        не отправляют свой, а ждут и получают его результат или ошибку.
+        Готовые результаты не кэшируются: следующий запрос после
+        завершения текущего снова идет в сервис.
+        Один объединитель можно использовать в нескольких контроллерах
+        и потоках.
+        """
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        # Количество запросов, получивших результат чужого запроса
+        self.coalesced = 0
+
+    def do(self, key: Hashable, call: Callable[[], T]) -> T:
+        """
+        Метод, выполняющий call, если запрос с ключом key еще не
+        выполняется, иначе ожидающий результат выполняющегося запроса.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = call()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def forget(self) -> None:
+        """
+        Метод, после которого новые запросы не присоединяются к уже
+        выполняющимся. Вызывается при изменении данных: ответ,
+        запрошенный до изменения, не должен достаться запросу,
+        отправленному после него.
+        """
+        with self._lock:
+            self._flights.clear()
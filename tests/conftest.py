@@ -1,72 +1,210 @@
+from typing import TYPE_CHECKING
+
 import pytest
 
 from characters_controller.characters import CharactersController
+from characters_controller.cleanup import CleanupRegistry
 from characters_controller.enums import ServiceDBLimits
-from utilities.utils import (
-    create_new_character_data_with_required_field,
-    get_random_float,
-    get_random_string_with_letters_digits,
+from utilities.diff import CollectionWatcher
+from utilities.payload_pool import PayloadPool
+from utilities.seeding import CharactersSeeder
+from utilities.utils import get_character_name_namespace
+
+if TYPE_CHECKING:
+    from characters_controller.async_characters import (
+        AsyncCharactersController,
+    )
+    from tests.plugins.service import ServiceConnection
+
+# Модули плагинов импортируются внутри фикстур: при импорте conftest.py
+# до регистрации плагинов pytest не смог бы переписать их assert
+pytest_plugins = (
+    'tests.plugins.asyncio_runner',
+    'tests.plugins.history',
+    'tests.plugins.parallel',
+    'tests.plugins.scheduler',
+    'tests.plugins.service',
+    'tests.plugins.timing_report',
 )
 
-from vars import envars
 
+@pytest.fixture(scope='session')
+def characters(
+        service_connection: 'ServiceConnection',
+) -> CharactersController:
+    """
+    Фикстура, вызывающая экземпляр класса Characters.
+    Экземпляр один на всю сессию, чтобы пул соединений переиспользовался
+    всеми тестами; после сессии соединения закрываются.
+    """
+    from tests.plugins.parallel import is_parallel_run
 
-@pytest.fixture()
-def characters() -> CharactersController:
-    """Фикстура, вызывающая экземпляр класса Characters"""
-    return CharactersController(
-        base_url=envars.SERVICE_BASE_URL,
-        user_login=envars.SERVICE_LOGIN,
-        user_password=envars.SERVICE_PASSWORD,
+    with CharactersController(
+        base_url=service_connection.base_url,
+        user_login=service_connection.login,
+        user_password=service_connection.password,
+        retry=service_connection.retry,
+        rate_limiter=service_connection.rate_limiter,
+        single_flight=service_connection.single_flight,
+    ) as controller:
+        if service_connection.adapter is not None:
+            controller.mount(service_connection.base_url,
+                             service_connection.adapter)
+        yield controller
+
+        if is_parallel_run():
+            # Удаляем записи, оставшиеся после тестов этого воркера
+            namespace = get_character_name_namespace()
+            for record in controller.characters_get().result:
+                if record['name'].startswith(namespace):
+                    controller.character_delete(name=record['name'])
+
+
+@pytest.fixture(scope='session')
+def cleanup_registry(characters: CharactersController) -> CleanupRegistry:
+    """
+    Фикстура, подписывающая реестр созданных персонажей на изменения
+    коллекции, выполняемые контроллером.
+    """
+    registry = CleanupRegistry()
+    characters.add_mutation_listener(registry)
+
+    yield registry
+
+    characters.remove_mutation_listener(registry)
+
+
+@pytest.fixture(autouse=True)
+def cleanup_created_characters(
+        request: pytest.FixtureRequest,
+        characters: CharactersController,
+        cleanup_registry: CleanupRegistry,
+) -> None:
+    """
+    Фикстура, удаляющая после теста созданных им персонажей.
+    Если тест изменил записи, которые нельзя восстановить удалением,
+    БД сбрасывается до дефолтного состояния. При параллельном запуске
+    БД сбрасывают только тесты collection_global, остальные тесты
+    в этом случае завершаются ошибкой с именами оставшихся записей.
+    """
+    from tests.plugins.parallel import is_collection_global, is_parallel_run
+
+    yield
+
+    # При параллельном запуске коллекцию можно сбрасывать только тестам
+    # с эксклюзивной блокировкой, остальным воркерам сброс помешал бы
+    result = cleanup_registry.cleanup(
+        characters,
+        reset=not is_parallel_run() or is_collection_global(request.node),
+    )
+    if not result.clean:
+        pytest.fail(f'Коллекция не восстановлена после теста: {result}')
+
+
+@pytest.fixture(scope='session')
+def async_characters(
+        service_connection: 'ServiceConnection',
+) -> 'AsyncCharactersController':
+    """
+    Фикстура, вызывающая экземпляр асинхронного класса Characters.
+    Экземпляр и его пул соединений общие для всей сессии.
+    Модуль клиента (и httpx) импортируется только при запуске
+    асинхронных тестов.
+    """
+    from characters_controller.async_characters import (
+        AsyncCharactersController,
+    )
+    from tests.plugins.asyncio_runner import run
+
+    controller = AsyncCharactersController(
+        base_url=service_connection.base_url,
+        user_login=service_connection.login,
+        user_password=service_connection.password,
+        transport=service_connection.async_transport,
     )
 
+    yield controller
+
+    run(controller.aclose())
+
 
 @pytest.fixture()
-def fill_db_to_max_recs(characters: CharactersController) -> None:
+def fill_db_to_max_recs(
+        request: pytest.FixtureRequest,
+        characters: CharactersController,
+        cleanup_registry: CleanupRegistry,
+) -> None:
     """
     Фикстура, заполняющая БД до максимального количества записей
     или максимального - 1 запись.
+    Если следующему тесту тоже нужна заполненная БД (или он сам ее
+    сбрасывает), после теста БД не сбрасывается, а следующий тест
+    только дополняет ее до максимума.
     :param: rec_count: количество записей, до которого нужно заполнить БД
     :return: None
     """
-    db_limits = ServiceDBLimits.MAX_DB_RECORDS.value
-    current_recs = len(characters.characters_get().json()['result'])
-    empty_db_rec_counts = db_limits - current_recs
-    for record in range(empty_db_rec_counts):
-        data = create_new_character_data_with_required_field(
-            education=get_random_string_with_letters_digits(10),
-            height=get_random_float(),
-            identity=get_random_string_with_letters_digits(10),
-            name=get_random_string_with_letters_digits(10),
-            other_aliases=get_random_string_with_letters_digits(10),
-            universe=get_random_string_with_letters_digits(10),
-            weight=get_random_float(before_dot=2, after_dot=1)
+    report = CharactersSeeder(characters).fill_to(
+        ServiceDBLimits.MAX_DB_RECORDS.value,
+    )
+    request.node.user_properties.append(('fill_db_to_max_recs', str(report)))
+    if report.failures:
+        # Созданные записи остаются в реестре и удаляются очисткой
+        # после теста
+        pytest.fail(
+            f'БД не заполнена до максимального количества записей: {report}. '
+            f'Первая ошибка - {report.failures[0]}',
         )
-        characters.character_post(character=dict(data))
+    # Записи заполнения удаляются сбросом БД, а не очисткой после теста
+    cleanup_registry.keep()
 
     yield
 
+    from tests.plugins.scheduler import keeps_full_collection
+
+    if keeps_full_collection(request.node):
+        return
+    # Один сброс дешевле удаления сотен созданных записей по одной
     characters.reset_post()
 
 
+@pytest.fixture(scope='session')
+def payload_pool() -> PayloadPool:
+    """
+    Фикстура, возвращающая пул заранее сгенерированных тел запросов.
+    Тела создаются и сериализуются пакетами, тест получает готовое тело
+    с уникальным именем.
+    """
+    return PayloadPool()
+
+
 @pytest.fixture()
-def character_name(characters: CharactersController) -> str:
+def character_name(
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> str:
     """
     Фикстура, создающая персонажа в БД.
-    После теста БД сбрасывается до дефолтного состояния.
-    """
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_string_with_letters_digits(10),
-        universe=get_random_string_with_letters_digits(10),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_post(character=dict(data))
-    name = response.json()['result']['name']
+    После теста персонаж удаляется фикстурой cleanup_created_characters.
+    """
+    response = characters.character_post(character=payload_pool.take())
+    return response.result['name']
 
-    yield name
 
-    characters.reset_post()
+@pytest.fixture()
+def collection_changes(characters: CharactersController) -> CollectionWatcher:
+    """
+    Фикстура, запоминающая состояние коллекции перед тестом.
+    collection_changes.diff() возвращает добавленные, удаленные
+    и измененные с этого момента записи. Фикстуру нужно указывать
+    после фикстур, подготавливающих данные (например, character_name).
+    При параллельном запуске учитываются только персонажи текущего
+    воркера, так как остальные меняются другими воркерами.
+    """
+    from tests.plugins.parallel import is_parallel_run
+
+    namespace = get_character_name_namespace()
+    return CollectionWatcher(
+        characters,
+        names=(lambda name: name.startswith(namespace))
+        if is_parallel_run() else None,
+    )
@@ -0,0 +1,57 @@
+"""
+Плагин, позволяющий писать тесты в виде корутин (async def) рядом
+с обычными синхронными тестами.
+Все корутины выполняются в одном event loop на всю сессию, поэтому
+асинхронные клиенты и их пулы соединений можно переиспользовать
+между тестами.
+"""
+import asyncio
+import inspect
+from typing import Any, Optional
+
+import pytest
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Метод, возвращающий общий для сессии event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def run(coroutine: Any) -> Any:
+    """
+    Метод, выполняющий корутину в общем event loop.
+    Используется в синхронных фикстурах.
+    """
+    return get_event_loop().run_until_complete(coroutine)
+
+
+@pytest.fixture(scope='session')
+def event_loop() -> asyncio.AbstractEventLoop:
+    """Фикстура, возвращающая общий для сессии event loop"""
+    return get_event_loop()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> Optional[bool]:
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    # В funcargs есть и фикстуры, которые тест не принимает (autouse),
+    # поэтому передаются только параметры тестовой функции
+    funcargs = pyfuncitem.funcargs
+    parameters = inspect.signature(pyfuncitem.obj).parameters
+    run(pyfuncitem.obj(**{
+        arg: funcargs[arg] for arg in parameters if arg in funcargs
+    }))
+    return True
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
@@ -0,0 +1,318 @@
+"""
+Плагин истории времени выполнения тестов между запусками.
+Время setup, call и teardown и результат каждого теста сохраняются
+в sqlite (по умолчанию .timing_history.sqlite в корне проекта,
+--history-db=PATH или переменная окружения TIMING_HISTORY_DB),
+--no-history отключает историю.
+
+pytest --fast-feedback - сначала тесты, упавшие в прошлом запуске,
+затем остальные от быстрых к медленным (по среднему времени последних
+запусков), новые тесты - после упавших. Порядок меняется только внутри
+групп DBState плагина scheduler, чтобы тесты с одним состоянием
+коллекции по-прежнему шли подряд (с --keep-order - среди всех тестов).
+pytest --shard=K/N - выполнить K-ю из N частей тестов. Части
+сбалансированы по времени из истории, тесты одной группы xdist_group
+(например, collection_global) попадают в одну часть.
+"""
+import os
+import sqlite3
+import statistics
+import time
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytest
+
+DEFAULT_DB = '.timing_history.sqlite'
+# Количество последних запусков, по которым считается среднее время
+AVERAGE_RUNS = 5
+# Количество хранимых запусков
+KEEP_RUNS = 50
+# Время теста без истории
+DEFAULT_DURATION = 1.0
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    setup REAL NOT NULL DEFAULT 0,
+    call REAL NOT NULL DEFAULT 0,
+    teardown REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, nodeid)
+);
+'''
+
+
+@dataclass
+class RunTiming:
+    """Время фаз и результат одного теста в одном запуске."""
+    outcome: str = 'passed'
+    setup: float = 0.0
+    call: float = 0.0
+    teardown: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.setup + self.call + self.teardown
+
+
+@dataclass
+class HistoryEntry:
+    """История теста: среднее время и результат последнего запуска."""
+    duration: float
+    last_outcome: str
+
+    @property
+    def failed(self) -> bool:
+        return self.last_outcome == 'failed'
+
+
+class TimingHistory:
+    def __init__(self, path: Path) -> None:
+        """
+        Хранилище времени выполнения тестов в sqlite.
+        :param path - путь к файлу базы данных.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def save_run(
+            self,
+            started: float,
+            results: Dict[str, RunTiming],
+    ) -> None:
+        """
+        Метод, сохраняющий результаты запуска одной транзакцией
+        и удаляющий запуски старше KEEP_RUNS последних.
+        """
+        with self._connection:
+            run_id = self._connection.execute(
+                'INSERT INTO runs (started, finished) VALUES (?, ?)',
+                (started, time.time()),
+            ).lastrowid
+            self._connection.executemany(
+                'INSERT INTO results '
+                '(run_id, nodeid, outcome, setup, call, teardown) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    (run_id, nodeid, timing.outcome, timing.setup,
+                     timing.call, timing.teardown)
+                    for nodeid, timing in results.items()
+                ),
+            )
+            self._connection.execute(
+                'DELETE FROM runs WHERE id <= ?', (run_id - KEEP_RUNS,),
+            )
+
+    def load(self) -> Dict[str, HistoryEntry]:
+        """
+        Метод, возвращающий историю тестов: среднее время последних
+        AVERAGE_RUNS запусков теста и результат последнего.
+        """
+        with closing(self._connection.execute(
+                'SELECT nodeid, outcome, setup + call + teardown FROM ('
+                '  SELECT *, ROW_NUMBER() OVER ('
+                '    PARTITION BY nodeid ORDER BY run_id DESC'
+                '  ) AS age FROM results'
+                ') WHERE age <= ? ORDER BY nodeid, age',
+                (AVERAGE_RUNS,),
+        )) as cursor:
+            durations: Dict[str, List[float]] = defaultdict(list)
+            outcomes: Dict[str, str] = {}
+            for nodeid, outcome, duration in cursor:
+                durations[nodeid].append(duration)
+                outcomes.setdefault(nodeid, outcome)
+        return {
+            nodeid: HistoryEntry(
+                statistics.fmean(values), outcomes[nodeid],
+            )
+            for nodeid, values in durations.items()
+        }
+
+
+def _parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise pytest.UsageError(f'--shard must be K/N, got {value!r}')
+    if not 1 <= index <= count:
+        raise pytest.UsageError(f'--shard must be 1 <= K <= N, got {value}')
+    return index, count
+
+
+def _group(item: pytest.Item) -> str:
+    """Имя группы тестов, которые нельзя разносить по частям."""
+    marker = item.get_closest_marker('xdist_group')
+    if marker is None:
+        return item.nodeid
+    return marker.args[0] if marker.args else marker.kwargs['name']
+
+
+def split_shards(
+        items: Iterable[pytest.Item],
+        count: int,
+        durations: Dict[str, float],
+) -> List[List[pytest.Item]]:
+    """
+    Метод, распределяющий тесты на count частей с близким суммарным
+    временем: группы тестов от самой долгой к самой короткой
+    добавляются в наименее загруженную часть.
+    Результат зависит только от тестов и истории, поэтому все части
+    вычисляют одно и то же распределение.
+    """
+    groups: Dict[str, List[pytest.Item]] = defaultdict(list)
+    for item in items:
+        groups[_group(item)].append(item)
+    known = list(durations.values())
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    weights = {
+        name: sum(durations.get(item.nodeid, default) for item in group)
+        for name, group in groups.items()
+    }
+    shards: List[List[pytest.Item]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for name in sorted(groups, key=lambda name: (-weights[name], name)):
+        index = loads.index(min(loads))
+        shards[index].extend(groups[name])
+        loads[index] += weights[name]
+    return shards
+
+
+class HistoryPlugin:
+    def __init__(
+            self,
+            config: pytest.Config,
+            path: Optional[Path],
+    ) -> None:
+        """
+        Сборщик времени тестов текущего запуска. При параллельном
+        запуске история записывается только главным процессом.
+        :param path - файл истории, None - история не используется
+        (части тестов считаются равными по времени).
+        """
+        self.config = config
+        self.history = None if path is None else TimingHistory(path)
+        self.started = time.time()
+        self.results: Dict[str, RunTiming] = defaultdict(RunTiming)
+        self._records = path is not None \
+            and not hasattr(config, 'workerinput')
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_collection_modifyitems(
+            self,
+            config: pytest.Config,
+            items: List[pytest.Item],
+    ) -> Iterator[None]:
+        # Выполняется после остальных реализаций хука, в том числе
+        # после упорядочивания по состоянию коллекции
+        yield
+        fast_feedback = config.getoption('fast_feedback')
+        shard = config.getoption('shard')
+        if not (fast_feedback or shard):
+            return
+        history = {} if self.history is None else self.history.load()
+        if shard:
+            index, count = _parse_shard(shard)
+            shards = split_shards(items, count, {
+                nodeid: test.duration for nodeid, test in history.items()
+            })
+            selected = set(map(id, shards[index - 1]))
+            deselected = [item for item in items if id(item) not in selected]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+                items[:] = [item for item in items if id(item) in selected]
+        if fast_feedback:
+            # Импорт при вызове: модуль плагина регистрируется в
+            # pytest_plugins после этого плагина
+            from tests.plugins.scheduler import get_db_state
+
+            keep_order = config.getoption('keep_order')
+
+            def priority(item: pytest.Item) -> Tuple[int, int, float]:
+                # Группа DBState не меняется: иначе упавшие и быстрые
+                # тесты разных групп перемешаются и коллекция будет
+                # заполняться и сбрасываться между соседними тестами
+                group = 0 if keep_order else get_db_state(item)
+                test = history.get(item.nodeid)
+                if test is None:
+                    return group, 1, 0.0
+                return group, (0 if test.failed else 2), test.duration
+
+            items.sort(key=priority)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if not self._records:
+            return
+        timing = self.results[report.nodeid]
+        setattr(timing, report.when, report.duration)
+        if report.failed:
+            timing.outcome = 'failed'
+        elif report.skipped and timing.outcome != 'failed':
+            timing.outcome = 'skipped'
+
+    def pytest_sessionfinish(self) -> None:
+        if self.history is None:
+            return
+        if self._records and self.results:
+            self.history.save_run(self.started, self.results)
+        self.history.close()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup('timing history')
+    group.addoption(
+        '--history-db',
+        metavar='PATH',
+        default=os.environ.get('TIMING_HISTORY_DB'),
+        help=f'файл истории времени тестов (по умолчанию {DEFAULT_DB} '
+             f'в корне проекта)',
+    )
+    group.addoption(
+        '--no-history',
+        action='store_true',
+        help='не сохранять и не использовать историю времени тестов '
+             '(части --shard считаются равными по времени)',
+    )
+    group.addoption(
+        '--fast-feedback',
+        action='store_true',
+        help='сначала тесты, упавшие в прошлом запуске, затем остальные '
+             'от быстрых к медленным',
+    )
+    group.addoption(
+        '--shard',
+        metavar='K/N',
+        help='выполнить K-ю из N частей тестов, сбалансированных '
+             'по времени из истории',
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    path = None
+    if not config.getoption('no_history'):
+        path = Path(
+            config.getoption('history_db') or config.rootpath / DEFAULT_DB,
+        )
+    config.pluginmanager.register(
+        HistoryPlugin(config, path), 'timing_history',
+    )
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    plugin = config.pluginmanager.get_plugin('timing_history')
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
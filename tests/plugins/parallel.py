@@ -0,0 +1,88 @@
+"""
+Плагин безопасного параллельного запуска тестов (pytest-xdist):
+pytest -n auto --dist loadgroup
+
+Тесты, зависящие от состояния всей коллекции или меняющие её целиком
+(сброс БД, заполнение до 500 записей, проверка количества записей),
+помечаются маркером collection_global и объединяются в одну группу
+xdist_group, т.е. выполняются последовательно одним воркером.
+Чтобы такие тесты не пересекались с тестами других воркеров, все тесты
+берут межпроцессную блокировку читателей-писателя: обычные тесты -
+разделяемую, тесты коллекции - эксклюзивную.
+"""
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pytest
+
+COLLECTION_GLOBAL_MARKER = 'collection_global'
+# Фикстуры, меняющие состояние всей коллекции
+COLLECTION_GLOBAL_FIXTURES = ('fill_db_to_max_recs',)
+
+
+def is_parallel_run() -> bool:
+    """Метод, определяющий, запущен ли тест в воркере pytest-xdist."""
+    return 'PYTEST_XDIST_WORKER' in os.environ
+
+
+def is_collection_global(item: pytest.Item) -> bool:
+    """
+    Метод, определяющий, зависит ли тест от состояния всей коллекции.
+    """
+    return item.get_closest_marker(COLLECTION_GLOBAL_MARKER) is not None \
+        or any(
+            name in COLLECTION_GLOBAL_FIXTURES
+            for name in getattr(item, 'fixturenames', ())
+        )
+
+
+@contextmanager
+def lane_lock(exclusive: bool) -> Iterator[None]:
+    """
+    Межпроцессная блокировка, общая для всех воркеров одного запуска.
+    :param exclusive - взять эксклюзивную блокировку (тест коллекции)
+    вместо разделяемой.
+    """
+    run_uid = os.environ.get('PYTEST_XDIST_TESTRUNUID', 'local')
+    path = Path(tempfile.gettempdir()) / f'api_autotests_{run_uid}.lock'
+    with open(path, 'a') as lock_file:
+        fcntl.flock(
+            lock_file.fileno(),
+            fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH,
+        )
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        'markers',
+        f'{COLLECTION_GLOBAL_MARKER}: тест зависит от состояния всей '
+        f'коллекции или меняет её целиком, при параллельном запуске '
+        f'выполняется в отдельной последовательной очереди',
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items: List[pytest.Item]) -> None:
+    for item in items:
+        if is_collection_global(item):
+            item.add_marker(pytest.mark.xdist_group(COLLECTION_GLOBAL_MARKER))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(
+        item: pytest.Item,
+        nextitem: Optional[pytest.Item],
+) -> Iterator[None]:
+    if not is_parallel_run():
+        yield
+        return
+    with lane_lock(exclusive=is_collection_global(item)):
+        yield
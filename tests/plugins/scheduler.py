@@ -0,0 +1,107 @@
+"""
+Плагин, упорядочивающий тесты по состоянию коллекции, которое им нужно.
+Каждый тест относится к одной из групп DBState (маркер db_state или
+фикстуры теста), тесты выполняются группами в порядке DBState,
+внутри группы - в исходном порядке:
+- READ_ONLY - тест не меняет коллекцию;
+- PLUS_ONE  - тест создает записи и удаляет их после себя, ему нужно
+  место в коллекции;
+- FULL      - тесту нужна коллекция, заполненная до 500 записей
+  (фикстура fill_db_to_max_recs);
+- DEFAULT   - тест сбрасывает коллекцию в дефолтное состояние
+  (маркер collection_global).
+Заполненная коллекция переходит от одного FULL теста к следующему
+и сбрасывается, только если следующему тесту нужно место в коллекции.
+Сохранить исходный порядок тестов: pytest --keep-order.
+"""
+from enum import IntEnum
+from typing import Iterator, List, Optional
+
+import pytest
+
+from tests.plugins.parallel import COLLECTION_GLOBAL_MARKER, is_parallel_run
+
+DB_STATE_MARKER = 'db_state'
+# Фикстуры, с которыми тест создает записи в коллекции
+PLUS_ONE_FIXTURES = ('character_name', 'payload_pool', 'collection_changes')
+FULL_FIXTURES = ('fill_db_to_max_recs',)
+
+NEXT_ITEM = pytest.StashKey[Optional[pytest.Item]]()
+
+
+class DBState(IntEnum):
+    """Группы тестов по нужному им состоянию коллекции"""
+    READ_ONLY = 0
+    PLUS_ONE = 1
+    FULL = 2
+    DEFAULT = 3
+
+
+def get_db_state(item: pytest.Item) -> DBState:
+    """
+    Метод, возвращающий группу теста: из маркера db_state, если он
+    указан, иначе по маркеру collection_global и фикстурам теста.
+    """
+    marker = item.get_closest_marker(DB_STATE_MARKER)
+    if marker is not None:
+        return DBState[marker.args[0].upper()]
+    fixtures = getattr(item, 'fixturenames', ())
+    if any(name in FULL_FIXTURES for name in fixtures):
+        return DBState.FULL
+    if item.get_closest_marker(COLLECTION_GLOBAL_MARKER) is not None:
+        return DBState.DEFAULT
+    if any(name in PLUS_ONE_FIXTURES for name in fixtures):
+        return DBState.PLUS_ONE
+    return DBState.READ_ONLY
+
+
+def keeps_full_collection(item: pytest.Item) -> bool:
+    """
+    Метод, определяющий, можно ли оставить коллекцию заполненной после
+    теста item: следующему тесту она нужна заполненной или он сам
+    сбрасывает коллекцию.
+    При параллельном запуске коллекция всегда сбрасывается, так как
+    между тестами выполняются тесты других воркеров.
+    """
+    if is_parallel_run() or item.config.getoption('keep_order'):
+        return False
+    nextitem = item.stash.get(NEXT_ITEM, None)
+    return nextitem is not None \
+        and get_db_state(nextitem) in (DBState.FULL, DBState.DEFAULT)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.getgroup('service').addoption(
+        '--keep-order',
+        action='store_true',
+        help='не упорядочивать тесты по нужному им состоянию коллекции',
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        'markers',
+        f'{DB_STATE_MARKER}(state): состояние коллекции, нужное тесту '
+        f'(read_only, plus_one, full, default), по умолчанию определяется '
+        f'по фикстурам теста',
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(
+        config: pytest.Config,
+        items: List[pytest.Item],
+) -> None:
+    if config.getoption('keep_order'):
+        return
+    # Сортировка устойчивая: внутри группы порядок не меняется
+    items.sort(key=get_db_state)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(
+        item: pytest.Item,
+        nextitem: Optional[pytest.Item],
+) -> Iterator[None]:
+    item.stash[NEXT_ITEM] = nextitem
+    yield
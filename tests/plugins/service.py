@@ -0,0 +1,237 @@
+"""
+Плагин выбора сервиса, против которого запускаются тесты.
+pytest --service=remote     - сервис из vars/envars.py (по умолчанию),
+                              --env-profile=NAME - параметры из .env.NAME,
+                              --service-url=URL - другой адрес сервиса;
+pytest --service=fake       - локальная замена сервиса в том же процессе;
+pytest --service=fake-http  - локальная замена сервиса на localhost.
+Режим можно задать и переменной окружения SERVICE_MODE.
+Модули локальной замены и кассет импортируются, только если они нужны
+выбранному режиму, параметры подключения читаются только в режиме
+remote при первом обращении к сервису.
+При запуске через pytest-xdist у каждого воркера своя локальная замена.
+
+pytest --cassette=PATH --cassette-mode=record - записать обмены
+с выбранным сервисом в кассету;
+pytest --cassette=PATH --cassette-mode=replay - повторить запуск
+по кассете без сервиса и сети.
+При работе с кассетой случайные тестовые данные фиксируются
+(--random-seed, по умолчанию 0) отдельно для каждого теста, чтобы
+запросы при воспроизведении совпадали с записанными.
+Воспроизведение рассчитано на тот же набор и порядок тестов,
+что и при записи, без pytest-xdist.
+
+pytest --retries=N --rate-limit=RPS - количество повторов неудачных
+запросов контроллера и ограничение частоты запросов процесса.
+pytest --coalesce - объединять одновременные одинаковые GET запросы
+контроллера в один.
+"""
+import os
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import pytest
+from requests.adapters import BaseAdapter
+
+from characters_controller.transport import (
+    DEFAULT_RETRIES,
+    RetryPolicy,
+    SingleFlight,
+    TokenBucket,
+)
+from utilities.utils import seed_random_data
+
+if TYPE_CHECKING:
+    import httpx
+
+SERVICE_MODES = ('remote', 'fake', 'fake-http')
+CASSETTE_MODES = ('record', 'replay')
+
+
+@dataclass
+class ServiceConnection:
+    """Параметры подключения контроллеров к сервису."""
+    base_url: str
+    login: str
+    password: str
+    adapter: Optional[BaseAdapter] = None
+    async_transport: Optional['httpx.AsyncBaseTransport'] = None
+    retry: Optional[RetryPolicy] = None
+    rate_limiter: Optional[TokenBucket] = None
+    single_flight: Optional[SingleFlight] = None
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup('service')
+    group.addoption(
+        '--service',
+        choices=SERVICE_MODES,
+        default=os.environ.get('SERVICE_MODE', 'remote'),
+        help='сервис, против которого запускаются тесты',
+    )
+    group.addoption(
+        '--env-profile',
+        metavar='NAME',
+        help='профиль параметров подключения (файл .env.NAME), '
+             'по умолчанию - переменная окружения SERVICE_PROFILE',
+    )
+    group.addoption(
+        '--service-url',
+        metavar='URL',
+        help='адрес сервиса вместо SERVICE_BASE_URL',
+    )
+    group.addoption(
+        '--cassette',
+        metavar='PATH',
+        help='файл кассеты для записи или воспроизведения запросов',
+    )
+    group.addoption(
+        '--cassette-mode',
+        choices=CASSETTE_MODES,
+        default='replay',
+        help='записать кассету или воспроизвести запуск по ней',
+    )
+    group.addoption(
+        '--retries',
+        type=int,
+        default=DEFAULT_RETRIES,
+        help='количество повторов запроса после сбоя сервиса или сети',
+    )
+    group.addoption(
+        '--rate-limit',
+        type=float,
+        metavar='RPS',
+        help='ограничить частоту запросов к сервису (запросов в секунду)',
+    )
+    group.addoption(
+        '--coalesce',
+        action='store_true',
+        help='объединять одновременные одинаковые GET запросы в один',
+    )
+    group.addoption(
+        '--random-seed',
+        type=int,
+        help='зафиксировать случайные тестовые данные '
+             '(при работе с кассетой - 0 по умолчанию)',
+    )
+
+
+def _get_random_seed(config: pytest.Config) -> Optional[int]:
+    seed = config.getoption('random_seed')
+    if seed is None and config.getoption('cassette'):
+        return 0
+    return seed
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    seed = _get_random_seed(item.config)
+    if seed is not None:
+        # Данные теста зависят только от seed и самого теста,
+        # а не от того, какие тесты выполнялись до него
+        seed_random_data(f'{seed}:{item.nodeid}')
+
+
+def _connect(
+        request: pytest.FixtureRequest,
+) -> Iterator[ServiceConnection]:
+    """Параметры подключения к сервису без учета кассеты."""
+    mode = request.config.getoption('service')
+    if mode == 'remote':
+        from vars import envars
+
+        envars.configure(
+            profile=request.config.getoption('env_profile'),
+            SERVICE_BASE_URL=request.config.getoption('service_url'),
+        )
+        yield ServiceConnection(
+            envars.SERVICE_BASE_URL,
+            envars.SERVICE_LOGIN,
+            envars.SERVICE_PASSWORD,
+        )
+        return
+    from characters_controller.fake_service import (
+        FAKE_BASE_URL,
+        FAKE_LOGIN,
+        FAKE_PASSWORD,
+        FakeCharactersService,
+        FakeServiceAdapter,
+        FakeServiceAsyncTransport,
+        FakeServiceServer,
+    )
+
+    service = FakeCharactersService()
+    if mode == 'fake':
+        yield ServiceConnection(
+            FAKE_BASE_URL,
+            FAKE_LOGIN,
+            FAKE_PASSWORD,
+            adapter=FakeServiceAdapter(service),
+            async_transport=FakeServiceAsyncTransport(service),
+        )
+        return
+    with FakeServiceServer(service) as server:
+        yield ServiceConnection(server.url, FAKE_LOGIN, FAKE_PASSWORD)
+
+
+@pytest.fixture(scope='session')
+def service_connection(
+        request: pytest.FixtureRequest,
+) -> Iterator[ServiceConnection]:
+    """
+    Фикстура, возвращающая параметры подключения к выбранному сервису
+    с записью в кассету или воспроизведением из неё.
+    """
+    for connection in _connect_with_cassette(request):
+        rate_limit = request.config.getoption('rate_limit')
+        yield replace(
+            connection,
+            retry=RetryPolicy(retries=request.config.getoption('retries')),
+            rate_limiter=TokenBucket(rate_limit) if rate_limit else None,
+            single_flight=SingleFlight()
+            if request.config.getoption('coalesce') else None,
+        )
+
+
+def _connect_with_cassette(
+        request: pytest.FixtureRequest,
+) -> Iterator[ServiceConnection]:
+    """Параметры подключения к сервису с учетом кассеты."""
+    path = request.config.getoption('cassette')
+    if path:
+        from characters_controller.cassette import (
+            CassetteReader,
+            CassetteWriter,
+            RecordingAdapter,
+            RecordingAsyncTransport,
+            ReplayAdapter,
+            ReplayAsyncTransport,
+        )
+    if path and request.config.getoption('cassette_mode') == 'replay':
+        reader = CassetteReader(path)
+        yield ServiceConnection(
+            reader.base_url,
+            'replay',
+            'replay',
+            adapter=ReplayAdapter(reader),
+            async_transport=ReplayAsyncTransport(reader),
+        )
+        reader.close()
+        return
+    connect = _connect(request)
+    connection = next(connect)
+    if path:
+        writer = CassetteWriter(path, connection.base_url)
+        connection = ServiceConnection(
+            connection.base_url,
+            connection.login,
+            connection.password,
+            adapter=RecordingAdapter(writer, connection.adapter),
+            async_transport=RecordingAsyncTransport(
+                writer, connection.async_transport,
+            ),
+        )
+    yield connection
+    if path:
+        writer.close()
+    next(connect, None)
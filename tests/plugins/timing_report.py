@@ -0,0 +1,257 @@
+"""
+Плагин отчета о времени, потраченном на запросы к сервису.
+pytest --timing-report [--timing-json=timing.json]
+
+Каждый запрос контроллера относится к текущему тесту, фазе теста
+(setup, call, teardown) и фикстуре, в setup или teardown которой
+он выполнен. В конце запуска выводятся самые затратные тесты,
+фикстуры и эндпоинты, при указании --timing-json отчет сохраняется
+в json.
+"""
+import json
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from characters_controller.instrumentation import CallRecord, default_recorder
+
+REPORT_TOP = 15
+
+
+class _Stats:
+    """Накопленная статистика запросов одной группы."""
+    __slots__ = (
+        'calls', 'errors', 'total', 'dns', 'connect', 'ttfb',
+        'request_bytes', 'response_bytes', 'retries', 'throttled',
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.throttled = 0.0
+
+    def add(self, call: CallRecord) -> None:
+        self.calls += 1
+        self.errors += call.error is not None or (call.status_code or 0) >= 500
+        self.total += call.total
+        self.dns += call.dns
+        self.connect += call.connect
+        self.ttfb += call.ttfb
+        self.request_bytes += call.request_bytes
+        self.response_bytes += call.response_bytes
+        self.retries += call.attempt > 1
+        self.throttled += call.throttled
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TimingReport:
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Сборщик отчета. Запросы могут выполняться из нескольких потоков
+        (например, при заполнении БД), поэтому контекст текущего теста
+        общий для процесса, а не для потока.
+        """
+        self.config = config
+        self._lock = threading.Lock()
+        self._test: Optional[str] = None
+        self._phase: Optional[str] = None
+        self._fixtures: List[Tuple[str, str]] = []
+        self.tests: Dict[str, Dict[str, _Stats]] = defaultdict(
+            lambda: defaultdict(_Stats),
+        )
+        self.fixtures: Dict[str, Dict[str, _Stats]] = defaultdict(
+            lambda: defaultdict(_Stats),
+        )
+        self.endpoints: Dict[str, _Stats] = defaultdict(_Stats)
+        self.durations: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    def on_call(self, call: CallRecord) -> None:
+        with self._lock:
+            self.endpoints[f'{call.method} {call.endpoint}'].add(call)
+            test = self._test or '<session>'
+            self.tests[test][self._phase or 'session'].add(call)
+            if self._fixtures:
+                fixture, fixture_phase = self._fixtures[-1]
+                self.fixtures[fixture][fixture_phase].add(call)
+
+    def _push_fixture(self, name: str, phase: str) -> None:
+        with self._lock:
+            self._fixtures.append((name, phase))
+
+    def _pop_fixture(self) -> None:
+        with self._lock:
+            if self._fixtures:
+                self._fixtures.pop()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Iterator[None]:
+        self._test = item.nodeid
+        yield
+        self._test = None
+        self._phase = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self) -> Iterator[None]:
+        self._phase = 'setup'
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self) -> Iterator[None]:
+        self._phase = 'call'
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self) -> Iterator[None]:
+        self._phase = 'teardown'
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(
+            self,
+            fixturedef: pytest.FixtureDef,
+    ) -> Iterator[None]:
+        name = fixturedef.argname
+        # Финализаторы выполняются в обратном порядке: этот выполнится
+        # после teardown фикстуры
+        fixturedef.addfinalizer(self._pop_fixture)
+        self._push_fixture(name, 'setup')
+        try:
+            yield
+        finally:
+            self._pop_fixture()
+        # ... а этот - перед teardown фикстуры
+        fixturedef.addfinalizer(
+            lambda: self._push_fixture(name, 'teardown'),
+        )
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        self.durations[report.nodeid][report.when] = report.duration
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'tests': {
+                    test: {
+                        'duration': self.durations.get(test, {}),
+                        'requests': {
+                            phase: stats.to_dict()
+                            for phase, stats in phases.items()
+                        },
+                    }
+                    for test, phases in self.tests.items()
+                },
+                'fixtures': {
+                    fixture: {
+                        phase: stats.to_dict()
+                        for phase, stats in phases.items()
+                    }
+                    for fixture, phases in self.fixtures.items()
+                },
+                'endpoints': {
+                    endpoint: stats.to_dict()
+                    for endpoint, stats in self.endpoints.items()
+                },
+            }
+
+    def pytest_terminal_summary(
+            self,
+            terminalreporter: 'pytest.TerminalReporter',
+    ) -> None:
+        write = terminalreporter.write_line
+        terminalreporter.section('request timing')
+        rows = [
+            (sum(stats.total for stats in phases.values()),
+             sum(stats.calls for stats in phases.values()),
+             test,
+             ', '.join(
+                 f'{phase} {stats.total:.3f}s/{stats.calls}'
+                 for phase, stats in phases.items()
+             ))
+            for test, phases in self.tests.items()
+        ]
+        write('slowest tests by request time (phase time/calls):')
+        for total, calls, test, phases in sorted(rows, reverse=True)[
+                :REPORT_TOP]:
+            write(f'{total:9.3f}s {calls:5d} {test} [{phases}]')
+        rows = [
+            (stats.total, stats.calls, f'{fixture} {phase}')
+            for fixture, phases in self.fixtures.items()
+            for phase, stats in phases.items()
+        ]
+        write('slowest fixtures by request time:')
+        for total, calls, fixture in sorted(rows, reverse=True)[:REPORT_TOP]:
+            write(f'{total:9.3f}s {calls:5d} {fixture}')
+        write('endpoints (time, calls, dns, connect, ttfb, retries):')
+        for endpoint, stats in sorted(
+                self.endpoints.items(),
+                key=lambda item: item[1].total,
+                reverse=True,
+        ):
+            write(
+                f'{stats.total:9.3f}s {stats.calls:5d} {endpoint} '
+                f'dns {stats.dns:.3f}s, connect {stats.connect:.3f}s, '
+                f'ttfb {stats.ttfb:.3f}s, retries {stats.retries}',
+            )
+        retries = sum(stats.retries for stats in self.endpoints.values())
+        throttled = sum(
+            stats.throttled for stats in self.endpoints.values()
+        )
+        write(
+            f'retried requests: {retries}, '
+            f'rate limiter wait: {throttled:.3f}s',
+        )
+
+    def pytest_sessionfinish(self) -> None:
+        path = self.config.getoption('timing_json')
+        if not path:
+            return
+        path = Path(path)
+        worker = os.environ.get('PYTEST_XDIST_WORKER')
+        if worker:
+            path = path.with_name(f'{path.stem}.{worker}{path.suffix}')
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup('timing report')
+    group.addoption(
+        '--timing-report',
+        action='store_true',
+        help='собирать время запросов к сервису по тестам и фикстурам '
+             'и выводить отчет в конце запуска',
+    )
+    group.addoption(
+        '--timing-json',
+        metavar='PATH',
+        help='сохранить отчет о времени запросов в json '
+             '(включает --timing-report)',
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not (config.getoption('timing_report')
+            or config.getoption('timing_json')):
+        return
+    report = TimingReport(config)
+    default_recorder.subscribe(report.on_call)
+    config.pluginmanager.register(report, 'timing_report_collector')
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    report = config.pluginmanager.get_plugin('timing_report_collector')
+    if report is not None:
+        default_recorder.unsubscribe(report.on_call)
+        config.pluginmanager.unregister(report)
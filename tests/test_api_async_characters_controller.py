@@ -0,0 +1,85 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+from asserts import assert_equal, assert_in
+
+from characters_controller.enums import ErrorMessages
+from utilities.utils import get_characters_list_errors_from_json
+
+if TYPE_CHECKING:
+    # httpx импортируется только при запуске асинхронных тестов
+    from characters_controller.async_characters import (
+        AsyncCharactersController,
+    )
+
+
+async def test_async_get_characters(
+        async_characters: 'AsyncCharactersController',
+) -> None:
+    """
+    Получение списка персонажей асинхронным клиентом.
+    Пользователь авторизован.
+    Проверка корректности возращаемого статус кода и
+    валидности представления персонажей в теле ответа
+    """
+    response = await async_characters.characters_get()
+    assert_equal(
+        200,
+        response.status_code,
+        'Некорректный код ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        [],
+        get_characters_list_errors_from_json(response.content),
+        'Не пройдена валидация данных персонажей. Ошибки - {second}',
+    )
+
+
+async def test_async_get_exist_characters_concurrently(
+        async_characters: 'AsyncCharactersController',
+        character_name: str,
+) -> None:
+    """
+    Получение данных по одному персонажу несколькими одновременными
+    запросами. Пользователь авторизован.
+    Проверка, что все ответы успешны и совпадают.
+    """
+    responses = await asyncio.gather(*(
+        async_characters.character_get(name=character_name)
+        for _ in range(10)
+    ))
+    assert_equal(
+        [200] * len(responses),
+        [response.status_code for response in responses],
+        'Некорректные коды ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        1,
+        len({
+            response.character()
+            .model_dump_json() for response in responses
+        }),
+        'Ответы на одинаковые запросы различаются',
+    )
+
+
+async def test_async_get_characters_without_authorization(
+        async_characters: 'AsyncCharactersController',
+) -> None:
+    """
+    Получение списка персонажей асинхронным клиентом.
+    Пользователь НЕ авторизован.
+    Проверка корректности возращаемого статус кода и сообщения об ошибке
+    """
+    response = await async_characters.characters_get(auth=False)
+    assert_equal(
+        401,
+        response.status_code,
+        'Некорректный код ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_in(
+        ErrorMessages.UNAUTHORIZED.value,
+        response.text,
+        'Фактическое описание описание ошибки {second} '
+        'не содержит ожидаемую информацию {first}',
+    )
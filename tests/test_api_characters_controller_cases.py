@@ -0,0 +1,211 @@
+"""
+Тесты, сгенерированные из сценариев cases.xlsx (utilities/cases.py).
+Каждая строка листа - отдельный тест case<№>.
+"""
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pytest
+from asserts import assert_equal, assert_in
+
+from characters_controller.characters import CharactersController
+from characters_controller.enums import ErrorMessages
+from characters_controller.response import CharactersResponse
+from tests.plugins.parallel import COLLECTION_GLOBAL_MARKER
+from tests.plugins.scheduler import DB_STATE_MARKER
+from utilities.cases import (
+    CASES_PATH,
+    INDEX_VERSION,
+    NAME_PLACEHOLDER,
+    Case,
+    CaseState,
+    NameRole,
+    index_path,
+    load_cases,
+    parse_case,
+)
+from utilities.payload_pool import PayloadPool
+from utilities.utils import get_characters_list_errors_from_json
+
+# Количество сценариев в cases.xlsx и номера сценариев без авторизации
+CASES_COUNT = 22
+UNAUTHORIZED_CASES = ['2', '5', '12', '17', '20', '22']
+
+Request = Callable[
+    [CharactersController, Case, Optional[str]], CharactersResponse,
+]
+
+REQUESTS: Dict[Tuple[str, str], Request] = {
+    ('GET', '/characters'): lambda characters, case, name:
+        characters.characters_get(auth=case.auth),
+    ('GET', '/character'): lambda characters, case, name:
+        characters.character_get(name=name, auth=case.auth),
+    ('POST', '/character'): lambda characters, case, name:
+        characters.character_post(
+            character=case.request_body(name), auth=case.auth,
+        ),
+    ('PUT', '/character'): lambda characters, case, name:
+        characters.character_put(
+            character=case.request_body(name), auth=case.auth,
+        ),
+    ('DELETE', '/character'): lambda characters, case, name:
+        characters.character_delete(name=name, auth=case.auth),
+    ('POST', '/reset'): lambda characters, case, name:
+        characters.reset_post(auth=case.auth),
+}
+
+
+def test_cases_are_parsed() -> None:
+    """
+    Разбор cases.xlsx.
+    Проверка, что из книги получены все сценарии, в том числе сценарии
+    без авторизации с кодом ответа, записанным слитно с текстом
+    (401Unauthorized).
+    """
+    cases = load_cases()
+    assert_equal(
+        CASES_COUNT,
+        len(cases),
+        'Некорректное количество сценариев. Ожидается {first}, '
+        'фактически {second}',
+    )
+    unauthorized = [case for case in cases if case.status == 401]
+    assert_equal(
+        UNAUTHORIZED_CASES,
+        [case.number for case in unauthorized],
+        'Некорректные сценарии с кодом ответа 401. Ожидается {first}, '
+        'фактически {second}',
+    )
+    for case in unauthorized:
+        assert_equal(
+            (False, (ErrorMessages.UNAUTHORIZED.value,)),
+            (case.auth, case.error),
+            f'{case.title}. Некорректные авторизация и текст ошибки. '
+            f'Ожидается {{first}}, фактически {{second}}',
+        )
+
+
+def test_unparsable_case_is_reported() -> None:
+    """
+    Разбор строки cases.xlsx без кода ответа.
+    Проверка, что строка не пропускается молча, а вызывает ошибку.
+    """
+    with pytest.raises(ValueError, match='case 99'):
+        parse_case({
+            'number': '99',
+            'endpoint': 'GET /characters',
+            'expected': 'Код ответа не указан',
+        })
+
+
+@pytest.mark.parametrize('index', [
+    '{"version": 2',
+    '[]',
+    json.dumps({'version': INDEX_VERSION}),
+    json.dumps({'version': INDEX_VERSION, 'source': 1, 'cases': []}),
+    json.dumps({'version': INDEX_VERSION, 'source': {}, 'cases': [[1]]}),
+    json.dumps({'version': INDEX_VERSION, 'source': {}, 'cases': [None]}),
+], ids=['truncated', 'list', 'no_cases', 'bad_source', 'short_row',
+        'null_row'])
+def test_malformed_index_is_rebuilt(tmp_path: Path, index: str) -> None:
+    """
+    Загрузка сценариев с поврежденным индексом.
+    Проверка, что книга разбирается заново и индекс перезаписывается.
+    """
+    path = tmp_path / CASES_PATH.name
+    shutil.copy(CASES_PATH, path)
+    index_path(path).write_text(index, encoding='utf-8')
+    assert_equal(
+        CASES_COUNT,
+        len(load_cases(path)),
+        'Некорректное количество сценариев. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(
+        load_cases(CASES_PATH),
+        load_cases(path),
+        'Сценарии из перезаписанного индекса отличаются от сценариев книги',
+    )
+    assert_equal(
+        [index_path(path).name, path.name],
+        sorted(item.name for item in tmp_path.iterdir()),
+        'Некорректные файлы рядом с книгой. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def _case_param(case: Case) -> Any:
+    marks = [getattr(pytest.mark, DB_STATE_MARKER)(case.state.value)]
+    if case.state in (CaseState.FULL, CaseState.DEFAULT):
+        marks.append(getattr(pytest.mark, COLLECTION_GLOBAL_MARKER))
+    return pytest.param(case, id=f'case{case.number}', marks=marks)
+
+
+def _get_name(
+        case: Case,
+        request: pytest.FixtureRequest,
+        payload_pool: PayloadPool,
+) -> Optional[str]:
+    """
+    Метод, возвращающий имя персонажа для запроса кейса: созданного
+    перед тестом или еще не существующего в коллекции.
+    """
+    if case.role is NameRole.NONE:
+        return None
+    if case.role is NameRole.EXISTING:
+        return request.getfixturevalue('character_name')
+    return payload_pool.take().name
+
+
+@pytest.mark.parametrize('case', [_case_param(case) for case in load_cases()])
+def test_case(
+        case: Case,
+        request: pytest.FixtureRequest,
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
+    """
+    Выполнение сценария из cases.xlsx.
+    Проверка корректности возвращаемого статус кода, сообщения об ошибке
+    и данных ответа.
+    """
+    if case.state is CaseState.FULL:
+        request.getfixturevalue('fill_db_to_max_recs')
+    name = _get_name(case, request, payload_pool)
+    response = REQUESTS[case.method, case.endpoint](characters, case, name)
+    assert_equal(
+        case.status,
+        response.status_code,
+        f'{case.title}. Некорректный код ответа. '
+        f'Ожидается {{first}}, фактически {{second}}',
+    )
+    for fragment in case.error:
+        assert_in(
+            fragment.replace(NAME_PLACEHOLDER, name or NAME_PLACEHOLDER),
+            response.text,
+            'Фактическое описание ошибки {second} '
+            'не содержит ожидаемую информацию {first}',
+        )
+    if case.status != 200:
+        return
+    if case.result is not None:
+        assert_equal(
+            case.result.replace(NAME_PLACEHOLDER, name or NAME_PLACEHOLDER),
+            response.result,
+            'Некорректный результат. Ожидается {first}, фактически {second}',
+        )
+    elif case.endpoint == '/characters':
+        assert_equal(
+            [],
+            get_characters_list_errors_from_json(response.content),
+            'Ошибка валидации данных о персонажах: {second}',
+        )
+    elif name is not None:
+        assert_equal(
+            name,
+            response.character().name,
+            'Некорректное имя персонажа в ответе. '
+            'Ожидается {first}, фактически {second}',
+        )
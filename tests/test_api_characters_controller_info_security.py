@@ -2,11 +2,7 @@ from asserts import assert_equal, assert_in
 
 from characters_controller.characters import CharactersController
 from characters_controller.enums import ErrorMessages
-from utilities.utils import (
-    create_new_character_data_with_required_field,
-    get_random_float,
-    get_random_string_with_letters_digits,
-)
+from utilities.payload_pool import PayloadPool
 
 
 def test_get_characters_status_without_authorization(
@@ -55,22 +51,15 @@ def test_get_character_by_name_without_authorization(
 
 def test_create_new_character_without_authorization(
         characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Добавление персонажа, которого имя которого еще нет на сервере.
     Пользователь НЕ авторизован.
     Проверка корректности возращаемого статус кода и сообщения об ошибке.
     """
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=get_random_string_with_letters_digits(6),
-        other_aliases=get_random_string_with_letters_digits(7),
-        universe=get_random_string_with_letters_digits(8),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_post(character=dict(data), auth=False)
+    payload = payload_pool.take()
+    response = characters.character_post(character=payload, auth=False)
     assert_equal(
         401,
         response.status_code,
@@ -86,23 +75,16 @@ def test_create_new_character_without_authorization(
 
 def test_update_new_character_without_authorization(
         characters: CharactersController,
-        character_name: str
+        character_name: str,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Внесение изменений в данные о персонаже. Персонаж  существует.
     Пользователь НЕ авторизован.
     Проверка корректности возращаемого статус кода и сообщения об ошибке
     """
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=character_name,
-        other_aliases=get_random_string_with_letters_digits(7),
-        universe=get_random_string_with_letters_digits(8),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_put(character=dict(data), auth=False)
+    payload = payload_pool.take().with_name(character_name)
+    response = characters.character_put(character=payload, auth=False)
     assert_equal(
         401,
         response.status_code,
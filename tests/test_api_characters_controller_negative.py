@@ -4,12 +4,9 @@ from asserts import assert_equal, assert_in
 
 from characters_controller.characters import CharactersController
 from characters_controller.enums import ErrorMessages, ServiceDBLimits
+from utilities.payload_pool import PayloadKind, PayloadPool
 from utilities.utils import (
-    create_new_character_data_with_required_field,
-    create_new_character_data_with_wrong_data_type,
-    create_new_character_data_without_required_field,
-    get_exist_random_character_name, get_random_float,
-    get_random_int,
+    get_exist_random_character_name,
     get_random_string_with_letters_digits,
 )
 
@@ -38,6 +35,7 @@ def test_get_non_exist_character_by_name(
 
 def test_create_new_character_without_required_field(
         characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Добавление персонажа, имя которого еще нет на сервере.
@@ -45,15 +43,8 @@ def test_create_new_character_without_required_field(
     В теле запроса ошибка (отсутствует обязательное поле name).
     Проверка корректности возвращаемого статус кода и сообщения об ошибке.
     """
-    data = create_new_character_data_without_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_string_with_letters_digits(7),
-        universe=get_random_string_with_letters_digits(8),
-        weight=get_random_float(before_dot=2, after_dot=1),
-    )
-    response = characters.character_post(character=dict(data))
+    payload = payload_pool.take(PayloadKind.WITHOUT_NAME)
+    response = characters.character_post(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -70,22 +61,15 @@ def test_create_new_character_without_required_field(
 def test_create_character_with_exist_name(
         characters: CharactersController,
         character_name: str,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Тест на создание записи о персонаже, имя (значение поля name) уже существет
     (есть в БД). Пользователь авторизован.
     Проверка корректности возвращаемого статус кода и сообщения об ошибке
     """
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=character_name,
-        other_aliases=get_random_string_with_letters_digits(7),
-        universe=get_random_string_with_letters_digits(8),
-        weight=get_random_float(before_dot=2, after_dot=1),
-    )
-    response = characters.character_post(character=dict(data))
+    payload = payload_pool.take().with_name(character_name)
+    response = characters.character_post(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -101,6 +85,7 @@ def test_create_character_with_exist_name(
 
 def test_create_character_with_wrong_field_data_type(
         characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Добавление персонажа, имя которого еще нет на сервере.
@@ -108,16 +93,8 @@ def test_create_character_with_wrong_field_data_type(
     В теле запроса у полей неверный тип данных.
     Проверка корректности возвращаемого статус кода и сообщения об ошибке.
     """
-    data = create_new_character_data_with_wrong_data_type(
-        education=get_random_int(10),
-        height=get_random_float(),
-        identity=get_random_int(10),
-        name=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_int(10),
-        universe=get_random_int(10),
-        weight=get_random_float(),
-    )
-    response = characters.character_post(character=dict(data))
+    payload = payload_pool.take(PayloadKind.WRONG_TYPE)
+    response = characters.character_post(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -132,7 +109,8 @@ def test_create_character_with_wrong_field_data_type(
 
 
 def test_create_character_with_351_characters_in_string_fields(
-        characters: CharactersController
+        characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Добавление персонажа, имя которого еще нет на сервере.
@@ -140,24 +118,10 @@ def test_create_character_with_351_characters_in_string_fields(
     В теле запроса у одного из полей слишком длинное значение.
     Проверка корректности возвращаемого статус кода и сообщения об ошибке.
     """
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(
-            ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value + 1,
-        ),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(
-            ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value + 1,
-        ),
-        name=get_exist_random_character_name(controller=characters),
-        other_aliases=get_random_string_with_letters_digits(
-            ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value + 1,
-        ),
-        universe=get_random_string_with_letters_digits(
-            ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value + 1,
-        ),
-        weight=get_random_float(before_dot=2, after_dot=1),
+    payload = payload_pool.take(PayloadKind.TOO_LONG).with_name(
+        get_exist_random_character_name(controller=characters),
     )
-    response = characters.character_post(character=dict(data))
+    response = characters.character_post(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -173,7 +137,8 @@ def test_create_character_with_351_characters_in_string_fields(
 
 def test_create_501st_character(
         characters: CharactersController,
-        fill_db_to_max_recs: Callable[..., None]
+        fill_db_to_max_recs: Callable[..., None],
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Добавление персонажа, имя которого еще нет на сервере.
@@ -183,20 +148,12 @@ def test_create_501st_character(
     fill_db_to_max_recs
     assert_equal(
         ServiceDBLimits.MAX_DB_RECORDS.value,
-        len(characters.characters_get().json()['result']),
+        sum(1 for _ in characters.characters_stream()),
         'Ожидаемое количество {first} записей '
         'не соответствует фактической {second}',
     )
-    data = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_string_with_letters_digits(10),
-        universe=get_random_string_with_letters_digits(10),
-        weight=get_random_float(before_dot=2, after_dot=1),
-    )
-    response = characters.character_post(character=dict(data))
+    payload = payload_pool.take()
+    response = characters.character_post(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -210,7 +167,10 @@ def test_create_501st_character(
     )
 
 
-def test_update_non_exist_character(characters: CharactersController) -> None:
+def test_update_non_exist_character(
+        characters: CharactersController,
+        payload_pool: PayloadPool,
+) -> None:
     """
     Внесение изменений в данные о персонаже.
     Персонаж, информация о котором отсутствует на сервере.
@@ -218,16 +178,8 @@ def test_update_non_exist_character(characters: CharactersController) -> None:
     Проверка корректности возвращаемого статус кода и
     валидности представления персонажей в теле ответа.
     """
-    body = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_string_with_letters_digits(10),
-        universe=get_random_string_with_letters_digits(10),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_put(character=dict(body))
+    payload = payload_pool.take()
+    response = characters.character_put(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -243,6 +195,7 @@ def test_update_non_exist_character(characters: CharactersController) -> None:
 
 def test_update_exist_character_without_required_field(
         characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Внесение изменений в данные о персонаже. Персонаж существует.
@@ -251,15 +204,8 @@ def test_update_exist_character_without_required_field(
     Проверка корректности возвращаемого статус кода и валидности
     представления персонажей в теле ответа.
     """
-    body = create_new_character_data_without_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_string_with_letters_digits(10),
-        universe=get_random_string_with_letters_digits(10),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_put(character=dict(body))
+    payload = payload_pool.take(PayloadKind.WITHOUT_NAME)
+    response = characters.character_put(character=payload)
     assert_equal(
         400,
         response.status_code,
@@ -275,6 +221,7 @@ def test_update_exist_character_without_required_field(
 
 def test_update_character_with_wrong_field_data_type(
         characters: CharactersController,
+        payload_pool: PayloadPool,
 ) -> None:
     """
     Внесение изменений в данные о персонаже. Персонаж существует.
@@ -282,16 +229,8 @@ def test_update_character_with_wrong_field_data_type(
     Неверный тип данных). Пользователь авторизован.
     Проверка корректности возращаемого статус кода и сообщения об ошибке.
     """
-    data = create_new_character_data_with_wrong_data_type(
-        education=get_random_int(10),
-        height=get_random_float(),
-        identity=get_random_int(10),
-        name=get_random_string_with_letters_digits(10),
-        other_aliases=get_random_int(10),
-        universe=get_random_int(10),
-        weight=get_random_float(),
-    )
-    response = characters.character_put(character=dict(data))
+    payload = payload_pool.take(PayloadKind.WRONG_TYPE)
+    response = characters.character_put(character=payload)
     assert_equal(
         400,
         response.status_code,
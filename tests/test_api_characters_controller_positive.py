@@ -2,14 +2,10 @@ import pytest
 from asserts import assert_equal, assert_in, assert_true
 
 from characters_controller.characters import CharactersController
-from characters_controller.dataclass import Character
 from characters_controller.enums import ServiceDBLimits
-from utilities.utils import (
-    create_new_character_data_with_required_field,
-    get_random_float,
-    get_random_string_with_letters_digits,
-    validate_characters_list_data,
-)
+from utilities.diff import CollectionDiff, CollectionWatcher
+from utilities.payload_pool import PayloadKind, PayloadPool
+from utilities.utils import get_characters_list_errors_from_json
 
 
 def test_get_characters(characters: CharactersController) -> None:
@@ -24,14 +20,10 @@ def test_get_characters(characters: CharactersController) -> None:
         response.status_code,
         'Некорректный код ответа. Ожидается {first}, фактически {second}',
     )
-    data_validation_result = validate_characters_list_data(
-        data=response.json()['result'],
-    )
     assert_equal(
-        'Success',
-        data_validation_result,
-        f'Не пройдена валидация данных персонажей. '
-        f'Сообщение об ошибке - {data_validation_result}',
+        [],
+        get_characters_list_errors_from_json(response.content),
+        'Не пройдена валидация данных персонажей. Ошибки - {second}',
     )
 
 
@@ -52,19 +44,21 @@ def test_get_exist_character_by_name(
         'Некорректный код ответа. Ожидается {first}, фактически {second}',
     )
     assert_true(
-        Character(**response.json()['result']),
+        response.character(),
         'Не пройдена валидация данных о персонаже,'
     )
 
 
 @pytest.mark.parametrize(
-    'string_symbols_count',
-    (10, ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value),
+    'payload_kind',
+    (PayloadKind.VALID, PayloadKind.MAX_LENGTH),
     ids=('regular', 'max'),
 )
 def test_create_new_character(
         characters: CharactersController,
-        string_symbols_count: int,
+        payload_kind: PayloadKind,
+        payload_pool: PayloadPool,
+        collection_changes: CollectionWatcher,
 ) -> None:
     """
     Добавление персонажа, которого имя которого еще нет на сервере.
@@ -72,34 +66,32 @@ def test_create_new_character(
     Ппроверка корректности возращаемого статус кода и валидности
     представления персонажей в теле ответа.
     """
-    body = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(string_symbols_count),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(string_symbols_count),
-        name=get_random_string_with_letters_digits(string_symbols_count),
-        other_aliases=get_random_string_with_letters_digits(
-            string_symbols_count,
-        ),
-        universe=get_random_string_with_letters_digits(string_symbols_count),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_post(character=dict(body))
+    payload = payload_pool.take(payload_kind)
+    response = characters.character_post(character=payload)
     assert_equal(
         200,
         response.status_code,
         'Некорректный код ответа. Ожидается {first}, фактически {second}',
     )
     assert_equal(
-        body,
-        Character(**response.json()['result']),
+        payload.data,
+        response.result,
         'Тело ответа не соответствует ожидаемому. '
         'Ожидается {first}, фактически {second}',
     )
+    assert_equal(
+        CollectionDiff(added={payload.name: payload.data}),
+        collection_changes.diff(),
+        'Изменения коллекции не соответствуют ожидаемым. '
+        'Ожидается {first}, фактически {second}',
+    )
 
 
 def test_update_exist_character(
         characters: CharactersController,
         character_name: str,
+        payload_pool: PayloadPool,
+        collection_changes: CollectionWatcher,
 ) -> None:
     """
     Внесение изменений в данные о персонаже. Персонаж существует.
@@ -107,32 +99,32 @@ def test_update_exist_character(
     Проверка корректности возращаемого статус кода и
     валидности представления персонажей в теле ответа.
     """
-    body = create_new_character_data_with_required_field(
-        education=get_random_string_with_letters_digits(10),
-        height=get_random_float(),
-        identity=get_random_string_with_letters_digits(10),
-        name=character_name,
-        other_aliases=get_random_string_with_letters_digits(10),
-        universe=get_random_string_with_letters_digits(10),
-        weight=get_random_float(before_dot=2, after_dot=1)
-    )
-    response = characters.character_put(character=dict(body))
+    payload = payload_pool.take().with_name(character_name)
+    response = characters.character_put(character=payload)
     assert_equal(
         200,
         response.status_code,
         'Некорректный код ответа. Ожидается {first}, фактически {second}',
     )
     assert_equal(
-        body,
-        Character(**response.json()['result']),
+        payload.data,
+        response.record,
         'Тело ответа не соответствует ожидаемому. '
         'Ожидается {first}, фактически {second}',
     )
+    diff = collection_changes.diff()
+    assert_equal(
+        ([], [], [character_name]),
+        (list(diff.added), list(diff.removed), list(diff.modified)),
+        'Изменения коллекции не соответствуют ожидаемым. '
+        'Ожидается {first}, фактически {second}',
+    )
 
 
 def test_delete_exist_character(
         characters: CharactersController,
         character_name: str,
+        collection_changes: CollectionWatcher,
 ) -> None:
     """
     Удаление существующего персонажа. Пользователь авторизован.
@@ -152,8 +144,16 @@ def test_delete_exist_character(
         'Тело ответа не соответствует ожидаемому. '
         'Ожидается {first}, фактически {second}',
     )
+    diff = collection_changes.diff()
+    assert_equal(
+        ([], [name], []),
+        (list(diff.added), list(diff.removed), list(diff.modified)),
+        'Изменения коллекции не соответствуют ожидаемым. '
+        'Ожидается {first}, фактически {second}',
+    )
 
 
+@pytest.mark.collection_global
 def test_reset_characters_collection(characters: CharactersController) -> None:
     """
     Сброс коллекции в первоначальное состояние. Пользователь авторизован.
@@ -168,5 +168,5 @@ def test_reset_characters_collection(characters: CharactersController) -> None:
     )
     assert_equal(
         ServiceDBLimits.DEFAULT_DB_RECORD.value,
-        len(characters.characters_get().json()['result'])
+        sum(1 for _ in characters.characters_stream()),
     )
@@ -0,0 +1,118 @@
+"""Тесты записи о персонаже CharacterRecord (dataclass.py)."""
+import copy
+import pickle
+
+import pytest
+from asserts import assert_equal, assert_not_equal
+
+from characters_controller.dataclass import Character, CharacterRecord
+from characters_controller.fake_service import default_records
+
+RECORDS = default_records()[:3] + [
+    {'name': 'Only Name'},
+    {'name': 'Юникод', 'height': 180.5, 'weight': '80', 'universe': ''},
+]
+
+
+@pytest.mark.parametrize('data', RECORDS)
+def test_record_round_trip_with_character(data: dict) -> None:
+    """
+    Преобразование Character -> CharacterRecord -> Character.
+    Проверка, что значения всех полей сохраняются.
+    """
+    character = Character.model_validate(data)
+    record = CharacterRecord.from_character(character)
+    assert_equal(
+        character,
+        record.to_character(),
+        'Модель изменилась после преобразования. '
+        'Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        character.model_dump(),
+        record.as_dict(),
+        'Поля записи не совпадают с моделью. '
+        'Ожидается {first}, фактически {second}',
+    )
+
+
+@pytest.mark.parametrize('data', RECORDS)
+def test_record_from_dict_matches_character(data: dict) -> None:
+    """
+    Создание записи из ответа сервиса.
+    Проверка, что запись совпадает с записью из модели Character,
+    а поля, которых нет в модели, отбрасываются.
+    """
+    record = CharacterRecord.from_dict({**data, 'extra': 'value'})
+    assert_equal(
+        CharacterRecord.from_character(Character.model_validate(data)),
+        record,
+        'Записи из dict и из модели различаются: {first} и {second}',
+    )
+    assert_equal(
+        CharacterRecord(**data),
+        record,
+        'Записи из dict и из конструктора различаются: {first} и {second}',
+    )
+
+
+def test_record_is_read_only() -> None:
+    """
+    Изменение и удаление поля записи.
+    Проверка, что запись не меняется.
+    """
+    record = CharacterRecord(name='Hero', universe='Marvel')
+    with pytest.raises(AttributeError):
+        record.universe = 'DC'
+    with pytest.raises(AttributeError):
+        del record.name
+    with pytest.raises(AttributeError):
+        record.extra = 'value'
+    assert_equal(
+        CharacterRecord(name='Hero', universe='Marvel'),
+        record,
+        'Запись изменилась: {second}',
+    )
+
+
+@pytest.mark.parametrize(
+    'clone',
+    [
+        lambda record: pickle.loads(pickle.dumps(record)),
+        copy.copy,
+        copy.deepcopy,
+    ],
+    ids=['pickle', 'copy', 'deepcopy'],
+)
+def test_record_copies_are_equal(clone) -> None:
+    """
+    Сериализация pickle и копирование записи.
+    Проверка, что копия равна исходной записи и имеет тот же хэш.
+    """
+    record = CharacterRecord.from_dict(RECORDS[-1])
+    copied = clone(record)
+    assert_equal(
+        (record, hash(record)),
+        (copied, hash(copied)),
+        'Копия записи отличается: {first} и {second}',
+    )
+
+
+def test_record_equality() -> None:
+    """
+    Сравнение записей.
+    Проверка, что записи равны только при равенстве всех полей,
+    и не равны dict с теми же полями.
+    """
+    record = CharacterRecord(name='Hero', height=180)
+    assert_equal(
+        1,
+        len({record, CharacterRecord(name='Hero', height=180)}),
+        'Одинаковые записи различаются в множестве',
+    )
+    assert_not_equal(
+        record,
+        CharacterRecord(name='Hero', height=181),
+        'Записи с разными полями равны',
+    )
+    assert_not_equal(record, record.as_dict(), 'Запись равна dict')
@@ -0,0 +1,395 @@
+"""
+Тесты повторов запросов, ограничителя частоты и объединения
+одновременных запросов контроллера.
+Контроллеры подключаются к локальной замене сервиса через адаптер,
+который может вернуть заданные ответы или ошибки вместо ответов
+сервиса, поэтому тесты не зависят от выбранного --service.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pytest
+import requests as r
+from asserts import assert_equal, assert_greater_equal, assert_in
+
+from characters_controller.characters import CharactersController
+from characters_controller.fake_service import (
+    FAKE_BASE_URL,
+    FAKE_LOGIN,
+    FAKE_PASSWORD,
+    FakeCharactersService,
+    FakeServiceAdapter,
+)
+from characters_controller.instrumentation import CallRecorder
+from characters_controller.transport import (
+    RetryPolicy,
+    SingleFlight,
+    TokenBucket,
+    build_response,
+)
+
+# Ответ вместо ответа сервиса (код и заголовки) или ошибка запроса
+Scripted = Union[Tuple[int, Dict[str, str]], r.RequestException]
+# Предельное время ожидания потоков в тестах объединения запросов
+WAIT_TIMEOUT = 5.0
+
+
+class _ScriptedAdapter(FakeServiceAdapter):
+    def __init__(
+            self,
+            service: FakeCharactersService,
+            script: Iterable[Scripted] = (),
+    ) -> None:
+        """
+        Адаптер, отвечающий на запросы по очереди ответами из script,
+        а после их окончания - ответами сервиса.
+        """
+        super().__init__(service)
+        self.script = list(script)
+        # Методы запросов, дошедших до адаптера
+        self.sent: List[str] = []
+
+    def send(self, request: r.PreparedRequest, **kwargs: Any) -> r.Response:
+        self.sent.append(request.method)
+        if not self.script:
+            return super().send(request, **kwargs)
+        scripted = self.script.pop(0)
+        if isinstance(scripted, r.RequestException):
+            raise scripted
+        status_code, headers = scripted
+        return build_response(request, status_code, headers, b'{}')
+
+
+class _GatedAdapter(FakeServiceAdapter):
+    def __init__(
+            self,
+            service: FakeCharactersService,
+            error: Optional[r.RequestException] = None,
+    ) -> None:
+        """
+        Адаптер, задерживающий первый GET запрос: ответ сервиса уже
+        получен, но возвращается только после вызова release.
+        :param error - ошибка, которой завершается задержанный запрос
+        вместо ответа.
+        """
+        super().__init__(service)
+        self.error = error
+        self.sent: List[str] = []
+        self.held = threading.Event()
+        self._gate = threading.Event()
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        self._gate.set()
+
+    def send(self, request: r.PreparedRequest, **kwargs: Any) -> r.Response:
+        response = super().send(request, **kwargs)
+        with self._lock:
+            self.sent.append(request.method)
+            first = request.method == 'GET' and not self.held.is_set()
+            if first:
+                self.held.set()
+        if first:
+            self._gate.wait(WAIT_TIMEOUT)
+            if self.error is not None:
+                raise self.error
+        return response
+
+
+def _controller(
+        adapter: FakeServiceAdapter,
+        **kwargs: Any,
+) -> CharactersController:
+    controller = CharactersController(
+        base_url=FAKE_BASE_URL,
+        user_login=FAKE_LOGIN,
+        user_password=FAKE_PASSWORD,
+        recorder=CallRecorder(),
+        **kwargs,
+    )
+    controller.mount(FAKE_BASE_URL, adapter)
+    return controller
+
+
+@pytest.fixture()
+def delays(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Фикстура, записывающая паузы перед повторами вместо ожидания."""
+    delays: List[float] = []
+    monkeypatch.setattr(time, 'sleep', delays.append)
+    return delays
+
+
+@pytest.mark.parametrize('status_code', [500, 503])
+def test_post_is_not_retried_after_response(
+        delays: List[float],
+        status_code: int,
+) -> None:
+    """
+    Создание персонажа, сервис отвечает ошибкой 5xx.
+    Проверка, что POST не повторяется: сервис мог создать запись.
+    """
+    adapter = _ScriptedAdapter(FakeCharactersService(), [(status_code, {})])
+    with _controller(adapter, retry=RetryPolicy(backoff=0)) as controller:
+        response = controller.character_post(
+            character={'name': 'Retry Hero', 'universe': 'Marvel'},
+        )
+    assert_equal(
+        status_code,
+        response.status_code,
+        'Некорректный код ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        ['POST'],
+        adapter.sent,
+        'POST повторен после ответа сервиса. Запросы - {second}',
+    )
+
+
+def test_post_is_not_retried_after_read_timeout(
+        delays: List[float],
+) -> None:
+    """
+    Создание персонажа, ответ не получен за время таймаута.
+    Проверка, что POST не повторяется и ошибка передается вызывающему.
+    """
+    adapter = _ScriptedAdapter(FakeCharactersService(), [r.ReadTimeout()])
+    with _controller(adapter, retry=RetryPolicy(backoff=0)) as controller:
+        with pytest.raises(r.ReadTimeout):
+            controller.character_post(character={'name': 'Retry Hero'})
+    assert_equal(
+        ['POST'],
+        adapter.sent,
+        'POST повторен после таймаута чтения. Запросы - {second}',
+    )
+
+
+@pytest.mark.parametrize('method', ['GET', 'POST'])
+def test_retry_after_is_honored(
+        delays: List[float],
+        method: str,
+) -> None:
+    """
+    Запрос, на который сервис сначала отвечает 429 с Retry-After.
+    Проверка, что запрос повторяется через указанное сервисом время
+    и возвращается ответ на повтор.
+    """
+    service = FakeCharactersService()
+    adapter = _ScriptedAdapter(service, [(429, {'Retry-After': '2'})])
+    with _controller(adapter, retry=RetryPolicy(backoff=0)) as controller:
+        if method == 'GET':
+            response = controller.characters_get()
+        else:
+            response = controller.character_post(
+                character={'name': 'Retry Hero'},
+            )
+    assert_equal(
+        200,
+        response.status_code,
+        'Некорректный код ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        [method, method],
+        adapter.sent,
+        'Некорректные запросы к сервису. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(
+        [2.0],
+        delays,
+        'Пауза перед повтором не совпадает с Retry-After. '
+        'Ожидается {first}, фактически {second}',
+    )
+
+
+def test_retry_after_is_limited_by_max_delay(delays: List[float]) -> None:
+    """
+    Запрос, на который сервис отвечает 503 с большим Retry-After.
+    Проверка, что пауза перед повтором не превышает max_delay.
+    """
+    adapter = _ScriptedAdapter(
+        FakeCharactersService(), [(503, {'Retry-After': '120'})],
+    )
+    retry = RetryPolicy(backoff=0, max_delay=5.0)
+    with _controller(adapter, retry=retry) as controller:
+        controller.characters_get()
+    assert_equal(
+        [5.0],
+        delays,
+        'Некорректная пауза перед повтором. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def test_retries_stop_at_limit(delays: List[float]) -> None:
+    """
+    Запрос, на который сервис все время отвечает 503.
+    Проверка, что после retries повторов возвращается последний ответ.
+    """
+    adapter = _ScriptedAdapter(FakeCharactersService(), [(503, {})] * 10)
+    retry = RetryPolicy(retries=2, backoff=0)
+    with _controller(adapter, retry=retry) as controller:
+        response = controller.characters_get()
+    assert_equal(
+        503,
+        response.status_code,
+        'Некорректный код ответа. Ожидается {first}, фактически {second}',
+    )
+    assert_equal(
+        ['GET'] * 3,
+        adapter.sent,
+        'Некорректное количество попыток. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(2, len(delays), 'Некорректное количество пауз {second}')
+
+
+def test_network_error_retries_stop_at_limit(delays: List[float]) -> None:
+    """
+    Запрос, который все время завершается сетевой ошибкой.
+    Проверка, что после retries повторов ошибка передается вызывающему.
+    """
+    adapter = _ScriptedAdapter(
+        FakeCharactersService(), [r.ConnectionError()] * 10,
+    )
+    retry = RetryPolicy(retries=2, backoff=0)
+    with _controller(adapter, retry=retry) as controller:
+        with pytest.raises(r.ConnectionError):
+            controller.characters_get()
+    assert_equal(
+        ['GET'] * 3,
+        adapter.sent,
+        'Некорректное количество попыток. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def test_token_bucket_paces_requests() -> None:
+    """
+    Серия запросов через ограничитель частоты без запаса (burst=1).
+    Проверка, что запросы отправляются не чаще заданной частоты.
+    """
+    rate, count = 50.0, 11
+    adapter = _ScriptedAdapter(FakeCharactersService())
+    with _controller(
+            adapter, rate_limiter=TokenBucket(rate, burst=1),
+    ) as controller:
+        started = time.monotonic()
+        for _ in range(count):
+            controller.characters_get()
+        elapsed = time.monotonic() - started
+    assert_equal(count, len(adapter.sent), 'Запросы не дошли до сервиса')
+    # Первый запрос проходит сразу, остальные ждут по 1 / rate секунд
+    assert_greater_equal(
+        elapsed,
+        (count - 1) / rate * 0.9,
+        'Запросы отправлены быстрее ограничения: {first:.3f}s '
+        'вместо {second:.3f}s',
+    )
+
+
+def _wait_for(condition: Any) -> None:
+    """Метод, ожидающий выполнения condition() не дольше WAIT_TIMEOUT."""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail('Не дождались одновременных запросов')
+        time.sleep(0.001)
+
+
+def test_concurrent_gets_are_coalesced() -> None:
+    """
+    Несколько одновременных одинаковых GET запросов с объединением.
+    Проверка, что до сервиса доходит один запрос, а ответ получают
+    все потоки.
+    """
+    count = 8
+    adapter = _GatedAdapter(FakeCharactersService())
+    single_flight = SingleFlight()
+    with _controller(adapter, single_flight=single_flight) as controller, \
+            ThreadPoolExecutor(count) as executor:
+        futures = [
+            executor.submit(controller.characters_get) for _ in range(count)
+        ]
+        _wait_for(lambda: single_flight.coalesced == count - 1)
+        adapter.release()
+        responses = [future.result(WAIT_TIMEOUT) for future in futures]
+    assert_equal(
+        ['GET'],
+        adapter.sent,
+        'Некорректные запросы к сервису. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(
+        [200] * count,
+        [response.status_code for response in responses],
+        'Некорректные коды ответа. Ожидается {first}, фактически {second}',
+    )
+
+
+def test_get_after_mutation_is_not_coalesced() -> None:
+    """
+    GET запрос, отправленный после создания персонажа, пока выполняется
+    GET запрос, начатый до него.
+    Проверка, что второй запрос не получает ответ, полученный до
+    изменения коллекции, и видит созданного персонажа.
+    """
+    name = 'Coalesced Hero'
+    adapter = _GatedAdapter(FakeCharactersService())
+    single_flight = SingleFlight()
+    with _controller(adapter, single_flight=single_flight) as controller, \
+            ThreadPoolExecutor(1) as executor:
+        before = executor.submit(controller.characters_get)
+        _wait_for(adapter.held.is_set)
+        controller.character_post(character={'name': name})
+        after = controller.characters_get()
+        adapter.release()
+        before.result(WAIT_TIMEOUT)
+    assert_equal(
+        ['GET', 'POST', 'GET'],
+        adapter.sent,
+        'Некорректные запросы к сервису. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(0, single_flight.coalesced, 'GET после POST объединен')
+    assert_in(
+        name,
+        [record['name'] for record in after.result],
+        'Ответ не содержит созданного персонажа {first}',
+    )
+
+
+def test_coalesced_gets_receive_leader_error() -> None:
+    """
+    Несколько одновременных одинаковых GET запросов с объединением,
+    запрос к сервису завершается сетевой ошибкой.
+    Проверка, что ошибку получают все ожидающие потоки.
+    """
+    count = 8
+    error = r.ConnectionError('service is unavailable')
+    adapter = _GatedAdapter(FakeCharactersService(), error=error)
+    single_flight = SingleFlight()
+    with _controller(
+            adapter,
+            retry=RetryPolicy(retries=0),
+            single_flight=single_flight,
+    ) as controller, ThreadPoolExecutor(count) as executor:
+        futures = [
+            executor.submit(controller.characters_get) for _ in range(count)
+        ]
+        _wait_for(lambda: single_flight.coalesced == count - 1)
+        adapter.release()
+        errors = [future.exception(WAIT_TIMEOUT) for future in futures]
+    assert_equal(
+        ['GET'],
+        adapter.sent,
+        'Некорректные запросы к сервису. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(
+        [error] * count,
+        errors,
+        'Не все потоки получили ошибку запроса. Ожидается {first}, '
+        'фактически {second}',
+    )
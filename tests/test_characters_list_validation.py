@@ -0,0 +1,101 @@
+"""
+Тесты валидации списка персонажей с индексами ошибочных записей
+(utilities/utils.py).
+"""
+import json
+from typing import Dict, List
+
+import pytest
+from asserts import assert_equal
+
+from characters_controller.fake_service import default_records
+from utilities.utils import (
+    RecordValidationError,
+    get_characters_list_errors,
+    get_characters_list_errors_from_json,
+)
+
+
+@pytest.fixture()
+def records() -> List[Dict]:
+    """
+    Фикстура, возвращающая дефолтные записи коллекции, в которых
+    испорчены записи 1 (тип поля education) и 3 (нет поля name).
+    """
+    records = default_records()[:5]
+    records[1] = {**records[1], 'education': 123}
+    records[3] = {
+        field: value for field, value in records[3].items()
+        if field != 'name'
+    }
+    return records
+
+
+EXPECTED_FIELDS = [(1, 'education'), (3, 'name')]
+
+
+def test_list_errors_report_indices_and_fields(records: List[Dict]) -> None:
+    """
+    Валидация списка с некорректными записями.
+    Проверка, что возвращены ошибки всех некорректных записей
+    с их индексами и полями.
+    """
+    errors = get_characters_list_errors(records)
+    assert_equal(
+        EXPECTED_FIELDS,
+        [(error.index, error.field) for error in errors],
+        'Некорректные ошибки валидации. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def test_json_list_errors_report_indices_and_fields(
+        records: List[Dict],
+) -> None:
+    """
+    Валидация тела ответа с некорректными записями из байтов.
+    Проверка, что индексы записей считаются внутри поля result.
+    """
+    errors = get_characters_list_errors_from_json(
+        json.dumps({'result': records}).encode(),
+    )
+    assert_equal(
+        EXPECTED_FIELDS,
+        [(error.index, error.field) for error in errors],
+        'Некорректные ошибки валидации. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def test_valid_list_has_no_errors() -> None:
+    """
+    Валидация корректного списка персонажей.
+    Проверка, что ошибок нет в обоих вариантах валидации.
+    """
+    records = default_records()
+    assert_equal(
+        ([], []),
+        (
+            get_characters_list_errors(records),
+            get_characters_list_errors_from_json(
+                json.dumps({'result': records}),
+            ),
+        ),
+        'Корректный список не прошел валидацию: {second}',
+    )
+
+
+def test_json_without_list_reports_result_field() -> None:
+    """
+    Валидация тела ответа, в котором result - не список.
+    Проверка, что ошибка относится к полю result, а не к записи.
+    """
+    errors = get_characters_list_errors_from_json(b'{"result": 1}')
+    assert_equal(
+        [RecordValidationError(
+            None, 'result', 'Input should be a valid array',
+        )],
+        errors,
+        'Некорректные ошибки валидации. Ожидается {first}, '
+        'фактически {second}',
+    )
@@ -0,0 +1,182 @@
+"""
+Тесты кэша снимка коллекции (characters_controller/snapshot.py)
+на локальной замене сервиса в том же процессе.
+"""
+from typing import Any, Callable, Optional
+
+import pytest
+import requests as r
+from asserts import assert_equal, assert_false, assert_in, assert_is
+
+from characters_controller.characters import CharactersController
+from characters_controller.fake_service import (
+    FAKE_BASE_URL,
+    FAKE_LOGIN,
+    FAKE_PASSWORD,
+    FakeCharactersService,
+    FakeServiceAdapter,
+)
+from characters_controller.instrumentation import CallRecorder
+from characters_controller.snapshot import CharactersSnapshotCache
+from characters_controller.transport import RetryPolicy
+
+NAME = 'Snapshot Hero'
+
+
+class _CountingAdapter(FakeServiceAdapter):
+    def __init__(self, service: FakeCharactersService) -> None:
+        """Адаптер, считающий запросы коллекции (GET /characters)."""
+        super().__init__(service)
+        self.fetches = 0
+        # Действие, выполняемое один раз после ответа сервиса на запрос
+        # коллекции, но до возврата ответа контроллеру
+        self.on_fetch: Optional[Callable[[], Any]] = None
+        # Ошибка, которой завершаются запросы, меняющие коллекцию
+        self.error: Optional[r.RequestException] = None
+
+    def send(self, request: r.PreparedRequest, **kwargs: Any) -> r.Response:
+        if request.method != 'GET' and self.error is not None:
+            raise self.error
+        response = super().send(request, **kwargs)
+        if request.path_url.endswith('/characters'):
+            self.fetches += 1
+            on_fetch, self.on_fetch = self.on_fetch, None
+            if on_fetch is not None:
+                on_fetch()
+        return response
+
+
+@pytest.fixture()
+def adapter() -> _CountingAdapter:
+    return _CountingAdapter(FakeCharactersService())
+
+
+@pytest.fixture()
+def controller(adapter: _CountingAdapter) -> CharactersController:
+    with CharactersController(
+        base_url=FAKE_BASE_URL,
+        user_login=FAKE_LOGIN,
+        user_password=FAKE_PASSWORD,
+        recorder=CallRecorder(),
+        retry=RetryPolicy(retries=0),
+    ) as controller:
+        controller.mount(FAKE_BASE_URL, adapter)
+        yield controller
+
+
+@pytest.fixture()
+def cache(controller: CharactersController) -> CharactersSnapshotCache:
+    return CharactersSnapshotCache(controller)
+
+
+def _assert_fetches(expected: int, adapter: _CountingAdapter) -> None:
+    assert_equal(
+        expected,
+        adapter.fetches,
+        'Некорректное количество запросов коллекции. Ожидается {first}, '
+        'фактически {second}',
+    )
+
+
+def test_snapshot_is_reused_within_ttl(
+        cache: CharactersSnapshotCache,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Повторное получение снимка до истечения ttl.
+    Проверка, что коллекция запрашивается у сервиса один раз.
+    """
+    snapshot = cache.get()
+    assert_is(snapshot, cache.get(), 'Снимок запрошен заново')
+    _assert_fetches(1, adapter)
+
+
+def test_snapshot_is_fetched_after_ttl(
+        cache: CharactersSnapshotCache,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Получение снимка после истечения ttl.
+    Проверка, что коллекция запрашивается у сервиса заново.
+    """
+    cache.get().fetched_at -= cache.ttl
+    cache.get()
+    _assert_fetches(2, adapter)
+
+
+def test_mutations_update_snapshot_in_place(
+        cache: CharactersSnapshotCache,
+        controller: CharactersController,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Создание, изменение и удаление персонажа через контроллер.
+    Проверка, что изменения применяются к снимку без запроса коллекции.
+    """
+    cache.get()
+    controller.character_post(character={'name': NAME, 'universe': 'A'})
+    assert_equal(
+        'A',
+        cache.get().records[NAME]['universe'],
+        'Созданный персонаж не добавлен в снимок',
+    )
+    controller.character_put(character={'name': NAME, 'universe': 'B'})
+    assert_equal(
+        'B',
+        cache.get().records[NAME]['universe'],
+        'Изменение персонажа не применено к снимку',
+    )
+    controller.character_delete(name=NAME)
+    assert_false(NAME in cache.get(), 'Удаленный персонаж остался в снимке')
+    _assert_fetches(1, adapter)
+
+
+def test_reset_invalidates_snapshot(
+        cache: CharactersSnapshotCache,
+        controller: CharactersController,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Сброс коллекции через контроллер.
+    Проверка, что следующий снимок запрашивается у сервиса.
+    """
+    cache.get()
+    controller.reset_post()
+    cache.get()
+    _assert_fetches(2, adapter)
+
+
+def test_failed_mutation_invalidates_snapshot(
+        cache: CharactersSnapshotCache,
+        controller: CharactersController,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Удаление персонажа, запрос завершается сетевой ошибкой.
+    Проверка, что снимок с неизвестным состоянием не используется.
+    """
+    name = cache.get().random_name()
+    adapter.error = r.ConnectionError()
+    with pytest.raises(r.ConnectionError):
+        controller.character_delete(name=name)
+    cache.get()
+    _assert_fetches(2, adapter)
+
+
+def test_mutation_during_fetch_is_not_lost(
+        cache: CharactersSnapshotCache,
+        controller: CharactersController,
+        adapter: _CountingAdapter,
+) -> None:
+    """
+    Создание персонажа, пока запрос коллекции уже получил ответ,
+    но снимок еще не сохранен.
+    Проверка, что снимок без созданного персонажа не сохраняется,
+    и следующий снимок его содержит.
+    """
+    adapter.on_fetch = lambda: controller.character_post(
+        character={'name': NAME},
+    )
+    assert_false(NAME in cache.get(), 'Снимок запрошен после создания')
+    assert_in(NAME, cache.get(), 'Сохранен снимок без {first}')
+    _assert_fetches(2, adapter)
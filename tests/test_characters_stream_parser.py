@@ -0,0 +1,93 @@
+"""
+Тесты инкрементального разбора списка персонажей
+(characters_controller/streaming.py): тело ответа подается кусками
+любой длины, результат сравнивается с json.loads.
+"""
+import json
+from typing import Iterator, List
+
+import pytest
+from asserts import assert_equal
+
+from characters_controller.dataclass import Character
+from characters_controller.fake_service import default_records
+from characters_controller.streaming import (
+    CharactersStreamParser,
+    iter_characters,
+)
+
+# Строки со служебными символами json, экранированием и символами,
+# которые занимают в utf-8 несколько байтов
+TRICKY_RECORDS = [
+    {'name': 'Brace {Hero}', 'universe': '[Earth-616]', 'height': 180},
+    {'name': 'Quote "Hero"', 'education': 'back\\slash\\', 'weight': 1.5},
+    {'name': 'Юникод Герой', 'other_aliases': '🦸 ✓', 'identity': None},
+    {'name': 'Escapes', 'universe': 'tab\tnew\nline \\"}]', 'height': None},
+    {'name': '\\', 'education': '\\\\"', 'identity': '{"name": "x"}'},
+]
+
+
+def _bodies() -> Iterator[bytes]:
+    records = TRICKY_RECORDS + default_records()[:3]
+    yield json.dumps({'result': records}).encode()
+    yield json.dumps(
+        {'result': records}, ensure_ascii=False, indent=2,
+    ).encode()
+
+
+def _chunks(body: bytes, size: int) -> List[bytes]:
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize('body', list(_bodies()), ids=['ascii', 'utf8'])
+def test_records_match_json_loads_for_any_chunk_size(body: bytes) -> None:
+    """
+    Разбор тела ответа кусками длиной от 1 байта до всего тела.
+    Проверка, что записи совпадают с результатом json.loads при любом
+    разбиении, в том числе внутри экранирования и многобайтовых
+    символов.
+    """
+    expected = json.loads(body)['result']
+    wrong_sizes = []
+    for size in range(1, len(body) + 1):
+        parser = CharactersStreamParser()
+        records = [
+            json.loads(record)
+            for chunk in _chunks(body, size)
+            for record in parser.feed(chunk)
+        ]
+        if records != expected:
+            wrong_sizes.append(size)
+    assert_equal(
+        [],
+        wrong_sizes,
+        'Записи не совпадают с json.loads при длине куска {second}',
+    )
+
+
+def test_iter_characters_validates_records() -> None:
+    """
+    Получение персонажей из тела ответа кусками по 7 байтов.
+    Проверка, что персонажи совпадают с валидацией всего списка.
+    """
+    body = next(_bodies())
+    assert_equal(
+        [Character.model_validate(record)
+         for record in json.loads(body)['result']],
+        list(iter_characters(_chunks(body, 7))),
+        'Персонажи не совпадают с ожидаемыми',
+    )
+
+
+def test_empty_result_has_no_records() -> None:
+    """
+    Разбор тела ответа с пустым списком персонажей.
+    Проверка, что записей нет.
+    """
+    parser = CharactersStreamParser()
+    assert_equal(
+        [],
+        [record for chunk in _chunks(b'{"result": []}', 1)
+         for record in parser.feed(chunk)],
+        'Из пустого списка получены записи {second}',
+    )
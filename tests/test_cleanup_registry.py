@@ -0,0 +1,358 @@
+"""
+Тесты реестра созданных персонажей (characters_controller/cleanup.py)
+на локальной замене сервиса в том же процессе.
+"""
+from typing import Any, Dict, Union
+
+import pytest
+import requests as r
+from asserts import assert_equal, assert_false, assert_true
+
+from characters_controller.characters import CharactersController
+from characters_controller.cleanup import CleanupRegistry
+from characters_controller.fake_service import (
+    FAKE_BASE_URL,
+    FAKE_LOGIN,
+    FAKE_PASSWORD,
+    FakeCharactersService,
+    FakeServiceAdapter,
+    default_records,
+)
+from characters_controller.instrumentation import CallRecorder
+from characters_controller.transport import RetryPolicy, build_response
+
+NAME = 'Cleanup Hero'
+# Запись дефолтного набора, созданная не тестом
+FOREIGN_NAME = default_records()[0]['name']
+
+
+class _FailingAdapter(FakeServiceAdapter):
+    def __init__(self, service: FakeCharactersService) -> None:
+        """
+        Адаптер, завершающий следующий запрос с заданным методом
+        ошибкой сервера или сетевой ошибкой.
+        """
+        super().__init__(service)
+        # Код ответа или ошибка для следующего запроса по методу
+        self.failures: Dict[str, Union[int, r.RequestException]] = {}
+        self.resets = 0
+
+    def send(self, request: r.PreparedRequest, **kwargs: Any) -> r.Response:
+        if request.path_url.rstrip('/').endswith('/reset'):
+            self.resets += 1
+        failure = self.failures.pop(request.method, None)
+        if isinstance(failure, r.RequestException):
+            raise failure
+        if failure is not None:
+            return build_response(
+                request, failure, {}, b'{"error": "Internal error"}',
+            )
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture()
+def adapter() -> _FailingAdapter:
+    return _FailingAdapter(FakeCharactersService())
+
+
+@pytest.fixture()
+def controller(adapter: _FailingAdapter) -> CharactersController:
+    with CharactersController(
+        base_url=FAKE_BASE_URL,
+        user_login=FAKE_LOGIN,
+        user_password=FAKE_PASSWORD,
+        recorder=CallRecorder(),
+        retry=RetryPolicy(retries=0),
+    ) as controller:
+        controller.mount(FAKE_BASE_URL, adapter)
+        yield controller
+
+
+@pytest.fixture()
+def registry(controller: CharactersController) -> CleanupRegistry:
+    registry = CleanupRegistry()
+    controller.add_mutation_listener(registry)
+    yield registry
+    controller.remove_mutation_listener(registry)
+
+
+def _names(controller: CharactersController) -> set:
+    return {record['name'] for record in controller.characters_get().result}
+
+
+def _assert_state(
+        expected: Any,
+        actual: Any,
+        what: str,
+) -> None:
+    assert_equal(
+        expected,
+        actual,
+        f'{what}. Ожидается {{first}}, фактически {{second}}',
+    )
+
+
+def test_created_character_is_deleted(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Создание персонажа и очистка.
+    Проверка, что персонаж удален без сброса коллекции.
+    """
+    controller.character_post(character={'name': NAME})
+    _assert_state({NAME}, registry.names, 'Некорректный реестр')
+    result = registry.cleanup(controller)
+    _assert_state(
+        (1, [], False, False),
+        (result.deleted, result.leftovers, result.unknown_changes,
+         result.reset),
+        'Некорректный результат очистки',
+    )
+    assert_false(NAME in _names(controller), 'Персонаж не удален')
+    _assert_state(0, adapter.resets, 'Некорректное количество сбросов')
+
+
+def test_rejected_create_is_not_registered(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+) -> None:
+    """
+    Создание уже существующего персонажа (ответ 400).
+    Проверка, что чужой персонаж не попадает в реестр.
+    """
+    controller.character_post(character={'name': FOREIGN_NAME})
+    _assert_state(set(), registry.names, 'Некорректный реестр')
+    assert_false(registry.dirty, 'Отклоненный запрос требует сброса')
+
+
+@pytest.mark.parametrize(
+    'failure', [500, r.ConnectionError()], ids=['5xx', 'network'],
+)
+def test_create_with_unknown_outcome_is_registered(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+        failure: Union[int, r.RequestException],
+) -> None:
+    """
+    Создание персонажа, ответ - ошибка сервера или сетевая ошибка.
+    Проверка, что персонаж регистрируется (мог быть создан), а при
+    очистке отсутствие персонажа считается успешным удалением.
+    """
+    adapter.failures['POST'] = failure
+    try:
+        controller.character_post(character={'name': NAME})
+    except r.RequestException:
+        pass
+    _assert_state({NAME}, registry.names, 'Некорректный реестр')
+    result = registry.cleanup(controller)
+    assert_true(result.clean, f'Некорректный результат очистки: {result}')
+    _assert_state(0, adapter.resets, 'Некорректное количество сбросов')
+
+
+def test_own_update_and_delete_need_no_reset(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Изменение и удаление созданного тестом персонажа.
+    Проверка, что сброс не требуется и удаленный персонаж
+    не удаляется повторно.
+    """
+    controller.character_post(character={'name': NAME})
+    controller.character_put(character={'name': NAME, 'universe': 'X'})
+    assert_false(registry.dirty, 'Изменение своей записи требует сброса')
+    controller.character_delete(name=NAME)
+    _assert_state(set(), registry.names, 'Некорректный реестр')
+    result = registry.cleanup(controller)
+    _assert_state(
+        (0, True), (result.deleted, result.clean),
+        'Некорректный результат очистки',
+    )
+    _assert_state(0, adapter.resets, 'Некорректное количество сбросов')
+
+
+def test_own_delete_with_unknown_outcome_stays_registered(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Удаление созданного тестом персонажа, запрос завершается сетевой
+    ошибкой.
+    Проверка, что персонаж остается в реестре и удаляется очисткой.
+    """
+    controller.character_post(character={'name': NAME})
+    adapter.failures['DELETE'] = r.ConnectionError()
+    with pytest.raises(r.ConnectionError):
+        controller.character_delete(name=NAME)
+    _assert_state(
+        ({NAME}, False), (registry.names, registry.dirty),
+        'Некорректный реестр',
+    )
+    result = registry.cleanup(controller)
+    _assert_state(
+        (1, True), (result.deleted, result.clean),
+        'Некорректный результат очистки',
+    )
+    assert_false(NAME in _names(controller), 'Персонаж не удален')
+
+
+@pytest.mark.parametrize('mutation', ['update', 'delete'])
+def test_foreign_change_resets_collection(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+        mutation: str,
+) -> None:
+    """
+    Изменение или удаление записи, созданной не тестом.
+    Проверка, что очистка сбрасывает коллекцию в дефолтное состояние.
+    """
+    if mutation == 'update':
+        controller.character_put(
+            character={'name': FOREIGN_NAME, 'universe': 'X'},
+        )
+    else:
+        controller.character_delete(name=FOREIGN_NAME)
+    assert_true(registry.dirty, 'Изменение чужой записи не требует сброса')
+    result = registry.cleanup(controller)
+    _assert_state(
+        (True, True, True),
+        (result.unknown_changes, result.reset, result.clean),
+        'Некорректный результат очистки',
+    )
+    _assert_state(1, adapter.resets, 'Некорректное количество сбросов')
+    assert_true(FOREIGN_NAME in _names(controller), 'Запись не восстановлена')
+
+
+def test_rejected_foreign_change_is_ignored(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+) -> None:
+    """
+    Удаление несуществующего персонажа (ответ 400).
+    Проверка, что отклоненный запрос не требует сброса.
+    """
+    controller.character_delete(name=NAME)
+    assert_false(registry.dirty, 'Отклоненный запрос требует сброса')
+
+
+def test_failed_foreign_change_marks_registry_dirty(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Удаление чужой записи, запрос завершается ошибкой сервера.
+    Проверка, что результат считается неизвестным и нужен сброс.
+    """
+    adapter.failures['DELETE'] = 503
+    controller.character_delete(name=FOREIGN_NAME)
+    assert_true(registry.dirty, 'Неизвестный результат не требует сброса')
+
+
+def test_reset_clears_registry(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Сброс коллекции после создания персонажа и изменения чужой записи.
+    Проверка, что после сброса очищать нечего.
+    """
+    controller.character_post(character={'name': NAME})
+    controller.character_delete(name=FOREIGN_NAME)
+    controller.reset_post()
+    _assert_state(
+        (set(), False), (registry.names, registry.dirty),
+        'Некорректный реестр после сброса',
+    )
+    result = registry.cleanup(controller)
+    _assert_state(
+        (0, False), (result.deleted, result.reset),
+        'Некорректный результат очистки',
+    )
+    _assert_state(1, adapter.resets, 'Некорректное количество сбросов')
+
+
+def test_failed_reset_marks_registry_dirty(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Сброс коллекции, запрос завершается сетевой ошибкой.
+    Проверка, что состояние коллекции считается неизвестным.
+    """
+    adapter.failures['POST'] = r.ConnectionError()
+    with pytest.raises(r.ConnectionError):
+        controller.reset_post()
+    assert_true(registry.dirty, 'Неизвестный результат сброса не учтен')
+
+
+def test_keep_leaves_created_characters(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+) -> None:
+    """
+    Создание персонажа, вызов keep и очистка.
+    Проверка, что оставленный персонаж не удаляется.
+    """
+    controller.character_post(character={'name': NAME})
+    registry.keep()
+    result = registry.cleanup(controller)
+    _assert_state(
+        (0, True), (result.deleted, result.clean),
+        'Некорректный результат очистки',
+    )
+    assert_true(NAME in _names(controller), 'Оставленный персонаж удален')
+
+
+def test_failed_delete_resets_collection(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Очистка, удаление созданного персонажа завершается сетевой ошибкой.
+    Проверка, что персонаж указан в результате и коллекция сброшена.
+    """
+    controller.character_post(character={'name': NAME})
+    adapter.failures['DELETE'] = r.ConnectionError()
+    result = registry.cleanup(controller)
+    _assert_state(
+        ([NAME], True, True), (result.leftovers, result.reset, result.clean),
+        'Некорректный результат очистки',
+    )
+    assert_false(NAME in _names(controller), 'Персонаж не удален сбросом')
+
+
+def test_cleanup_without_reset_reports_leftovers(
+        controller: CharactersController,
+        registry: CleanupRegistry,
+        adapter: _FailingAdapter,
+) -> None:
+    """
+    Очистка без права сброса (параллельный запуск) после изменения
+    чужой записи.
+    Проверка, что коллекция не сбрасывается, а созданные персонажи
+    перечисляются в результате.
+    """
+    controller.character_post(character={'name': NAME})
+    controller.character_delete(name=FOREIGN_NAME)
+    result = registry.cleanup(controller, reset=False)
+    _assert_state(
+        ([NAME], True, False, False),
+        (result.leftovers, result.unknown_changes, result.reset,
+         result.clean),
+        'Некорректный результат очистки',
+    )
+    _assert_state(0, adapter.resets, 'Некорректное количество сбросов')
+    _assert_state(
+        (set(), False), (registry.names, registry.dirty),
+        'Реестр не очищен после очистки',
+    )
@@ -0,0 +1,98 @@
+"""
+Тесты генератора нагрузки (utilities/load.py) на локальной замене
+сервиса в том же процессе.
+"""
+import random
+
+from asserts import assert_equal, assert_true
+
+from characters_controller.characters import CharactersController
+from characters_controller.enums import ServiceDBLimits
+from characters_controller.fake_service import (
+    FAKE_BASE_URL,
+    FAKE_LOGIN,
+    FAKE_PASSWORD,
+    FakeCharactersService,
+    FakeServiceAdapter,
+)
+from characters_controller.instrumentation import CallRecorder
+from utilities.load import LoadGenerator, LoadOperation, LoadProfile
+
+# Один поток: запросы выполняются по очереди, поэтому персонаж
+# не может быть удален другим потоком между выбором имени и запросом
+PROFILE = dict(rps=1000.0, duration=0.2, workers=1)
+
+
+def _controller(
+        service: FakeCharactersService,
+        password: str = FAKE_PASSWORD,
+) -> CharactersController:
+    controller = CharactersController(
+        base_url=FAKE_BASE_URL,
+        user_login=FAKE_LOGIN,
+        user_password=password,
+        recorder=CallRecorder(),
+    )
+    controller.mount(FAKE_BASE_URL, FakeServiceAdapter(service))
+    return controller
+
+
+def test_load_has_no_errors_on_clean_service() -> None:
+    """
+    Нагрузка со смесью операций по умолчанию на чистой коллекции.
+    Проверка, что запросы не обращаются к удаленным персонажам
+    (нет ошибок No such name) и созданные персонажи удалены.
+    """
+    service = FakeCharactersService()
+    profile = LoadProfile(**PROFILE)
+    with _controller(service) as controller:
+        report = LoadGenerator(
+            controller, profile, rng=random.Random(0),
+        ).run()
+    assert_equal(
+        len(list(profile.schedule())),
+        len(report.samples),
+        'Некорректное количество результатов. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal({}, report.errors, 'Ошибки при нагрузке: {second}')
+    assert_true(
+        report.cleanup.clean,
+        f'Персонажи не удалены после нагрузки: {report.cleanup}',
+    )
+    assert_equal(
+        ServiceDBLimits.DEFAULT_DB_RECORD.value,
+        len(service),
+        'Коллекция изменилась после нагрузки. Ожидается {first} записей, '
+        'фактически {second}',
+    )
+
+
+def test_load_without_authorization_keeps_all_samples() -> None:
+    """
+    Нагрузка с некорректным паролем.
+    Проверка, что результат каждого запроса попадает в отчет
+    с ошибкой авторизации.
+    """
+    profile = LoadProfile(**PROFILE)
+    with _controller(FakeCharactersService(), 'wrong-password') as controller:
+        report = LoadGenerator(
+            controller, profile, rng=random.Random(0),
+        ).run()
+    count = len(list(profile.schedule()))
+    assert_equal(
+        count,
+        len(report.samples),
+        'Некорректное количество результатов. Ожидается {first}, '
+        'фактически {second}',
+    )
+    assert_equal(
+        {'UNAUTHORIZED': count},
+        report.errors,
+        'Некорректные ошибки. Ожидается {first}, фактически {second}',
+    )
+    assert_true(
+        any(sample.operation is LoadOperation.CHARACTER_GET
+            for sample in report.samples),
+        'В отчете нет результатов character_get',
+    )
@@ -0,0 +1,82 @@
+"""Тесты генераторов случайных тестовых данных (utilities/utils.py)."""
+import random
+
+import pytest
+from asserts import assert_equal, assert_true
+
+from utilities import utils
+from utilities.utils import (
+    get_random_float,
+    get_random_floats,
+    seed_random_data,
+)
+
+
+@pytest.mark.parametrize(
+    'before_dot, after_dot, low, high',
+    [(0, 2, 0, 1), (1, 2, 1, 10), (2, 1, 10, 100), (3, 0, 100, 1000)],
+)
+def test_random_floats_range(
+        before_dot: int,
+        after_dot: int,
+        low: float,
+        high: float,
+) -> None:
+    """
+    Генерация вещественных чисел с заданным количеством цифр.
+    Проверка, что числа лежат в диапазоне, заданном количеством цифр
+    целой части, и дробная часть не длиннее after_dot.
+    """
+    values = get_random_floats(
+        1000, before_dot, after_dot, random.Random(before_dot),
+    )
+    values.append(get_random_float(before_dot, after_dot))
+    wrong = [
+        value for value in values
+        if not low <= value < high or round(value, after_dot) != value
+    ]
+    assert_equal(
+        [],
+        wrong,
+        f'Числа вне диапазона [{low}, {high}) или с лишними знаками '
+        f'после запятой: {{second}}',
+    )
+
+
+def test_random_float_below_one_is_not_zero() -> None:
+    """
+    Генерация чисел без целой части (before_dot=0).
+    Проверка, что дробная часть не нулевая.
+    """
+    values = get_random_floats(1000, 0, 1, random.Random(0))
+    assert_true(all(values), 'Сгенерирован 0.0')
+
+
+def test_random_data_is_reproducible_with_seed(
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Генерация данных после фиксации seed.
+    Проверка, что последовательность данных повторяется.
+    """
+    # Общий генератор остальных тестов (и его seed) не меняется
+    monkeypatch.setattr(utils, '_rng', random.Random())
+
+    def generate():
+        seed_random_data(42)
+        return (
+            [get_random_float(before_dot) for before_dot in range(4)],
+            get_random_floats(10, 2, 1),
+        )
+
+    first = generate()
+    assert_equal(
+        first,
+        generate(),
+        'Данные с одним seed различаются: {first} и {second}',
+    )
+    assert_equal(
+        get_random_floats(10, rng=random.Random(7)),
+        get_random_floats(10, rng=random.Random(7)),
+        'Данные с одним генератором различаются: {first} и {second}',
+    )
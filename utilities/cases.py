@@ -0,0 +1,375 @@
+"""
+Загрузка тестовых сценариев из cases.xlsx.
+Строки листа разбираются в компактные описания кейсов Case, которые
+сохраняются в индекс рядом с книгой (.cases.xlsx.index.json).
+Индекс пересобирается, только если книга изменилась: сначала
+сравниваются размер и время изменения файла, при их несовпадении -
+sha1 содержимого.
+
+Колонки листа определяются по заголовкам:
+- Метод - http-метод и эндпоинт (GET /character?name=Hero+Name);
+- Кейс - описание сценария;
+- curl - пример запроса: авторизация (-u) и тело запроса (-d);
+- Ожидаемый результат - код ответа, {"error": ...} или {"result": ...}.
+Имя персонажа из примера запроса заменяется при выполнении теста:
+существующим персонажем, новым или несуществующим именем - в
+зависимости от ожидаемого результата.
+"""
+import hashlib
+import json
+import re
+import tempfile
+import zipfile
+from dataclasses import astuple, dataclass
+from enum import Enum
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
+
+from characters_controller.enums import ErrorMessages
+
+CASES_PATH = Path(__file__).resolve().parent.parent / 'cases.xlsx'
+# Версия формата индекса: при изменении разбора индекс пересобирается
+INDEX_VERSION = 2
+# Подстановка имени персонажа в теле запроса и ожидаемом результате
+NAME_PLACEHOLDER = '{name}'
+
+_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_DOC_RELS = (
+    '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+)
+_COLUMN = re.compile(r'[A-Z]+')
+_HEADERS = {
+    '№': 'number',
+    'Метод': 'endpoint',
+    'Кейс': 'title',
+    'curl': 'curl',
+    'Ожидаемый результат': 'expected',
+}
+_ENDPOINT = re.compile(r'^\s*([A-Z]+)\s+(/[^\s?]*)')
+_URL = re.compile(r"https?://[^\s']+")
+_BODY = re.compile(r"'(\{.*\})'", re.DOTALL)
+# Код ответа может быть записан слитно с текстом (401Unauthorized)
+_STATUS = re.compile(r'(?<!\d)([1-5]\d\d)(?!\d)')
+_ERROR = re.compile(r'"error"\s*:\s*"(.*?)"\s*}', re.DOTALL)
+_RESULT = re.compile(r'"result"\s*:\s*"(.*?)"\s*}', re.DOTALL)
+_FIELD_ERROR = re.compile(r"^(\w+): \['(.*)'\]$")
+_SMART_QUOTES = str.maketrans('“”', '""')
+
+
+class NameRole(Enum):
+    """Какое имя персонажа подставляется в запрос кейса"""
+    # Имя в запросе не передается
+    NONE = 'none'
+    # Персонаж, созданный перед тестом
+    EXISTING = 'existing'
+    # Имя, которого нет в коллекции
+    MISSING = 'missing'
+    # Новое имя для создания персонажа
+    NEW = 'new'
+
+
+class CaseState(Enum):
+    """Состояние коллекции, нужное кейсу"""
+    READ_ONLY = 'read_only'
+    PLUS_ONE = 'plus_one'
+    FULL = 'full'
+    DEFAULT = 'default'
+
+
+@dataclass(frozen=True)
+class Case:
+    """Тестовый сценарий из строки cases.xlsx."""
+    number: str
+    title: str
+    method: str
+    endpoint: str
+    auth: bool
+    # Тело запроса, имя персонажа в нем заменено на NAME_PLACEHOLDER
+    body: Optional[str]
+    name_role: str
+    status: int
+    # Фрагменты, которые должен содержать текст ошибки
+    error: Tuple[str, ...]
+    # Текст результата (например, "Hero {name} is deleted")
+    result: Optional[str]
+
+    @property
+    def role(self) -> NameRole:
+        return NameRole(self.name_role)
+
+    @property
+    def state(self) -> CaseState:
+        if ErrorMessages.MORE_THAN_500_ITEMS.value in self.error:
+            return CaseState.FULL
+        if self.endpoint == '/reset' and self.auth and self.status == 200:
+            return CaseState.DEFAULT
+        if self.role in (NameRole.EXISTING, NameRole.NEW):
+            return CaseState.PLUS_ONE
+        return CaseState.READ_ONLY
+
+    def request_body(self, name: Optional[str]) -> Optional[bytes]:
+        """Метод, возвращающий тело запроса с именем персонажа name."""
+        if self.body is None:
+            return None
+        body = self.body
+        if name is not None:
+            body = body.replace(
+                json.dumps(NAME_PLACEHOLDER), json.dumps(name),
+            )
+        return body.encode()
+
+
+def _shared_strings(book: zipfile.ZipFile) -> List[str]:
+    try:
+        source = book.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f'{_MAIN}si':
+                strings.append(''.join(
+                    text.text or '' for text in element.iter(f'{_MAIN}t')
+                ))
+                element.clear()
+    return strings
+
+
+def _first_sheet(book: zipfile.ZipFile) -> str:
+    """Метод, возвращающий путь к первому листу книги внутри архива."""
+    workbook = ElementTree.fromstring(book.read('xl/workbook.xml'))
+    sheet = next(workbook.iter(f'{_MAIN}sheet'))
+    relation = sheet.get(f'{_DOC_RELS}id')
+    relations = ElementTree.fromstring(
+        book.read('xl/_rels/workbook.xml.rels'),
+    )
+    for item in relations.iter(f'{_RELS}Relationship'):
+        if item.get('Id') == relation:
+            target = item.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return str(PurePosixPath('xl') / target)
+    raise ValueError(f'sheet relation {relation} is not found')
+
+
+def _cell_value(cell: ElementTree.Element, strings: List[str]) -> str:
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{_MAIN}t'))
+    value = cell.find(f'{_MAIN}v')
+    if value is None or value.text is None:
+        return ''
+    if kind == 's':
+        return strings[int(value.text)]
+    return value.text
+
+
+def read_rows(path: Path) -> Iterator[Dict[str, str]]:
+    """
+    Метод, построчно читающий первый лист книги xlsx.
+    Лист разбирается потоково, строки возвращаются в виде
+    {буква колонки: значение}.
+    """
+    with zipfile.ZipFile(path) as book:
+        strings = _shared_strings(book)
+        with book.open(_first_sheet(book)) as sheet:
+            for _, element in ElementTree.iterparse(sheet):
+                if element.tag != f'{_MAIN}row':
+                    continue
+                row = {}
+                for cell in element.iter(f'{_MAIN}c'):
+                    column = _COLUMN.match(cell.get('r', '')).group()
+                    row[column] = _cell_value(cell, strings)
+                element.clear()
+                yield row
+
+
+def _parse_body(curl: str) -> Tuple[Optional[object], Optional[str]]:
+    """
+    Метод, возвращающий тело запроса из примера curl: разобранный json
+    или, если json некорректен, исходный текст.
+    """
+    match = _BODY.search(curl)
+    if match is None:
+        return None, None
+    text = match.group(1).translate(_SMART_QUOTES)
+    try:
+        return json.loads(text), None
+    except ValueError:
+        return None, text
+
+
+def parse_case(row: Dict[str, str]) -> Case:
+    """
+    Метод, разбирающий строку листа (по именам колонок) в кейс.
+    Если в строке нет метода или кода ответа, выбрасывается ValueError:
+    сценарий не должен молча пропадать из тестов.
+    """
+    endpoint = _ENDPOINT.match(row.get('endpoint', ''))
+    status = _STATUS.search(row.get('expected', ''))
+    if endpoint is None or status is None:
+        raise ValueError(
+            f'case {row.get("number", "").strip() or "?"}: '
+            f'{"method" if endpoint is None else "status code"} '
+            f'is not found',
+        )
+    method, path = endpoint.groups()
+    curl = row.get('curl', '')
+    expected = row['expected']
+    data, raw_body = _parse_body(curl)
+    sample_name = None
+    if isinstance(data, dict) and isinstance(data.get('name'), str):
+        sample_name = data['name']
+        data['name'] = NAME_PLACEHOLDER
+    elif data is None and raw_body is None:
+        url = _URL.search(curl)
+        query = parse_qs(urlsplit(url.group()).query) if url else {}
+        sample_name = query.get('name', [None])[0]
+    body = raw_body if data is None else json.dumps(data, ensure_ascii=False)
+
+    def with_placeholder(text: str) -> str:
+        text = ' '.join(text.split())
+        if sample_name:
+            text = text.replace(sample_name, NAME_PLACEHOLDER)
+        return text
+
+    error: Tuple[str, ...] = ()
+    match = _ERROR.search(expected)
+    if match:
+        message = with_placeholder(match.group(1))
+        field_error = _FIELD_ERROR.match(message)
+        error = field_error.groups() if field_error else (message,)
+    match = _RESULT.search(expected)
+    result = with_placeholder(match.group(1)) if match else None
+
+    if sample_name is None:
+        role = NameRole.NONE
+    elif ErrorMessages.NO_SUCH_NAME.value in error:
+        role = NameRole.MISSING
+    elif method == 'POST' and not any(
+            ErrorMessages.ALREADY_EXIST.value in part for part in error):
+        role = NameRole.NEW
+    else:
+        role = NameRole.EXISTING
+    return Case(
+        number=row.get('number', '').strip(),
+        title=' '.join(row.get('title', '').split()),
+        method=method,
+        endpoint=path.rstrip('/') or '/',
+        auth=bool(re.search(r'\s-u\s', curl)),
+        body=body,
+        name_role=role.value,
+        status=int(status.group(1)),
+        error=tuple(error),
+        result=result,
+    )
+
+
+def parse_cases(path: Path) -> List[Case]:
+    """
+    Метод, разбирающий книгу xlsx в список кейсов.
+    Первая строка листа - заголовки колонок, пустые строки пропускаются.
+    """
+    rows = read_rows(path)
+    header = next(rows, {})
+    columns = {
+        column: _HEADERS[title.strip()]
+        for column, title in header.items() if title.strip() in _HEADERS
+    }
+    cases = []
+    for row in rows:
+        values = {
+            columns[column]: value
+            for column, value in row.items() if column in columns
+        }
+        if any(value.strip() for value in values.values()):
+            cases.append(parse_case(values))
+    return cases
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(f'.{path.name}.index.json')
+
+
+def _read_index(path: Path) -> Optional[Tuple[Dict, List[Case]]]:
+    """
+    Метод, возвращающий сведения о книге и кейсы из индекса.
+    Если индекса нет, он другой версии или поврежден, возвращается None
+    и книга разбирается заново.
+    """
+    try:
+        index = json.loads(path.read_text(encoding='utf-8'))
+        if index['version'] != INDEX_VERSION:
+            return None
+        source = dict(index['source'])
+        cases = [Case(*row[:-2], tuple(row[-2]), row[-1])
+                 for row in index['cases']]
+    except (OSError, ValueError, LookupError, TypeError):
+        return None
+    return source, cases
+
+
+def load_cases(path: Path = CASES_PATH) -> List[Case]:
+    """
+    Метод, возвращающий кейсы книги из индекса, пересобирая индекс,
+    если книга изменилась.
+    """
+    stat = path.stat()
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    index_file = index_path(path)
+    index = _read_index(index_file)
+    if index is not None:
+        indexed, cases = index
+        if all(indexed.get(key) == source[key] for key in source):
+            return cases
+        digest = _file_digest(path)
+        if indexed.get('sha1') == digest:
+            # Книга не менялась (например, файл скопирован заново)
+            _write_index(index_file, {**source, 'sha1': digest}, cases)
+            return cases
+    else:
+        digest = _file_digest(path)
+    cases = parse_cases(path)
+    _write_index(index_file, {**source, 'sha1': digest}, cases)
+    return cases
+
+
+def _write_index(path: Path, source: Dict, cases: List[Case]) -> None:
+    """
+    Метод, записывающий индекс через временный файл, чтобы параллельно
+    запущенные процессы не прочитали его частично. Имя временного файла
+    уникально, поэтому процессы не пишут в один и тот же файл.
+    Если записать индекс нельзя, кейсы разбираются при каждом запуске.
+    """
+    index = {
+        'version': INDEX_VERSION,
+        'source': source,
+        'cases': [astuple(case) for case in cases],
+    }
+    temporary = None
+    try:
+        with tempfile.NamedTemporaryFile(
+                'w',
+                encoding='utf-8',
+                dir=path.parent,
+                prefix=f'{path.name}.',
+                suffix='.tmp',
+                delete=False,
+        ) as target:
+            temporary = Path(target.name)
+            json.dump(index, target, ensure_ascii=False, separators=(',', ':'))
+        temporary.replace(path)
+    except OSError:
+        if temporary is not None:
+            temporary.unlink(missing_ok=True)
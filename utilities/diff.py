@@ -0,0 +1,172 @@
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from characters_controller.characters import CharactersController
+from characters_controller.dataclass import Character, CharacterRecord
+from characters_controller.snapshot import (
+    CharactersSnapshot,
+    CharactersSnapshotCache,
+)
+
+# Запись о персонаже: в том виде, в котором ее возвращает сервис,
+# или компактная запись / модель
+Record = Union[Dict[str, Any], CharacterRecord, Character]
+# Состояние коллекции: список записей, записи по имени или снимок
+Collection = Union[Iterable[Record], Mapping[str, Record], CharactersSnapshot]
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """Изменение значения одного поля записи."""
+    before: Any
+    after: Any
+
+
+@dataclass
+class CollectionDiff:
+    """Разница между двумя состояниями коллекции персонажей."""
+    added: Dict[str, Record] = field(default_factory=dict)
+    removed: Dict[str, Record] = field(default_factory=dict)
+    # Имя персонажа -> поле -> изменение значения
+    modified: Dict[str, Dict[str, FieldChange]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def __str__(self) -> str:
+        if not self:
+            return 'no changes'
+        lines = [
+            f'added: {sorted(self.added)}',
+            f'removed: {sorted(self.removed)}',
+            'modified:',
+        ]
+        for name, changes in sorted(self.modified.items()):
+            for field_name, change in sorted(changes.items()):
+                lines.append(
+                    f'  {name}.{field_name}: '
+                    f'{change.before!r} -> {change.after!r}',
+                )
+        return '\n'.join(lines)
+
+    def filter(self, predicate: Callable[[str], bool]) -> 'CollectionDiff':
+        """
+        Метод, возвращающий разницу только по персонажам, имена которых
+        удовлетворяют predicate.
+        """
+        return CollectionDiff(
+            added={
+                name: record for name, record in self.added.items()
+                if predicate(name)
+            },
+            removed={
+                name: record for name, record in self.removed.items()
+                if predicate(name)
+            },
+            modified={
+                name: changes for name, changes in self.modified.items()
+                if predicate(name)
+            },
+        )
+
+
+def index_by_name(collection: Collection) -> Mapping[str, Record]:
+    """
+    Метод, возвращающий записи коллекции по имени персонажа.
+    Записи по имени и снимки не копируются.
+    """
+    if isinstance(collection, CharactersSnapshot):
+        return collection.records
+    if isinstance(collection, Mapping):
+        return collection
+    return {_get(record, 'name'): record for record in collection}
+
+
+def _get(record: Record, field_name: str) -> Any:
+    if isinstance(record, dict):
+        return record.get(field_name)
+    return getattr(record, field_name, None)
+
+
+def _fields(record: Record) -> Iterable[str]:
+    if isinstance(record, dict):
+        return record.keys()
+    if isinstance(record, CharacterRecord):
+        return record.__slots__
+    return type(record).model_fields
+
+
+def diff_records(before: Record, after: Record) -> Dict[str, FieldChange]:
+    """
+    Метод, возвращающий изменения полей записи о персонаже.
+    Отсутствующее поле равносильно полю со значением None.
+    """
+    changes = {}
+    for field_name in dict.fromkeys((*_fields(before), *_fields(after))):
+        old = _get(before, field_name)
+        new = _get(after, field_name)
+        if old != new:
+            changes[field_name] = FieldChange(old, new)
+    return changes
+
+
+def diff_collections(before: Collection, after: Collection) -> CollectionDiff:
+    """
+    Метод, сравнивающий два состояния коллекции персонажей.
+    Записи сопоставляются по имени через словари, поэтому время работы
+    линейно по количеству записей. Поля сравниваются только у записей,
+    которые не равны целиком.
+    """
+    before = index_by_name(before)
+    after = index_by_name(after)
+    diff = CollectionDiff()
+    for name, old in before.items():
+        new = after.get(name)
+        if new is None:
+            diff.removed[name] = old
+        elif new is not old and new != old:
+            changes = diff_records(old, new)
+            if changes:
+                diff.modified[name] = changes
+    for name, new in after.items():
+        if name not in before:
+            diff.added[name] = new
+    return diff
+
+
+class CollectionWatcher:
+    def __init__(
+            self,
+            controller: CharactersController,
+            *,
+            names: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        """
+        Наблюдатель за изменениями коллекции персонажей.
+        Состояния "до" и "после" запрашиваются у сервиса (снимок кэша
+        может быть старше начала наблюдения) и становятся новым снимком
+        общего кэша контроллера.
+        :param names - условие на имена персонажей, изменения которых
+        учитываются (по умолчанию - все).
+        """
+        self.cache = CharactersSnapshotCache.for_controller(controller)
+        self.names = names
+        self.before = self.cache.records(refresh=True)
+
+    def diff(self) -> CollectionDiff:
+        """
+        Метод, возвращающий изменения коллекции с момента создания
+        наблюдателя или предыдущего вызова diff.
+        """
+        after = self.cache.records(refresh=True)
+        diff = diff_collections(self.before, after)
+        self.before = after
+        return diff if self.names is None else diff.filter(self.names)
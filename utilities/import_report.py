@@ -0,0 +1,159 @@
+"""
+Отчет о времени импорта модулей при запуске.
+python -m utilities.import_report --top 15
+python -m utilities.import_report -- -m pytest --collect-only -q -s tests
+
+Команда (по умолчанию - сбор тестов pytest без их запуска) выполняется
+в отдельном процессе python -X importtime. Отчет содержит время запуска
+команды, время импорта по пакетам и самые долгие импорты. Для pytest
+нужен ключ -s, иначе вывод importtime перехватывается pytest.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_COMMAND = (
+    '-m', 'pytest', '--collect-only', '-q', '-s', '-p', 'no:cacheprovider',
+)
+DEFAULT_TOP = 15
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """Время импорта модуля в микросекундах."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split('.', 1)[0]
+
+
+def parse_importtime(lines: Iterable[str]) -> List[ImportTime]:
+    """Метод, разбирающий вывод python -X importtime."""
+    imports = []
+    for line in lines:
+        match = _LINE.match(line.rstrip('\n'))
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(ImportTime(
+                module, int(self_us), int(cumulative_us), len(indent) // 2,
+            ))
+    return imports
+
+
+@dataclass
+class ImportReport:
+    """Итоги запуска команды с python -X importtime."""
+    command: List[str]
+    elapsed: float
+    returncode: int
+    imports: List[ImportTime]
+
+    @property
+    def total_us(self) -> int:
+        return sum(item.self_us for item in self.imports)
+
+    def by_package(self) -> Dict[str, int]:
+        """Время импорта модулей пакета (без вложенных пакетов)."""
+        packages: Dict[str, int] = defaultdict(int)
+        for item in self.imports:
+            packages[item.package] += item.self_us
+        return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+    def slowest(self, top: int) -> List[ImportTime]:
+        """Импорты с наибольшим временем вместе с вложенными модулями."""
+        return sorted(self.imports, key=lambda item: -item.cumulative_us)[:top]
+
+    def to_dict(self, top: int = DEFAULT_TOP) -> Dict:
+        return {
+            'command': self.command,
+            'elapsed': self.elapsed,
+            'returncode': self.returncode,
+            'modules': len(self.imports),
+            'imports_us': self.total_us,
+            'packages_us': self.by_package(),
+            'slowest': [
+                {
+                    'module': item.module,
+                    'self_us': item.self_us,
+                    'cumulative_us': item.cumulative_us,
+                }
+                for item in self.slowest(top)
+            ],
+        }
+
+    def format(self, top: int = DEFAULT_TOP) -> str:
+        lines = [
+            f'command: python {" ".join(self.command)}',
+            f'elapsed: {self.elapsed:.3f}s, exit code {self.returncode}',
+            f'imported modules: {len(self.imports)}, '
+            f'import time: {self.total_us / 1e6:.3f}s',
+            'packages:',
+        ]
+        for package, self_us in list(self.by_package().items())[:top]:
+            lines.append(f'  {self_us / 1e3:9.1f} ms  {package}')
+        lines.append('slowest imports (with nested modules):')
+        for item in self.slowest(top):
+            lines.append(
+                f'  {item.cumulative_us / 1e3:9.1f} ms  '
+                f'{"  " * item.depth}{item.module}',
+            )
+        return '\n'.join(lines)
+
+
+def measure(command: Iterable[str] = DEFAULT_COMMAND) -> ImportReport:
+    """
+    Метод, выполняющий команду python с -X importtime и собирающий
+    время импорта модулей.
+    """
+    command = list(command)
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', *command],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    return ImportReport(
+        command,
+        elapsed,
+        process.returncode,
+        parse_importtime(process.stderr.splitlines()),
+    )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument('--json', help='путь для сохранения отчета в json')
+    parser.add_argument(
+        'command',
+        nargs=argparse.REMAINDER,
+        help='аргументы python после "--" (по умолчанию - '
+             'pytest --collect-only)',
+    )
+    options = parser.parse_args(args)
+    command = options.command
+    if command and command[0] == '--':
+        command = command[1:]
+    report = measure(command or DEFAULT_COMMAND)
+    print(report.format(options.top))
+    if options.json:
+        with open(options.json, 'w') as file:
+            json.dump(report.to_dict(options.top), file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+"""
+Генератор нагрузки на сервис на основе CharactersController.
+Запуск (параметры подключения берутся из vars/envars.py):
+python -m utilities.load --rps 50 --duration 60 --warmup 5 --ramp 10
+
+Планировщик работает по открытой модели: запросы отправляются
+по расписанию с заданной интенсивностью независимо от того, успели ли
+завершиться предыдущие. Задержка считается от запланированного момента
+отправки, поэтому время ожидания в очереди тоже попадает в статистику.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests as r
+
+from characters_controller.characters import CharactersController
+from characters_controller.cleanup import CleanupRegistry, CleanupResult
+from characters_controller.dataclass import Character
+from characters_controller.enums import ErrorMessages
+from characters_controller.response import CharactersResponse
+from characters_controller.transport import SingleFlight
+from utilities.utils import (
+    create_new_character_data_with_required_field,
+    get_random_float,
+    get_random_string_with_letters_digits,
+)
+
+DEFAULT_WORKERS = 32
+LOAD_NAME_PREFIX = 'load_'
+PERCENTILES = (50, 95, 99)
+
+
+class LoadOperation(Enum):
+    """Операции, из которых состоит нагрузка"""
+    CHARACTERS_GET = 'characters_get'
+    CHARACTER_GET = 'character_get'
+    CHARACTER_POST = 'character_post'
+    CHARACTER_PUT = 'character_put'
+    CHARACTER_DELETE = 'character_delete'
+
+
+DEFAULT_MIX = {
+    LoadOperation.CHARACTERS_GET: 1,
+    LoadOperation.CHARACTER_GET: 5,
+    LoadOperation.CHARACTER_POST: 2,
+    LoadOperation.CHARACTER_PUT: 1,
+    LoadOperation.CHARACTER_DELETE: 1,
+}
+
+
+@dataclass
+class LoadProfile:
+    """
+    Параметры нагрузки.
+    Интенсивность линейно растет от 0 до rps за ramp секунд, затем
+    держится duration секунд. Результаты запросов, запланированных
+    в первые warmup секунд, в статистику не попадают.
+    """
+    rps: float
+    duration: float
+    warmup: float = 0.0
+    ramp: float = 0.0
+    workers: int = DEFAULT_WORKERS
+    mix: Dict[LoadOperation, float] = field(
+        default_factory=lambda: dict(DEFAULT_MIX),
+    )
+
+    def schedule(self) -> Iterator[float]:
+        """
+        Метод, возвращающий моменты отправки запросов в секундах
+        от начала нагрузки.
+        """
+        ramp_requests = self.rps * self.ramp / 2
+        total = ramp_requests + self.rps * self.duration
+        for number in range(int(total)):
+            if number < ramp_requests:
+                yield math.sqrt(2 * number * self.ramp / self.rps)
+            else:
+                yield self.ramp + (number - ramp_requests) / self.rps
+
+
+@dataclass
+class LoadSample:
+    """Результат одного запроса."""
+    operation: LoadOperation
+    scheduled: float
+    latency: float
+    status_code: Optional[int]
+    category: str
+
+
+@dataclass
+class LoadReport:
+    """Итоги нагрузки по измеряемому интервалу (без прогрева)."""
+    profile: LoadProfile
+    samples: List[LoadSample]
+    elapsed: float
+    # Итоги удаления созданных персонажей (None - удаление не выполнялось)
+    cleanup: Optional[CleanupResult] = None
+
+    @property
+    def throughput(self) -> float:
+        """Количество выполненных запросов в секунду."""
+        window = self.elapsed - self.profile.warmup
+        return len(self.samples) / window if window > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        errors = sum(sample.category != 'OK' for sample in self.samples)
+        return errors / len(self.samples)
+
+    @property
+    def errors(self) -> Dict[str, int]:
+        """Количество ошибок по категориям ErrorMessages."""
+        return dict(Counter(
+            sample.category for sample in self.samples
+            if sample.category != 'OK'
+        ))
+
+    @staticmethod
+    def _percentiles(latencies: List[float]) -> Dict[str, float]:
+        latencies = sorted(latencies)
+        return {
+            f'p{percentile}': latencies[
+                max(math.ceil(percentile / 100 * len(latencies)) - 1, 0)
+            ]
+            for percentile in PERCENTILES
+        } if latencies else {}
+
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """Перцентили задержки по операциям и по всей нагрузке."""
+        by_operation = defaultdict(list)
+        for sample in self.samples:
+            by_operation[sample.operation.value].append(sample.latency)
+        result = {
+            operation: self._percentiles(latencies)
+            for operation, latencies in sorted(by_operation.items())
+        }
+        result['total'] = self._percentiles(
+            [sample.latency for sample in self.samples],
+        )
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': len(self.samples),
+            'throughput_rps': self.throughput,
+            'target_rps': self.profile.rps,
+            'error_rate': self.error_rate,
+            'errors': self.errors,
+            'latency_seconds': self.latency_percentiles(),
+            'cleanup': None if self.cleanup is None else {
+                'deleted': self.cleanup.deleted,
+                'leftovers': self.cleanup.leftovers,
+                'unknown_changes': self.cleanup.unknown_changes,
+            },
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f'requests: {len(self.samples)}, '
+            f'throughput: {self.throughput:.1f} rps '
+            f'(target {self.profile.rps:g}), '
+            f'error rate: {self.error_rate:.2%}',
+        ]
+        for operation, values in self.latency_percentiles().items():
+            lines.append(f'{operation:>18}: ' + ', '.join(
+                f'{name}={value * 1000:.1f}ms'
+                for name, value in values.items()
+            ))
+        for category, count in sorted(self.errors.items()):
+            lines.append(f'{category:>28}: {count}')
+        if self.cleanup is not None:
+            lines.append(f'cleanup: {self.cleanup}')
+        return '\n'.join(lines)
+
+
+def categorize_response(response: CharactersResponse) -> str:
+    """
+    Метод, относящий ответ сервиса к категории ErrorMessages.
+    Успешные ответы - OK, неизвестные ошибки - HTTP_<код ответа>.
+    """
+    if response.status_code < 400:
+        return 'OK'
+    for message in ErrorMessages:
+        if message.value in response.text:
+            return message.name
+    return f'HTTP_{response.status_code}'
+
+
+class LoadGenerator:
+    def __init__(
+            self,
+            controller: CharactersController,
+            profile: LoadProfile,
+            *,
+            rng: Optional[random.Random] = None,
+    ) -> None:
+        """
+        Генератор нагрузки.
+        Персонажи, созданные во время нагрузки, получают префикс
+        LOAD_NAME_PREFIX, только они изменяются и удаляются,
+        после нагрузки оставшиеся удаляются.
+        :param controller - контроллер, через который идут запросы.
+        Размер пула соединений должен быть не меньше profile.workers.
+        :param profile - параметры нагрузки.
+        :param rng - генератор случайных чисел для выбора операций.
+        """
+        self.controller = controller
+        self.profile = profile
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._created: List[str] = []
+        # Персонажи коллекции на момент начала нагрузки
+        self._existing: List[str] = []
+        self._operations = list(profile.mix)
+        self._weights = [profile.mix[operation] for operation in profile.mix]
+        self._handlers: Dict[
+            LoadOperation, Callable[[], CharactersResponse],
+        ] = {
+            LoadOperation.CHARACTERS_GET: self._characters_get,
+            LoadOperation.CHARACTER_GET: self._character_get,
+            LoadOperation.CHARACTER_POST: self._character_post,
+            LoadOperation.CHARACTER_PUT: self._character_put,
+            LoadOperation.CHARACTER_DELETE: self._character_delete,
+        }
+
+    def _new_character(self, name: str) -> Character:
+        return create_new_character_data_with_required_field(
+            education=get_random_string_with_letters_digits(10),
+            height=get_random_float(),
+            identity=get_random_string_with_letters_digits(10),
+            name=name,
+            other_aliases=get_random_string_with_letters_digits(10),
+            universe=get_random_string_with_letters_digits(10),
+            weight=get_random_float(before_dot=2, after_dot=1),
+        )
+
+    def _pick_created(self, pop: bool = False) -> Optional[str]:
+        with self._lock:
+            if not self._created:
+                return None
+            index = self.rng.randrange(len(self._created))
+            name = self._created[index]
+            if pop:
+                # Последнее имя переносится на место выбранного
+                self._created[index] = self._created[-1]
+                self._created.pop()
+            return name
+
+    def _characters_get(self) -> CharactersResponse:
+        return self.controller.characters_get()
+
+    def _character_get(self) -> CharactersResponse:
+        name = self._pick_created()
+        if name is None and self._existing:
+            name = self.rng.choice(self._existing).replace(' ', '+')
+        if name is None:
+            return self._character_post()
+        return self.controller.character_get(name=name)
+
+    def _character_post(self) -> CharactersResponse:
+        name = LOAD_NAME_PREFIX + get_random_string_with_letters_digits(10)
+        response = self.controller.character_post(
+            character=self._new_character(name),
+        )
+        if response.status_code == 200:
+            with self._lock:
+                self._created.append(name)
+        return response
+
+    def _character_put(self) -> CharactersResponse:
+        name = self._pick_created()
+        if name is None:
+            return self._character_post()
+        return self.controller.character_put(
+            character=self._new_character(name),
+        )
+
+    def _character_delete(self) -> CharactersResponse:
+        name = self._pick_created(pop=True)
+        if name is None:
+            return self._character_post()
+        return self.controller.character_delete(name=name)
+
+    def _execute(
+            self,
+            operation: LoadOperation,
+            scheduled: float,
+            started: float,
+            samples: List[LoadSample],
+    ) -> None:
+        status_code = None
+        try:
+            response = self._handlers[operation]()
+        except r.RequestException as exc:
+            category = f'TRANSPORT_{type(exc).__name__}'
+        except Exception as exc:
+            # Ошибка на стороне клиента (например, разбора ответа)
+            # тоже попадает в статистику, а не теряется в пуле потоков
+            category = f'CLIENT_{type(exc).__name__}'
+        else:
+            status_code = response.status_code
+            category = categorize_response(response)
+        latency = time.perf_counter() - started - scheduled
+        if scheduled >= self.profile.warmup:
+            samples.append(LoadSample(
+                operation, scheduled, latency, status_code, category,
+            ))
+
+    def run(self, cleanup: bool = True) -> LoadReport:
+        """
+        Метод, выполняющий нагрузку по профилю.
+        :param cleanup - удалить ли созданных персонажей после нагрузки.
+        Коллекция при этом никогда не сбрасывается (сервис может быть
+        общим): персонажи, которых не удалось удалить, перечисляются
+        в отчете.
+        """
+        samples: List[LoadSample] = []
+        # Имена существующих персонажей для character_get запрашиваются
+        # до начала нагрузки, чтобы этот запрос не попал в измерения
+        response = self.controller.characters_get()
+        self._existing = [
+            record['name'] for record in response.result
+        ] if response.status_code == 200 else []
+        registry = CleanupRegistry(workers=self.profile.workers)
+        self.controller.add_mutation_listener(registry)
+        report = LoadReport(self.profile, samples, 0.0)
+        try:
+            with ThreadPoolExecutor(
+                    max_workers=self.profile.workers,
+            ) as executor:
+                futures = []
+                started = time.perf_counter()
+                for scheduled in self.profile.schedule():
+                    delay = started + scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    operation = self.rng.choices(
+                        self._operations, self._weights,
+                    )[0]
+                    futures.append(executor.submit(
+                        self._execute, operation, scheduled, started, samples,
+                    ))
+            report.elapsed = time.perf_counter() - started
+            for future in futures:
+                future.result()
+        finally:
+            self.controller.remove_mutation_listener(registry)
+            if cleanup:
+                report.cleanup = registry.cleanup(self.controller, reset=False)
+        return report
+
+
+def _parse_mix(value: str) -> Dict[LoadOperation, float]:
+    mix = {}
+    for item in value.split(','):
+        operation, weight = item.split('=')
+        mix[LoadOperation(operation.strip())] = float(weight)
+    return mix
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rps', type=float, required=True)
+    parser.add_argument('--duration', type=float, required=True)
+    parser.add_argument('--warmup', type=float, default=0.0)
+    parser.add_argument('--ramp', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        '--mix', type=_parse_mix, default=None,
+        help='веса операций, например '
+             'characters_get=1,character_get=5,character_post=2',
+    )
+    parser.add_argument('--json', help='путь для сохранения итогов в json')
+    parser.add_argument(
+        '--coalesce',
+        action='store_true',
+        help='объединять одновременные одинаковые GET запросы в один',
+    )
+    parser.add_argument(
+        '--env-profile',
+        help='профиль параметров подключения (файл .env.NAME)',
+    )
+    options = parser.parse_args(args)
+
+    from vars import envars
+
+    envars.configure(profile=options.env_profile)
+
+    profile = LoadProfile(
+        rps=options.rps,
+        duration=options.duration,
+        warmup=options.warmup,
+        ramp=options.ramp,
+        workers=options.workers,
+    )
+    if options.mix:
+        profile.mix = options.mix
+    with CharactersController(
+        base_url=envars.SERVICE_BASE_URL,
+        user_login=envars.SERVICE_LOGIN,
+        user_password=envars.SERVICE_PASSWORD,
+        pool_maxsize=options.workers,
+        single_flight=SingleFlight() if options.coalesce else None,
+    ) as controller:
+        report = LoadGenerator(controller, profile).run()
+    print(report)
+    result = report.to_dict()
+    if controller.single_flight is not None:
+        print(f'coalesced requests: {controller.single_flight.coalesced}')
+        result['coalesced'] = controller.single_flight.coalesced
+    if options.json:
+        with open(options.json, 'w') as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
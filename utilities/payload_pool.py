@@ -0,0 +1,158 @@
+import json
+import threading
+from collections import defaultdict
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set
+
+from characters_controller.dataclass import EncodedCharacter
+from characters_controller.enums import ServiceDBLimits
+from utilities.utils import (
+    get_character_name_namespace,
+    get_random_floats,
+    get_random_ints,
+    get_random_strings,
+)
+
+DEFAULT_BATCH_SIZE = 32
+STRING_FIELDS = ('education', 'identity', 'other_aliases', 'universe')
+
+
+class PayloadKind(Enum):
+    """Виды тел запросов персонажа"""
+    # Все поля заполнены, строки по 10 символов
+    VALID = 'valid'
+    # Все строковые поля (и имя) максимальной длины
+    MAX_LENGTH = 'max_length'
+    # Строковые поля кроме имени на 1 символ длиннее допустимого
+    TOO_LONG = 'too_long'
+    # Нет обязательного поля name
+    WITHOUT_NAME = 'without_name'
+    # Строковые поля кроме имени - числа
+    WRONG_TYPE = 'wrong_type'
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+class Payload(EncodedCharacter):
+    """
+    Тело запроса персонажа из пула: данные для проверок и json,
+    сериализованный один раз при генерации.
+    """
+    __slots__ = ('kind', 'data', '_fields')
+
+    def __init__(
+            self,
+            kind: PayloadKind,
+            data: Dict[str, Any],
+            fields: Optional[bytes] = None,
+    ) -> None:
+        """
+        :param fields - сериализованные поля кроме имени
+        ('"education":...}'), если они уже есть.
+        """
+        if fields is None:
+            fields = _encode({
+                field: value for field, value in data.items()
+                if field != 'name'
+            })[1:]
+        name = data.get('name')
+        if name is None:
+            body = b'{' + fields
+        else:
+            separator = b',' if len(fields) > 1 else b''
+            body = b'{"name":' + _encode(name) + separator + fields
+        super().__init__(name, body)
+        self.kind = kind
+        self.data = data
+        self._fields = fields
+
+    def with_name(self, name: str) -> 'Payload':
+        """
+        Метод, возвращающий то же тело запроса с другим именем
+        (например, уже существующего персонажа).
+        Остальные поля повторно не сериализуются.
+        """
+        return Payload(self.kind, {**self.data, 'name': name}, self._fields)
+
+
+class PayloadPool:
+    def __init__(
+            self,
+            *,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            kinds: Optional[List[PayloadKind]] = None,
+    ) -> None:
+        """
+        Пул заранее сгенерированных тел запросов персонажей.
+        Тела генерируются пакетами по batch_size при создании пула
+        и по мере расходования, каждое тело выдается один раз.
+        Имена уникальны в пределах пула и имеют префикс
+        текущего воркера pytest-xdist.
+        :param kinds - виды тел, которые генерируются при создании пула
+        (по умолчанию все).
+        """
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._names: Set[str] = set()
+        self._payloads: Dict[PayloadKind, List[Payload]] = defaultdict(list)
+        for kind in kinds or PayloadKind:
+            self._payloads[kind] = self._generate(kind)
+
+    def _unique_names(self, count: int, length: int) -> List[str]:
+        namespace = get_character_name_namespace()
+        length = max(length - len(namespace), 1)
+        names = []
+        while len(names) < count:
+            for name in get_random_strings(count - len(names), length):
+                name = namespace + name
+                if name not in self._names:
+                    self._names.add(name)
+                    names.append(name)
+        return names
+
+    def _generate(self, kind: PayloadKind) -> List[Payload]:
+        count = self.batch_size
+        limit = ServiceDBLimits.STRING_FIELD_DATA_LIMIT.value
+        length = {
+            PayloadKind.MAX_LENGTH: limit,
+            PayloadKind.TOO_LONG: limit + 1,
+        }.get(kind, 10)
+        if kind is PayloadKind.WRONG_TYPE:
+            values = get_random_ints(count * len(STRING_FIELDS), 10)
+        else:
+            values = get_random_strings(count * len(STRING_FIELDS), length)
+        names = (
+            [None] * count if kind is PayloadKind.WITHOUT_NAME
+            else self._unique_names(
+                count, limit if kind is PayloadKind.MAX_LENGTH else 10,
+            )
+        )
+        heights = get_random_floats(count)
+        weights = (
+            get_random_floats(count) if kind is PayloadKind.WRONG_TYPE
+            else get_random_floats(count, before_dot=2, after_dot=1)
+        )
+        payloads = []
+        for index in range(count):
+            start = index * len(STRING_FIELDS)
+            data = dict(zip(
+                STRING_FIELDS, values[start:start + len(STRING_FIELDS)],
+            ))
+            data['height'] = heights[index]
+            data['weight'] = weights[index]
+            if names[index] is not None:
+                data['name'] = names[index]
+            payloads.append(Payload(kind, data))
+        # Выдаются с конца списка
+        payloads.reverse()
+        return payloads
+
+    def take(self, kind: PayloadKind = PayloadKind.VALID) -> Payload:
+        """Метод, выдающий следующее тело запроса вида kind."""
+        with self._lock:
+            payloads = self._payloads[kind]
+            if not payloads:
+                payloads.extend(self._generate(kind))
+            return payloads.pop()
@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import requests as r
+
+from characters_controller.characters import CharactersController
+from characters_controller.enums import ServiceDBLimits
+from utilities.utils import create_new_characters_payloads
+
+DEFAULT_WORKERS = 10
+
+
+@dataclass
+class SeedFailure:
+    """Информация о персонаже, которого не удалось добавить."""
+    name: str
+    status_code: Optional[int]
+    error: str
+
+
+@dataclass
+class SeedReport:
+    """Результат заполнения БД."""
+    requested: int
+    created: int = 0
+    elapsed: float = 0.0
+    failures: List[SeedFailure] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Количество добавленных записей в секунду."""
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'created {self.created}/{self.requested} records '
+            f'in {self.elapsed:.3f}s ({self.throughput:.1f} rec/s), '
+            f'failures: {len(self.failures)}'
+        )
+
+
+class CharactersSeeder:
+    def __init__(
+            self,
+            controller: CharactersController,
+            *,
+            workers: int = DEFAULT_WORKERS,
+            string_length: int = 10,
+    ) -> None:
+        """
+        Движок, заполняющий БД сервиса случайными персонажами.
+        Тела запросов генерируются заранее одним пакетом, затем
+        отправляются параллельно пулом потоков. Повторы после сбоев
+        выполняет контроллер по своим правилам retry (POST повторяется,
+        только если сервис точно его не выполнил).
+        :param workers - количество потоков, отправляющих запросы.
+        Для переиспользования соединений не должно превышать размер
+        пула соединений контроллера.
+        :param string_length - длина строковых полей персонажа.
+        """
+        self.controller = controller
+        self.workers = workers
+        self.string_length = string_length
+
+    def generate_payloads(self, count: int) -> List[Dict]:
+        """
+        Метод, генерирующий тела запросов для count новых персонажей.
+        """
+        return create_new_characters_payloads(count, self.string_length)
+
+    def _post(self, payload: Dict) -> Optional[SeedFailure]:
+        """
+        Метод, добавляющий одного персонажа.
+        :return: информация об ошибке (None, если персонаж добавлен).
+        """
+        try:
+            response = self.controller.character_post(character=payload)
+        except r.RequestException as exc:
+            return SeedFailure(
+                name=payload['name'], status_code=None, error=repr(exc),
+            )
+        if response.status_code == 200:
+            return None
+        return SeedFailure(
+            name=payload['name'],
+            status_code=response.status_code,
+            error=response.text,
+        )
+
+    def seed(self, count: int) -> SeedReport:
+        """
+        Метод, добавляющий в БД count новых персонажей.
+        :param count - количество добавляемых записей, не больше
+        максимального количества записей в БД.
+        """
+        if not 0 <= count <= ServiceDBLimits.MAX_DB_RECORDS.value:
+            raise ValueError(
+                f'count must be between 0 and '
+                f'{ServiceDBLimits.MAX_DB_RECORDS.value}, got {count}',
+            )
+        payloads = self.generate_payloads(count)
+        report = SeedReport(requested=count)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for failure in executor.map(self._post, payloads):
+                if failure is None:
+                    report.created += 1
+                else:
+                    report.failures.append(failure)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def fill_to(
+            self,
+            target: int = ServiceDBLimits.MAX_DB_RECORDS.value,
+    ) -> SeedReport:
+        """
+        Метод, заполняющий БД до target записей.
+        :param target - итоговое количество записей в БД.
+        """
+        if not 0 <= target <= ServiceDBLimits.MAX_DB_RECORDS.value:
+            raise ValueError(
+                f'target must be between 0 and '
+                f'{ServiceDBLimits.MAX_DB_RECORDS.value}, got {target}',
+            )
+        current = len(self.controller.characters_get().result)
+        return self.seed(max(target - current, 0))
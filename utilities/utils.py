@@ -1,29 +1,146 @@
-import decimal
+import os
 import random
 import string
-from typing import Any, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from characters_controller.characters import CharactersController
 from characters_controller.dataclass import (
     Character,
+    CharactersListResponse,
     CharacterWithoutName,
     CharacterWrongTypeModel,
 )
+from characters_controller.snapshot import CharactersSnapshotCache
 
 
-def validate_characters_list_data(data: Any) -> str:
+class RecordValidationError(NamedTuple):
+    """Ошибка валидации одной записи из списка персонажей."""
+    index: Optional[int]
+    field: str
+    message: str
+
+
+# Валидаторы компилируются один раз и проверяют весь список за один вызов
+CHARACTERS_LIST_ADAPTER = TypeAdapter(List[Character])
+CHARACTERS_LIST_RESPONSE_ADAPTER = TypeAdapter(CharactersListResponse)
+
+# Генератор случайных тестовых данных. Его можно зафиксировать
+# seed_random_data, чтобы данные (и запросы с ними) повторялись
+_rng = random.Random()
+
+
+def seed_random_data(seed: Any) -> None:
+    """
+    Метод, фиксирующий последовательность случайных тестовых данных.
+    :param seed - любое значение, допустимое для random.seed.
+    """
+    _rng.seed(seed)
+
+
+def _get_alphabet_table(alphabet: str) -> Tuple[bytes, bytes]:
+    """
+    Метод, возвращающий таблицу для bytes.translate, переводящую
+    случайный байт в символ алфавита, и байты, которые нужно отбросить,
+    чтобы все символы алфавита были равновероятны.
+    """
+    symbols = alphabet.encode()
+    limit = 256 - 256 % len(symbols)
+    table = bytes(symbols[byte % len(symbols)] for byte in range(256))
+    return table, bytes(range(limit, 256))
+
+
+_LETTERS_DIGITS = _get_alphabet_table(
+    string.ascii_lowercase + string.ascii_uppercase + string.digits,
+)
+_DIGITS = _get_alphabet_table(string.digits)
+_NONZERO_DIGITS = _get_alphabet_table(string.digits[1:])
+
+
+def _get_random_symbols(
+        alphabet: Tuple[bytes, bytes],
+        count: int,
+        rng: Optional[random.Random] = None,
+) -> bytes:
+    """
+    Метод, возвращающий count случайных символов алфавита.
+    Символы получаются из одного буфера случайных байтов
+    без обработки каждого символа в python.
+    """
+    rng = rng or _rng
+    table, rejected = alphabet
+    # Запас на отброшенные байты, чтобы обычно хватало одного буфера
+    reserve = count * len(rejected) // (256 - len(rejected)) + 16
+    result = b''
+    while len(result) < count:
+        result += rng.randbytes(count - len(result) + reserve).translate(
+            table, rejected,
+        )
+    return result[:count]
+
+
+def _get_record_errors(
+        error: ValidationError,
+        prefix: Tuple = (),
+) -> List[RecordValidationError]:
+    """
+    Метод, раскладывающий ошибку валидации списка по записям.
+    :param prefix - путь до списка персонажей внутри проверяемых данных.
+    """
+    result = []
+    for details in error.errors():
+        loc = details['loc']
+        if len(loc) > len(prefix) and loc[:len(prefix)] == prefix:
+            loc = loc[len(prefix):]
+        index = loc[0] if loc and isinstance(loc[0], int) else None
+        field = '.'.join(
+            str(part) for part in (loc[1:] if index is not None else loc)
+        )
+        result.append(
+            RecordValidationError(index, field, details['msg']),
+        )
+    return result
+
+
+def validate_characters_list_data(data: Any) -> Union[str, ValidationError]:
     """Метод валидации полученных данных о персонажах со схемой"""
     try:
-        for record in data:
-            Character(**record)
+        CHARACTERS_LIST_ADAPTER.validate_python(data)
     except ValidationError as error_message:
         return error_message
     else:
         return 'Success'
 
 
+def get_characters_list_errors(data: Any) -> List[RecordValidationError]:
+    """
+    Метод, возвращающий все ошибки валидации списка персонажей
+    с индексами записей. Пустой список означает, что данные валидны.
+    """
+    try:
+        CHARACTERS_LIST_ADAPTER.validate_python(data)
+    except ValidationError as error:
+        return _get_record_errors(error)
+    return []
+
+
+def get_characters_list_errors_from_json(
+        raw: Union[str, bytes],
+) -> List[RecordValidationError]:
+    """
+    Метод, валидирующий тело ответа со списком персонажей напрямую
+    из байтов ответа, без промежуточного разбора в dict.
+    Пустой список означает, что данные валидны.
+    :param raw - тело ответа сервиса, например response.content.
+    """
+    try:
+        CHARACTERS_LIST_RESPONSE_ADAPTER.validate_json(raw)
+    except ValidationError as error:
+        return _get_record_errors(error, prefix=('result',))
+    return []
+
+
 def get_exist_random_character_name(
         controller: CharactersController,
         type_name: Optional[str] = None,
@@ -34,10 +151,10 @@ def get_exist_random_character_name(
     Если бы таблица была пустой, то мы бы сначала добавляли персонажа,
     потом искали запись о не в БД, а после удаляли эту запись
     (в этом случае было бы реализовано с использованием фикстуры).
+    Имена берутся из кэшированного снимка коллекции, поэтому повторные
+    вызовы не запрашивают весь список персонажей заново.
     """
-    characters_list = controller.characters_get().json()['result']
-    random.shuffle(characters_list)
-    name = random.choice(characters_list)['name']
+    name = CharactersSnapshotCache.for_controller(controller).random_name(_rng)
     if type_name == 'with_space':
         return name
     else:
@@ -51,37 +168,148 @@ def get_random_string_with_letters_digits(length: int) -> str:
     :param: length: длина строки
     :return: строка заданной длины
     """
-    result = random.choices(
-        string.ascii_lowercase + string.ascii_uppercase + string.digits,
-        k=length,
+    return _get_random_symbols(_LETTERS_DIGITS, length).decode()
+
+
+def get_character_name_namespace() -> str:
+    """
+    Метод, возвращающий префикс имен персонажей, создаваемых тестами.
+    При параллельном запуске (pytest-xdist) у каждого воркера свой
+    префикс, при обычном запуске префикса нет.
+    """
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    return f'{worker}_' if worker else ''
+
+
+def get_random_character_name(length: int) -> str:
+    """
+    Метод, возвращающий случайное имя персонажа заданной длины
+    с префиксом текущего воркера.
+    :param: length: длина имени вместе с префиксом
+    """
+    namespace = get_character_name_namespace()
+    return namespace + get_random_string_with_letters_digits(
+        max(length - len(namespace), 1),
     )
-    return ''.join(result)
 
 
 def get_random_int(length: int) -> int:
     """Метод, возвращающий случайное целое число заданной длины"""
-    result = random.choices(string.digits, k=length)
-    return int(''.join(result))
+    return int(_get_random_symbols(_DIGITS, length))
 
 
 def get_random_float(before_dot: int = 1, after_dot: int = 2) -> float:
     """
     Метод генерирующий случайное вещественное число.
-    :param before_dot: количество символов целочисленной части.
+    :param before_dot: количество символов целочисленной части
+    (0 - число меньше единицы, 0.xx).
     :param after_dot: количество символо длина дробной части.
     """
-    left_part = random.choices(string.digits, k=before_dot)
-    left_part = ''.join(left_part)
-    # Обрабатываем случай когда первым символом стоит 0
-    if left_part.startswith('0'):
-        left_part = left_part[:0] + str(random.randint(1, 9)) + left_part[1:]
-    right_part = random.choices(string.digits, k=after_dot)
-    right_part = ''.join(right_part)
-    # Обрабатываем случай когда последним символом стоит 0
-    if right_part.endswith('0'):
-        right_part = right_part[:-1] + str(random.randint(1, 9)) \
-                     + right_part[-1:-1]
-    return float(decimal.Decimal(left_part + '.' + right_part))
+    return get_random_floats(1, before_dot, after_dot)[0]
+
+
+def get_random_strings(
+        count: int,
+        length: int,
+        rng: Optional[random.Random] = None,
+) -> List[str]:
+    """
+    Метод, возвращающий count случайных строк из букв английского
+    алфавита и цифр, сгенерированных одним пакетом.
+    :param length: длина каждой строки.
+    :param rng: генератор случайных чисел (по умолчанию общий
+    генератор тестовых данных).
+    """
+    if not length:
+        return [''] * count
+    text = _get_random_symbols(_LETTERS_DIGITS, count * length, rng).decode()
+    return [
+        text[start:start + length] for start in range(0, len(text), length)
+    ]
+
+
+def get_random_ints(
+        count: int,
+        length: int,
+        rng: Optional[random.Random] = None,
+) -> List[int]:
+    """
+    Метод, возвращающий count случайных целых чисел из length цифр
+    (как и get_random_int, число может начинаться с нуля).
+    :param rng: генератор случайных чисел (по умолчанию общий
+    генератор тестовых данных).
+    """
+    digits = _get_random_symbols(_DIGITS, count * length, rng)
+    return [
+        int(digits[start:start + length])
+        for start in range(0, count * length, length)
+    ] if length else [0] * count
+
+
+def get_random_floats(
+        count: int,
+        before_dot: int = 1,
+        after_dot: int = 2,
+        rng: Optional[random.Random] = None,
+) -> List[float]:
+    """
+    Метод, возвращающий count случайных вещественных чисел.
+    Целая часть не начинается с нуля, дробная не заканчивается нулем.
+    :param before_dot: количество символов целочисленной части
+    (0 - число меньше единицы, 0.xx).
+    :param after_dot: количество символов дробной части.
+    :param rng: генератор случайных чисел (по умолчанию общий
+    генератор тестовых данных).
+    """
+    leads = _get_random_symbols(
+        _NONZERO_DIGITS, count if before_dot else 0, rng,
+    ).decode() or [''] * count
+    tails = _get_random_symbols(
+        _NONZERO_DIGITS, count if after_dot else 0, rng,
+    ).decode() or [''] * count
+    # Цифры между первой и последней цифрой числа
+    split = max(before_dot - 1, 0)
+    step = split + max(after_dot - 1, 0)
+    digits = _get_random_symbols(_DIGITS, count * step, rng).decode()
+    result = []
+    for index in range(count):
+        start = index * step
+        result.append(float(
+            f'{leads[index]}{digits[start:start + split]}.'
+            f'{digits[start + split:start + step]}{tails[index]}',
+        ))
+    return result
+
+
+def create_new_characters_payloads(
+        count: int,
+        string_length: int = 10,
+        rng: Optional[random.Random] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Метод, создающий тела запросов для count новых персонажей
+    со всеми обязательными полями и верными типами данных.
+    Данные генерируются сразу для всего пакета, тела запросов
+    собираются без создания и валидации объектов Character.
+    :param string_length: длина строковых полей.
+    :param rng: генератор случайных чисел (по умолчанию общий
+    генератор тестовых данных).
+    """
+    strings = get_random_strings(count * 5, string_length, rng)
+    heights = get_random_floats(count, rng=rng)
+    weights = get_random_floats(count, before_dot=2, after_dot=1, rng=rng)
+    return [
+        {
+            'education': strings[start],
+            'height': heights[index],
+            'identity': strings[start + 1],
+            'name': strings[start + 2],
+            'other_aliases': strings[start + 3],
+            'universe': strings[start + 4],
+            'weight': weights[index],
+        }
+        for index, start in enumerate(range(0, count * 5, 5))
+    ]
 
 
 def create_new_character_data_with_required_field(
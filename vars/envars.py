@@ -1,7 +1,106 @@
+"""
+Параметры подключения к сервису.
+Значения читаются при первом обращении (envars.SERVICE_LOGIN), а не при
+импорте модуля, и кэшируются. Источники по убыванию приоритета:
+- значения, переданные в configure (например, из опций pytest);
+- переменные окружения;
+- файл .env.<профиль>, профиль - configure(profile=...) или переменная
+  окружения SERVICE_PROFILE (например, .env.stage);
+- файл .env.
+Файлы .env ищутся в директории vars и выше по дереву каталогов.
+"""
 import os
-from dotenv import load_dotenv
+from pathlib import Path
+from typing import Dict, List, Optional
 
-load_dotenv()
-SERVICE_BASE_URL = os.environ['SERVICE_BASE_URL']
-SERVICE_LOGIN = os.environ['SERVICE_LOGIN']
-SERVICE_PASSWORD = os.environ['SERVICE_PASSWORD']
+SETTINGS = ('SERVICE_BASE_URL', 'SERVICE_LOGIN', 'SERVICE_PASSWORD')
+PROFILE_VARIABLE = 'SERVICE_PROFILE'
+
+_overrides: Dict[str, str] = {}
+_profile: Optional[str] = None
+_dotenv: Optional[Dict[str, Optional[str]]] = None
+_cache: Dict[str, str] = {}
+
+
+class MissingSettingError(KeyError):
+    """Параметр подключения не задан ни в одном из источников."""
+
+
+def configure(
+        profile: Optional[str] = None,
+        **overrides: Optional[str],
+) -> None:
+    """
+    Метод, задающий профиль и значения параметров, которые важнее
+    переменных окружения и файлов .env. Ранее прочитанные значения
+    сбрасываются.
+    :param profile - имя профиля (файл .env.<profile>), None - профиль
+    из переменной окружения SERVICE_PROFILE.
+    :param overrides - значения параметров, None не учитывается.
+    """
+    global _profile, _dotenv
+    unknown = set(overrides) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f'unknown settings: {sorted(unknown)}')
+    _profile = profile
+    _overrides.clear()
+    _overrides.update(
+        (name, value) for name, value in overrides.items()
+        if value is not None
+    )
+    _dotenv = None
+    _cache.clear()
+
+
+def _find_file(name: str) -> Optional[Path]:
+    directory = Path(__file__).resolve().parent
+    for candidate in (directory, *directory.parents):
+        path = candidate / name
+        if path.is_file():
+            return path
+    return None
+
+
+def _dotenv_values() -> Dict[str, Optional[str]]:
+    """Метод, читающий файлы .env и .env.<профиль> один раз."""
+    global _dotenv
+    if _dotenv is None:
+        from dotenv import dotenv_values
+
+        profile = _profile or os.environ.get(PROFILE_VARIABLE)
+        values: Dict[str, Optional[str]] = {}
+        for name in ('.env', f'.env.{profile}' if profile else None):
+            path = name and _find_file(name)
+            if path is not None:
+                values.update(dotenv_values(path))
+        _dotenv = values
+    return _dotenv
+
+
+def get(name: str) -> str:
+    """Метод, возвращающий значение параметра подключения name."""
+    value = _cache.get(name)
+    if value is not None:
+        return value
+    value = _overrides.get(name)
+    if value is None:
+        value = os.environ.get(name)
+    if value is None:
+        value = _dotenv_values().get(name)
+    if value is None:
+        raise MissingSettingError(
+            f'{name} is not set: define it in the environment or in .env '
+            f'(see .env.template)',
+        )
+    _cache[name] = value
+    return value
+
+
+def __getattr__(name: str) -> str:
+    if name in SETTINGS:
+        return get(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> List[str]:
+    return sorted((*globals(), *SETTINGS))